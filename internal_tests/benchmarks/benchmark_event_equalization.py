@@ -0,0 +1,87 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Benchmark of the event equalization: metcalcpy perform_event_equalization used by
+the plots before vs the one pass metplotpy perform_event_equalization.
+The data frames produced by both implementations are compared.
+
+Usage:
+    python benchmark_event_equalization.py [--rows 1000000] [--models 10] [--missing 0.01]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+import metcalcpy.util.utils as calc_util
+
+from metplotpy.plots.event_equalization import perform_event_equalization
+
+
+def create_stat_input(rows: int, models: int, missing: float) -> pd.DataFrame:
+    """
+    Creates a synthetic stat_input data frame with the series of models and
+    two statistics for each of two variables. The fraction 'missing' of the rows
+    is removed so the event equalization has something to do.
+    """
+    rng = np.random.default_rng(0)
+    model_names = [f'MODEL_{i}' for i in range(models)]
+    leads = np.arange(0, 240001, 60000)
+    cases_per_series = rows // (models * len(leads) * 4)
+    valid_dates = pd.date_range('2020-01-01', periods=max(cases_per_series, 1), freq='6H') \
+        .strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+
+    # every combination of the model, variable, statistic, lead and valid date
+    index = pd.MultiIndex.from_product([model_names, ['TMP', 'UGRD'], ['ME', 'RMSE'], leads, valid_dates],
+                                       names=['model', 'fcst_var', 'stat_name', 'fcst_lead', 'fcst_valid_beg'])
+    input_data = index.to_frame(index=False)
+    input_data['vx_mask'] = 'FULL'
+    input_data['stat_value'] = rng.random(len(input_data)).round(5)
+    input_data = input_data[rng.random(len(input_data)) >= missing].reset_index(drop=True)
+    return input_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the event equalization')
+    parser.add_argument('--rows', type=int, default=1000000, help='approximate number of rows')
+    parser.add_argument('--models', type=int, default=10, help='number of series')
+    parser.add_argument('--missing', type=float, default=0.01, help='fraction of the removed rows')
+    args = parser.parse_args()
+
+    input_data = create_stat_input(args.rows, args.models, args.missing)
+    params = {
+        'indy_var': 'fcst_lead',
+        'line_type': 'sl1l2',
+        'series_val_1': {'model': sorted(input_data['model'].unique().tolist())},
+        'fcst_var_val_1': {'TMP': ['ME', 'RMSE'], 'UGRD': ['ME', 'RMSE']},
+        'fixed_vars_vals_input': {'vx_mask': {'vx_mask_1': ['FULL']}},
+    }
+    print(f'{len(input_data)} rows, {args.models} series')
+
+    results = {}
+    for name, function in (('metcalcpy', calc_util.perform_event_equalization),
+                           ('metplotpy', perform_event_equalization)):
+        start = time.perf_counter()
+        # metcalcpy reports every discarded case
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = function(params, input_data.copy())
+        print(f'{name:10s} {time.perf_counter() - start:8.2f} s {len(results[name]):10d} rows')
+
+    pd.testing.assert_frame_equal(results['metcalcpy'], results['metplotpy'])
+    print('The results are identical')
+
+
+if __name__ == '__main__':
+    main()
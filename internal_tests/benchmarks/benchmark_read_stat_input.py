@@ -0,0 +1,119 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Benchmark of the stat_input loading: the plain pandas.read_csv used by the plots before
+vs read_stat_input with the column pruning, the categorical label columns,
+the float32 columns and the pyarrow engine.
+Each variant is loaded in a separate process to measure its peak RSS.
+
+Usage:
+    python benchmark_read_stat_input.py [--rows 1000000] [--file stat_input.data]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from metplotpy.plots.util import read_stat_input
+
+# the columns read by a Line plot with one series variable
+LINE_COLUMNS = ['model', 'fcst_lead', 'vx_mask', 'fcst_var', 'stat_name', 'stat_value',
+                'stat_bcl', 'stat_bcu', 'fcst_valid_beg', 'fcst_init_beg']
+CATEGORICAL_COLUMNS = ['model', 'vx_mask', 'fcst_var', 'stat_name']
+
+VARIANTS = {
+    'read_csv': {},
+    'pruned': {'columns': LINE_COLUMNS},
+    'pruned+categorical': {'columns': LINE_COLUMNS, 'categorical_columns': CATEGORICAL_COLUMNS},
+    'pruned+categorical+float32': {'columns': LINE_COLUMNS, 'categorical_columns': CATEGORICAL_COLUMNS,
+                                   'float_type': 'float32'},
+    'pruned+categorical+pyarrow': {'columns': LINE_COLUMNS, 'categorical_columns': CATEGORICAL_COLUMNS,
+                                   'engine': 'pyarrow'},
+}
+
+
+def create_stat_input(file_name: str, rows: int) -> None:
+    """
+    Writes a synthetic METviewer stat_input file with the SL1L2 line type columns
+    """
+    rng = np.random.default_rng(0)
+    valid_dates = pd.date_range('2020-01-01', periods=max(rows // 1000, 1), freq='6H') \
+        .strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+    data = {
+        'model': rng.choice([f'MODEL_{i}' for i in range(40)], rows),
+        'fcst_init_beg': rng.choice(valid_dates, rows),
+        'fcst_valid_beg': rng.choice(valid_dates, rows),
+        'fcst_lead': rng.choice(np.arange(0, 240001, 60000), rows),
+        'fcst_lev': 'Z2',
+        'interp_mthd': 'BILIN',
+        'vx_mask': rng.choice(['FULL', 'NHX', 'SHX', 'TRO'], rows),
+        'fcst_var': 'TMP',
+        'stat_name': rng.choice(['ME', 'RMSE'], rows),
+        'total': rng.integers(1000, 5000, rows),
+    }
+    for column in ('fbar', 'obar', 'fobar', 'ffbar', 'oobar', 'stat_value',
+                   'stat_ncl', 'stat_ncu', 'stat_bcl', 'stat_bcu'):
+        data[column] = rng.random(rows).round(5)
+    pd.DataFrame(data).to_csv(file_name, sep='\t', index=False)
+
+
+def load(file_name: str, variant: str) -> None:
+    """
+    Loads the file with one of the variants and prints the time, the peak RSS and the frame size
+    """
+    start = time.perf_counter()
+    if variant == 'read_csv':
+        input_data = pd.read_csv(file_name, sep='\t', header='infer', float_precision='round_trip')
+    else:
+        input_data = read_stat_input(file_name, **VARIANTS[variant])
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    frame_size = input_data.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f'{variant:30s} {elapsed:8.2f} s {peak_rss:10.0f} MB {frame_size:10.0f} MB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the stat_input loading')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of rows in the synthetic stat_input')
+    parser.add_argument('--file', help='existing stat_input file to load instead of the synthetic one')
+    parser.add_argument('--variant', help=argparse.SUPPRESS)
+    parser.add_argument('--create', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.create:
+        create_stat_input(args.file, args.rows)
+        return
+    if args.variant:
+        load(args.file, args.variant)
+        return
+
+    # the peak RSS is inherited by the child processes so this process stays small
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = args.file
+        if file_name is None:
+            file_name = os.path.join(tmp_dir, 'stat_input.data')
+            subprocess.run([sys.executable, __file__, '--file', file_name, '--rows', str(args.rows),
+                            '--create'], check=True)
+        print(f'{"variant":30s} {"time":>10s} {"peak RSS":>13s} {"frame size":>13s}')
+        for variant in VARIANTS:
+            subprocess.run([sys.executable, __file__, '--file', file_name, '--variant', variant],
+                           check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Benchmark of the series subsetting: the isin masks and the consecutive sorts
+used by the Series subclasses before vs the shared SeriesIndex.
+
+Usage:
+    python benchmark_series_index.py [--rows 1000000] [--models 40] [--stats 2]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from metplotpy.plots.series import get_series_index
+
+
+def create_stat_input(rows: int, models: int, stats: int) -> pd.DataFrame:
+    """
+    Creates a synthetic METviewer stat_input data frame
+    """
+    rng = np.random.default_rng(0)
+    valid_dates = pd.date_range('2020-01-01', periods=max(rows // 1000, 1), freq='6H') \
+        .strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+    leads = np.arange(0, 240001, 60000)
+    valid = rng.choice(valid_dates, rows)
+    return pd.DataFrame({
+        'model': rng.choice([f'MODEL_{i}' for i in range(models)], rows),
+        'fcst_init_beg': rng.choice(valid_dates, rows),
+        'fcst_valid_beg': valid,
+        'fcst_lead': rng.choice(leads, rows),
+        'vx_mask': rng.choice(['FULL', 'NHX', 'SHX', 'TRO'], rows),
+        'fcst_var': 'TMP',
+        'stat_name': rng.choice([f'STAT_{i}' for i in range(stats)], rows),
+        'stat_value': rng.random(rows),
+    })
+
+
+def select_with_masks(input_data: pd.DataFrame, filters: list) -> pd.DataFrame:
+    """
+    Subsets the data the way the Series subclasses did before the SeriesIndex
+    """
+    all_filters = [input_data[column].isin(values) for column, values in filters]
+    mask = np.array(all_filters).all(axis=0)
+    series_data = input_data.loc[mask]
+    series_data = series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
+    series_data = series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
+    return series_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the series subsetting')
+    parser.add_argument('--rows', type=int, default=1000000, help='number of rows in stat_input')
+    parser.add_argument('--models', type=int, default=40, help='number of series (models)')
+    parser.add_argument('--stats', type=int, default=2, help='number of statistics')
+    args = parser.parse_args()
+
+    input_data = create_stat_input(args.rows, args.models, args.stats)
+    all_series_filters = []
+    for model in sorted(input_data['model'].unique()):
+        for stat in sorted(input_data['stat_name'].unique()):
+            all_series_filters.append([('model', [model]), ('fcst_var', ['TMP']), ('stat_name', [stat]),
+                                       ('vx_mask', ['FULL']), ('fcst_lead', [0, 120000, 240000])])
+
+    start = time.perf_counter()
+    masks_results = [select_with_masks(input_data, filters) for filters in all_series_filters]
+    masks_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sort_keys = ['fcst_init_beg', 'fcst_lead', 'fcst_valid_beg']
+    index_results = [get_series_index(input_data, sort_keys).select(filters)
+                     for filters in all_series_filters]
+    index_time = time.perf_counter() - start
+
+    for masks_result, index_result in zip(masks_results, index_results):
+        assert masks_result.index.equals(index_result.index)
+
+    print(f'{len(input_data)} rows, {len(all_series_filters)} series')
+    print(f'isin masks and sorts: {masks_time:.3f} s')
+    print(f'SeriesIndex:          {index_time:.3f} s (including the index creation)')
+    print(f'speedup:              {masks_time / index_time:.1f}x')
+
+
+if __name__ == "__main__":
+    main()
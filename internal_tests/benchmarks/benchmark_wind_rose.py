@@ -0,0 +1,64 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Benchmark of the wind rose binning (WindRosePlot._calculate_frequencies)
+for the growing number of U/V points in float64 and float32.
+The time per million points should stay about the same, i.e. the binning
+scales linearly with the number of points.
+
+Usage:
+    python benchmark_wind_rose.py [--points 10000 100000 1000000 10000000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from metplotpy.plots.wind_rose.wind_rose import WindRosePlot
+
+# the defaults from wind_rose_defaults.yaml
+WIND_ROSE_BREAKS = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+WIND_ROSE_ANGLE = 30
+
+
+def benchmark(points: int, float_type: str, repeat: int) -> float:
+    """
+    Returns the best time of the binning of the random U/V winds
+    """
+    rng = np.random.default_rng(0)
+    u_wind_data = rng.normal(0, 4, points).astype(float_type)
+    v_wind_data = rng.normal(0, 4, points).astype(float_type)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        WindRosePlot._calculate_frequencies(u_wind_data, v_wind_data, WIND_ROSE_BREAKS, WIND_ROSE_ANGLE)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the wind rose binning')
+    parser.add_argument('--points', type=int, nargs='+', default=[10000, 100000, 1000000, 10000000],
+                        help='numbers of U/V points')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs, the best time is reported')
+    args = parser.parse_args()
+
+    print(f'{"points":>12s} {"type":>8s} {"time":>10s} {"per 1M points":>15s}')
+    for points in args.points:
+        for float_type in ('float64', 'float32'):
+            elapsed = benchmark(points, float_type, args.repeat)
+            print(f'{points:12d} {float_type:>8s} {elapsed:8.3f} s {elapsed / points * 1e6:13.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,15 +16,10 @@ import os, sys
 import re
 import errno, warnings
 import yaml
-from matplotlib import cm
 import matplotlib.cbook
-import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-from cartopy.util import add_cyclic_point
-#pylint: disable=import-error
-from netCDF4 import Dataset
 sys.path.append("../..")
-import metplotpy.plots.util as util
+from metplotpy.contributed.series_analysis.render_maps import MapTask, render_map_tasks, \
+    print_result, print_failures, read_command_line
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
@@ -34,7 +29,7 @@ class PlotGridToGrid():
         self.config = cfg
 
     def create_plots(self,input_dir, variable_name, nc_var_name, title, nc_flag_type, output_dir,
-                     background_on=False):
+                     background_on=False, jobs=1):
         """
         Creates plots of output from grid_to_grid METplus wrapper use case,
         where the nc_pair_flags raw and diff are
@@ -49,86 +44,50 @@ class PlotGridToGrid():
                               DIFF corresponds to diff
         :param output_dir:  The directory where the png files will be saved.
         :param background_on: default is False to turn off plotting coastlines/underlying map
-        :return:
+        :param jobs: The number of processes that render the plots
+        :return: list of MapResult, one for each netcdf file
         """
+        nc_files = self.get_nc_files(input_dir)
+        tasks = self.create_tasks(nc_files, variable_name, nc_var_name, title, nc_flag_type, output_dir)
+        return render_map_tasks(tasks, background_on, jobs)
 
-        # Set the type to all upper case, and variable_names to lower case
+    def get_nc_files(self, input_dir):
+        """
+        Finds all the netcdf output files in the input directory
 
-        # Get all the netcdf output files in the input directory
-        all_nc_filenames = []
+        :param input_dir: The directory where the grid stat netcdf output files are located.
+        :return: sorted list of the full paths of the netcdf files
+        """
+        all_nc_files = []
 
         # pylint: disable=unused-variable
         for root, dirs, files in os.walk(input_dir):
             for file in files:
                 match = re.match(r'(.*).nc', file)
                 if match:
-                    all_nc_filenames.append(file)
-
-        # For each netcdf file, open the file, and
-        # retrieve the fields from the netcdf file
-        for nc_file in all_nc_filenames:
-            try:
-                file_handle = Dataset(os.path.join(input_dir, nc_file), mode='r')
-            except FileNotFoundError:
-                print("File ", nc_file, " does not exist.")
-            else:
-                # Retrieve variables of interest
-                lons = file_handle.variables['lon'][:]
-                lats = file_handle.variables['lat'][:]
-                variable = file_handle.variables[nc_var_name][:]
-
-                # Finished acquiring variables, no longer need the file_handle.
-                file_handle.close()
-
-            # print("netcdf file: ", nc_file)
-            # print(nc_var_name, ': ', variable)
-            # print('lon: ', lons)
-            # print('lat: ', lats)
-            #
-            # print("======================\n\n")
-
-            # Use the reversed Spectral colormap to reflect temperatures.
-            cmap = cm.get_cmap('Spectral_r')
-
-            # generate a contour map of the variable of interest
-            plt.figure(figsize=(13, 6.2))
-            geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-            # Only plot the coastlines if the background map is requested
-            if background_on:
-                geo_ax.coastlines()
-
-            # Figure out the minimum and maximum values of the OBAR/FBAR temperature
-            # and use these values in the
-            # plt.Normalize() call.
-            minimum = variable.min()
-            maximum = variable.max()
-            # print(variable)
-
-            #  Allow the variable and the longitude to cycle (encircle the globe)
-            # pylint: disable=unused-variable
-            variable_cyc, lon_cyc = add_cyclic_point(variable, coord=lons)
-            # print("variable cyc: ", variable_cyc)
-            # print("lon cyc: ", lon_cyc)
-
-            # set number of contour levels to 65, higher number results in more smoothing.
-            plt.contourf(lons, lats, variable, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-            # Adding a legend from Stack Overflow.  Create your own mappable object
-            # (scalar mappable) that can be passed to colorbar.  Normalize values
-            # are the min and max values normalized to 0, 1 in the
-            # solution, here we use the minimum and maximum values found in the FBAR/OBAR array.
-
-            scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-            # pylint: disable=protected-access
-            scalar_mappable._A = []
-            plt.colorbar(scalar_mappable, ax=geo_ax)
-            plt.title(title)
+                    all_nc_files.append(os.path.join(root, file))
+
+        return sorted(all_nc_files)
 
+    def create_tasks(self, nc_files, variable_name, nc_var_name, title, nc_flag_type, output_dir):
+        """
+        Creates the rendering tasks of the plots of one variable of the netcdf files
+
+        :param nc_files: The full paths of the netcdf files
+        :param variable_name: The variable of interest: tmp, ugrd, hgt, etc
+        :param nc_var_name: The variable name as described in the netcdf file
+        :param title:  The title for this plot
+        :param nc_flag_type:  FCST, OBS or DIFF
+        :param output_dir:  The directory where the png files will be saved.
+        :return: list of MapTask in the order of the files
+        """
+        tasks = []
+        for nc_file in nc_files:
             # output file will be saved as png
             output_png_file = variable_name + "_" + nc_flag_type + "_" + \
-                              os.path.splitext(nc_file)[0] + ".png"
-            plt.savefig(os.path.join(output_dir, output_png_file))
+                              os.path.splitext(os.path.basename(nc_file))[0] + ".png"
+            tasks.append(MapTask(nc_file, nc_var_name, title, os.path.join(output_dir, output_png_file)))
+        return tasks
 
 
 def main():
@@ -137,9 +96,9 @@ def main():
     the plotting
     :return:
     """
-    config_file = util.read_config_from_command_line()
+    args = read_command_line('Generates the plots of the grid-to-grid use case')
 
-    with open(config_file, 'r') as stream:
+    with open(args.Path, 'r') as stream:
         try:
             config = yaml.load(stream, Loader=yaml.FullLoader)
         except yaml.YAMLError as exc:
@@ -189,17 +148,16 @@ def main():
     # nc_flag_type corresponds to the nc_flag in the MET grid-stat config file:
     # ie  FCST or OBS corresponds to raw=TRUE,
     # and DIFF corresponds to diff=TRUE
-    nc_flag_type = "FCST"
-    pgg.create_plots(input_dir, var, nc_fcst_var, nc_fcst_title, nc_flag_type,
-                 output_dir, background_on)
-    nc_flag_type = "OBS"
-    pgg.create_plots(input_dir, var, nc_obs_var, nc_obs_title, nc_flag_type,
-                     output_dir, background_on)
-    nc_flag_type = "DIFF"
-    pgg.create_plots(input_dir, var, nc_diff_var, nc_diff_title, nc_flag_type,
-                 output_dir, background_on)
+    # The netcdf files are found once and the plots of all the flag types
+    # are rendered together, in parallel with --jobs > 1
+    nc_files = pgg.get_nc_files(input_dir)
+    tasks = pgg.create_tasks(nc_files, var, nc_fcst_var, nc_fcst_title, "FCST", output_dir) + \
+            pgg.create_tasks(nc_files, var, nc_obs_var, nc_obs_title, "OBS", output_dir) + \
+            pgg.create_tasks(nc_files, var, nc_diff_var, nc_diff_title, "DIFF", output_dir)
+    results = render_map_tasks(tasks, background_on, args.jobs, print_result)
+    failed = print_failures(results)
+    return failed
 
 
 if __name__ == "__main__":
-
-    main()
+    sys.exit(1 if main() else 0)
@@ -33,6 +33,7 @@ import xarray as xr
 import pandas as pd
 from pyproj import Geod
 import pyresample as pyr
+from metplotpy.plots.resample_cache import ResampleCache
 from datetime import datetime, date
 import PIL 
 from PIL import Image
@@ -391,12 +392,14 @@ def process_one_day(theDate,hemisphere):
     targ_def = pyr.geometry.GridDefinition(lons=nlon1,lats=nlat1)
     radius=50000
     sigmas=25000    
-    rice2=pyr.kd_tree.resample_gauss(orig_def,rice,targ_def,
-                                     radius_of_influence=radius,
-                                     sigmas=sigmas,
-                                     nprocs=8,
-                                     neighbours=8,
-                                     fill_value=None)
+    # the weights of the neighbours depend only on the grids, they are
+    # calculated once and reused from the RESAMPLE_CACHE_DIR directory if it is set
+    resample_cache = ResampleCache(os.environ.get("RESAMPLE_CACHE_DIR"))
+    rice2=resample_cache.resample_gauss(orig_def,rice,targ_def,
+                                        radius_of_influence=radius,
+                                        sigmas=sigmas,
+                                        nprocs=int(os.environ.get("RESAMPLE_NPROCS",8)),
+                                        neighbours=8)
             
     print('creating combined mask')
     combined_mask=np.logical_and(nice.mask,rice2.mask)
@@ -10,6 +10,9 @@
  
 """Creates animation (gif) file of the static plots generated
    from a series analysis by lead for all forecast hours.
+   If the config file sets input_nc_file_dir, the plots are rendered
+   from the netcdf files straight into the animation (gif or mp4) and
+   the static plots are saved only if save_frames is set.
 """
 
 import re
@@ -18,6 +21,9 @@ import errno
 import yaml
 sys.path.append("../..")
 import metplotpy.contributed.series_analysis.animate_utilities as au
+from metplotpy.contributed.series_analysis.map_renderer import MapRenderer
+from metplotpy.contributed.series_analysis.plot_series_by_lead_all import PlotSeriesByLeadAll
+from metplotpy.contributed.series_analysis.render_maps import read_field
 import metplotpy.plots.util as util
 
 
@@ -72,7 +78,46 @@ class AnimateSeriesByLeadAll():
 
         return sorted_var_level_stat_paths
 
-    def create_output_filename(self, output_dir, file_to_animate, filename_regex):
+    def render_frames(self, input_nc_file_dir, forecast_hours, variable, level_type,
+                      level, statistic, background_on, frame_files=None):
+        ''' Render the plots of the statistic for the forecast hours from the netcdf
+            files created by the series analysis by lead, the same plots as the ones
+            created by plot_series_by_lead_all.  The plots are generated one at a time
+            as RGB images in memory.
+               :param input_nc_file_dir: The directory with the series_Fnnn subdirectories
+                                         of the netcdf files
+               :param forecast_hours:  the list of forecast hours comprising the
+                                       time frame of the animation, e.g. F000
+               :param variable is the variable: TMP, HGT, etc.
+               :param level_type: Level type as indicated by P for pressure level,
+                                  Z for height above ground, etc
+               :param level is the level: 500, 850, etc.
+               :param statistic: statistic of interests, either fbar or obar
+               :param background_on: Boolean value to indicate whether to draw coastlines
+               :param frame_files: a list of png/jpg files, one for each forecast
+                                   hour in the sorted order, to save the plots to,
+                                   or None to not save them
+
+               :returns a generator of the (height, width, 3) RGB images in the
+                        ascending order of the forecast hours
+        '''
+        psl = PlotSeriesByLeadAll(self.config)
+        level_str = str(level)
+        with MapRenderer(background_on) as renderer:
+            for idx, fhr in enumerate(sorted(forecast_hours)):
+                input_nc_filename = 'series_' + fhr + '_to_' + fhr + '_' + variable + '_' + \
+                                    level_type + level_str + '.nc'
+                input_nc_file = os.path.join(input_nc_file_dir, 'series_' + fhr, input_nc_filename)
+                lons, lats, values = read_field(input_nc_file, 'series_cnt_' + statistic.upper())
+
+                # the title has the forecast hour without the F prefix
+                title = psl.get_title(statistic.upper(), fhr.lstrip('F'), variable, level_type, level_str)
+                renderer.draw(lons, lats, values, title)
+                if frame_files is not None:
+                    renderer.figure.savefig(frame_files[idx])
+                yield renderer.to_rgb()
+
+    def create_output_filename(self, output_dir, file_to_animate, filename_regex, extension='.gif'):
         ''' Create an output file using the directory specified by the user, and
              based on one of the input files (minus
              the Fxyz portion, hence only one sample is needed)
@@ -84,6 +129,7 @@ class AnimateSeriesByLeadAll():
              :param filename_regex:  The regular expression which defines the format
                                      of the png file, used to
                                      create the output gif (animation) file.
+             :param extension: The extension of the animation file, .gif or .mp4
         '''
 
         # filename_regex = "series_F([0-9]{3})_to_F([0-9]{3})_([A-Z]{3})_((P|Z)[0-9]{1,3})_(obar|fbar).png"
@@ -99,7 +145,7 @@ class AnimateSeriesByLeadAll():
                 "input filename regular expression")
 
         output_name = "series_" + variable + "_" + full_level + "_" + \
-                      statistic + ".gif"
+                      statistic + extension
 
         # create the output directory if it doesn't exist (equivalent of mkdir -p)
         try:
@@ -140,13 +186,27 @@ def main():
     #list of statistics of interest
     statistics_of_interest = asbl.config['statistic_of_interest']
 
+    # Optional settings to render the plots from the netcdf files into the animation
+    # instead of reading the png/jpg files created by plot_series_by_lead_all
+    input_nc_file_dir = asbl.config.get('input_nc_file_dir')
+    background_on = str(asbl.config.get('background_on', 'False')).upper() == 'TRUE'
+    save_frames = str(asbl.config.get('save_frames', 'False')).upper() == 'TRUE'
+    extension = '.' + asbl.config.get('animation_format', 'gif').lower()
+
     # Animate the plots corresponding to the statistics of interest for the corresponding forecast, variable, and level
     for statistic in statistics_of_interest:
         stat_files = asbl.collect_files_to_animate(input_dir, fhrs_list, variable,
                                           level_type, level, statistic)
-        # create output filename for statistic animation (gif) file
-        output_filename = asbl.create_output_filename(output_dir, stat_files[0], filename_regex)
-        au.create_gif(animation_duration_secs, stat_files, output_filename)
+        # create output filename for statistic animation (gif or mp4) file
+        output_filename = asbl.create_output_filename(output_dir, stat_files[0], filename_regex, extension)
+        if input_nc_file_dir:
+            if save_frames:
+                os.makedirs(input_dir, exist_ok=True)
+            frames = asbl.render_frames(input_nc_file_dir, fhrs_list, variable, level_type, level,
+                                        statistic, background_on, stat_files if save_frames else None)
+            au.write_animation(animation_duration_secs, frames, output_filename)
+        else:
+            au.create_gif(animation_duration_secs, stat_files, output_filename)
 
 
 if __name__ == "__main__":
@@ -53,8 +53,31 @@ def create_gif(duration_secs, files_to_animate, output_filename):
 
     '''
 
-    images = [imageio.imread(filename) for filename in files_to_animate]
-    imageio.mimsave(output_filename, images, duration=duration_secs)
+    # the images are read one at a time while they are encoded
+    images = (imageio.imread(filename) for filename in files_to_animate)
+    write_animation(duration_secs, images, output_filename)
+
+
+def write_animation(duration_secs, frames, output_filename):
+    '''
+    Encodes the frames into the animation one frame at a time, so only one
+    frame is in memory.  The format is defined by the extension of the output
+    file: .mp4 (requires the imageio-ffmpeg package) or .gif for all the others.
+
+    :param duration_secs:  The time in seconds to view a frame in the animation
+    :param frames: An iterable of the frames (RGB or RGBA arrays of the same size),
+                   e.g. a generator of the images rendered in memory.
+    :param output_filename:  The full path filename for the animation file.
+    '''
+    if output_filename.lower().endswith('.mp4'):
+        writer = imageio.get_writer(output_filename, fps=1.0 / float(duration_secs))
+    else:
+        # the duration is read from the config files as a string
+        writer = imageio.get_writer(output_filename, mode='I', duration=float(duration_secs))
+
+    with writer:
+        for frame in frames:
+            writer.append_data(frame)
 
 
 def create_gif_from_subset(duration_secs, input_file_dir,
@@ -101,8 +124,8 @@ def create_gif_from_subset(duration_secs, input_file_dir,
     sorted_files_to_animate = sorted(files_to_animate)
 
 
-    images = [imageio.imread(filename) for filename in sorted_files_to_animate]
-    imageio.mimsave(full_path_output_filename, images, duration=duration_secs)
+    images = (imageio.imread(filename) for filename in sorted_files_to_animate)
+    write_animation(duration_secs, images, full_path_output_filename)
 
 
 
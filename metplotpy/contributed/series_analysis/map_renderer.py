@@ -0,0 +1,137 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Renders the global contour maps (png) of the series analysis and grid-to-grid
+fields. The figure, the Cartopy axes, the coastlines and the colorbar are created
+once and only the contours, the colorbar range and the title are replaced for
+every map, so many maps are rendered at a steady memory use.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+import cartopy.crs as ccrs
+
+
+class MapRenderer():
+    '''
+        Draws contour maps of lat/lon fields into one reusable figure.
+
+        To use:
+            with MapRenderer(background_on) as renderer:
+                for ...:
+                    renderer.render(lons, lats, values, title, output_png_file)
+
+        or, to get the maps as RGB images without writing files:
+            with MapRenderer(background_on) as renderer:
+                for ...:
+                    renderer.draw(lons, lats, values, title)
+                    rgb = renderer.to_rgb()
+    '''
+
+    def __init__(self, background_on: bool = False, figsize: tuple = (13, 6.2),
+                 cmap_name: str = 'Spectral_r', levels: int = 65) -> None:
+        '''
+        Creates the figure, the axes, the coastlines and the colorbar
+
+        :param background_on: Boolean value to indicate whether to draw coastlines
+                              on the maps.
+        :param figsize: The size of the figure in inches
+        :param cmap_name: The name of the colormap, by default the reversed Spectral
+                          colormap to reflect temperatures.
+        :param levels: The number of contour levels, higher number results in more smoothing.
+        '''
+        self.levels = levels
+        self.cmap = plt.get_cmap(cmap_name)
+        self.figure = plt.figure(figsize=figsize)
+        self.geo_ax = self.figure.add_subplot(projection=ccrs.PlateCarree())
+
+        # Only plot the coastlines if the background map is requested.
+        # The coastlines are drawn above the contours.
+        if background_on:
+            self.geo_ax.coastlines()
+
+        # Create your own mappable object (scalar mappable) that can be passed to colorbar.
+        # Its normalize values are set to the minimum and maximum of each field.
+        self.scalar_mappable = plt.cm.ScalarMappable(cmap=self.cmap, norm=plt.Normalize(0, 1))
+        self.scalar_mappable.set_array([])
+        self.figure.colorbar(self.scalar_mappable, ax=self.geo_ax)
+        self.contours = None
+
+    def render(self, lons, lats, values, title: str, output_png_file: str) -> None:
+        '''
+        Draws the contour map of the field and saves it
+
+        :param lons: The longitudes of the field
+        :param lats: The latitudes of the field
+        :param values: The 2D field
+        :param title: The title of the map
+        :param output_png_file: The full path of the output png file
+        '''
+        self.draw(lons, lats, values, title)
+        self.figure.savefig(output_png_file)
+
+    def draw(self, lons, lats, values, title: str) -> None:
+        '''
+        Replaces the contours, the colorbar range and the title with the ones of the field
+
+        :param lons: The longitudes of the field
+        :param lats: The latitudes of the field
+        :param values: The 2D field
+        :param title: The title of the map
+        '''
+        self._remove_contours()
+
+        # the data limits of the axes are the limits of this field only
+        self.geo_ax.ignore_existing_data_limits = True
+        self.contours = self.geo_ax.contourf(lons, lats, values, self.levels,
+                                             transform=ccrs.PlateCarree(), cmap=self.cmap)
+
+        # the colorbar is updated by the change of the limits
+        self.scalar_mappable.set_clim(values.min(), values.max())
+        self.geo_ax.set_title(title)
+
+    def to_rgb(self) -> np.ndarray:
+        '''
+        Renders the figure in memory
+
+        :return: the (height, width, 3) uint8 array of the RGB pixels, the same
+                 pixels as in the png file saved by render()
+        '''
+        self.figure.canvas.draw()
+        return np.array(self.figure.canvas.buffer_rgba())[:, :, :3]
+
+    def _remove_contours(self) -> None:
+        '''
+        Removes the contours of the previous map
+        '''
+        if self.contours is None:
+            return
+        if isinstance(self.contours, Artist):
+            self.contours.remove()
+        else:
+            # Matplotlib < 3.8 ContourSet is not an artist
+            for collection in self.contours.collections:
+                collection.remove()
+        self.contours = None
+
+    def close(self) -> None:
+        '''
+        Releases the figure
+        '''
+        self._remove_contours()
+        plt.close(self.figure)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -20,12 +20,9 @@ import os, sys
 import re
 import errno, warnings
 import yaml
-import matplotlib.pyplot as plt
-from matplotlib import cm
 import matplotlib.cbook
-import cartopy.crs as ccrs
-from cartopy.util import add_cyclic_point
 import metplotpy.contributed.series_analysis.animate_utilities as au
+from metplotpy.contributed.series_analysis.map_renderer import MapRenderer
 #pylint: disable=import-error
 from netCDF4 import Dataset
 sys.path.append("../..")
@@ -62,130 +59,85 @@ class PlotSeriesByGrouping():
         nc_files = self.get_nc_files(input_dir)
         # print(nc_files)
 
-        # For each nc_file, read in the necessary values from the netcdf file
-        for nc_file in nc_files:
-            # print("current nc file: ", nc_file)
-            match = re.match(r'.*/(.*).nc', nc_file)
-            if match:
-                filename_only = match.group(1)
-
-            # Create the output directory if it doesn't already exist
-            # create the output directory if it doesn't exist (equivalent of mkdir -p)
-            try:
-                os.makedirs(output_dir)
-            except OSError as exc:
-                if exc.errno == errno.EEXIST and os.path.isdir(output_dir):
-                    pass
-            output_filename = os.path.join(output_dir, filename_only)
-
-            # extract the variable_name and level from the output_filename
-            # regex for series by lead groupings:
-            # series_(F[0 - 9]{3}_to_F[0 - 9]{3})_([A - Z]{3})_(P | Z)([0 - 9]{1, 3}).*
-            filename_only = filename_regex.split('.png')[0]
-            filename_only_regex = filename_only + ')'
-
-            var_level_match = re.match(filename_only_regex, output_filename)
-            if var_level_match:
-                variable_name = var_level_match.group(3)
-                level_type = var_level_match.group(4)
-                level_name = var_level_match.group(5)
-                level = level_type + level_name
-            else:
-                raise ValueError("The variable and level couldn't be extracted from "
-                                 "the netcdf filename.")
-
-            input_nc_file = os.path.join(input_dir, nc_file)
-
-            if input_nc_file.endswith('.nc'):
-                try:
-                    file_handle = Dataset(input_nc_file, mode='r')
-                except FileNotFoundError:
-                    print("File ", input_nc_file, " does not exist.")
-                else:
-
-                    # Retrieve variables of interest
-                    lons = file_handle.variables['lon'][:]
-                    lats = file_handle.variables['lat'][:]
-                    fbar = file_handle.variables['series_cnt_FBAR'][:]
-                    obar = file_handle.variables['series_cnt_OBAR'][:]
-
-                    # close the file handle now that we are finished retrieving what we need
-                    file_handle.close()
-
-                # Verify that these values are consistent with lat, lon values, etc.
-                # print("lat : ", lats)
-                # print("lon : ", lons)
-                # print("FBAR: ", fbar)
-                # print("OBAR: ", obar)
-                # print("===============\n\n")
-
-            # Use the reversed Spectral colormap to reflect temperatures.
-            cmap = cm.get_cmap('Spectral_r')
-
-            vars_dict = {'FBAR': fbar, 'OBAR': obar}
-            for key, value in vars_dict.items():
-                # generate a contour map of OBAR/FBAR values
-                plt.figure(figsize=(13, 6.2))
-                geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-                # set number of contour levels to 65, higher number results in more smoothing.
-                plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-                # Only plot the coastlines if the background map is requested
-                if background_on:
-                    geo_ax.coastlines()
-
-                if key == 'OBAR':
-                    var_in_title = "OBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR
-                    # temperature and use these values in the
-                    # plt.Normalize() call.
-                    minimum = obar.min()
-                    maximum = obar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to
-                    # cycle (encircle the globe)
-                    # pylint: disable=unused-variable
-                    obar_cyc, lon_cyc = add_cyclic_point(obar, coord=lons)
-                else:
-                    var_in_title = "FBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR
-                    # temperature and use these values in the
-                    # plt.Normalize() call.
-                    minimum = fbar.min()
-                    maximum = fbar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to cycle
-                    # (encircle the globe)
-                    # pylint: disable=unused-variable
-                    fbar_cyc, lon_cyc = add_cyclic_point(fbar, coord=lons)
-
-                # Adding a legend from Stack Overflow.  Create your own mappable object
-                # (scalar mappable) that can be passed to colorbar.  Normalize values
-                # are the min and max values normalized to 0, 1 in the
-                # solution, here we use the minimum and maximum values found in the
-                # FBAR/OBAR array.
-
-                scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-                # pylint: disable=protected-access
-                scalar_mappable._A = []
-                plt.colorbar(scalar_mappable, ax=geo_ax)
-                match_group_desc = re.match(filename_only_regex, output_filename)
-                if match_group_desc:
-                    group_descriptor = match_group_desc.group(2)
-                else:
-                    raise ValueError("Expecting Fxxx_to_Fyyy info in netcdf "
-                                     "filename but info not found... ")
-
-                title = group_descriptor + " for " + var_in_title + " from series by init for " + \
-                        variable_name + " " + level
-                plt.title(title)
+        # All the plots are drawn into one figure
+        with MapRenderer(background_on) as renderer:
+            # For each nc_file, read in the necessary values from the netcdf file
+            for nc_file in nc_files:
+                # print("current nc file: ", nc_file)
+                match = re.match(r'.*/(.*).nc', nc_file)
+                if match:
+                    filename_only = match.group(1)
 
-                # output file will be saved as png
-                if key == 'OBAR':
-                    output_png_file = output_filename + "_obar.png"
+                # Create the output directory if it doesn't already exist
+                # create the output directory if it doesn't exist (equivalent of mkdir -p)
+                try:
+                    os.makedirs(output_dir)
+                except OSError as exc:
+                    if exc.errno == errno.EEXIST and os.path.isdir(output_dir):
+                        pass
+                output_filename = os.path.join(output_dir, filename_only)
+
+                # extract the variable_name and level from the output_filename
+                # regex for series by lead groupings:
+                # series_(F[0 - 9]{3}_to_F[0 - 9]{3})_([A - Z]{3})_(P | Z)([0 - 9]{1, 3}).*
+                filename_only = filename_regex.split('.png')[0]
+                filename_only_regex = filename_only + ')'
+
+                var_level_match = re.match(filename_only_regex, output_filename)
+                if var_level_match:
+                    variable_name = var_level_match.group(3)
+                    level_type = var_level_match.group(4)
+                    level_name = var_level_match.group(5)
+                    level = level_type + level_name
                 else:
-                    output_png_file = output_filename + "_fbar.png"
-                # print("output filename: ", output_png_file)
-                plt.savefig(output_png_file)
+                    raise ValueError("The variable and level couldn't be extracted from "
+                                     "the netcdf filename.")
+
+                input_nc_file = os.path.join(input_dir, nc_file)
+
+                if input_nc_file.endswith('.nc'):
+                    try:
+                        file_handle = Dataset(input_nc_file, mode='r')
+                    except FileNotFoundError:
+                        print("File ", input_nc_file, " does not exist.")
+                    else:
+
+                        # Retrieve variables of interest
+                        lons = file_handle.variables['lon'][:]
+                        lats = file_handle.variables['lat'][:]
+                        fbar = file_handle.variables['series_cnt_FBAR'][:]
+                        obar = file_handle.variables['series_cnt_OBAR'][:]
+
+                        # close the file handle now that we are finished retrieving what we need
+                        file_handle.close()
+
+                    # Verify that these values are consistent with lat, lon values, etc.
+                    # print("lat : ", lats)
+                    # print("lon : ", lons)
+                    # print("FBAR: ", fbar)
+                    # print("OBAR: ", obar)
+                    # print("===============\n\n")
+
+                vars_dict = {'FBAR': fbar, 'OBAR': obar}
+                for key, value in vars_dict.items():
+                    # generate a contour map of OBAR/FBAR values
+                    match_group_desc = re.match(filename_only_regex, output_filename)
+                    if match_group_desc:
+                        group_descriptor = match_group_desc.group(2)
+                    else:
+                        raise ValueError("Expecting Fxxx_to_Fyyy info in netcdf "
+                                         "filename but info not found... ")
+
+                    title = group_descriptor + " for " + key + " from series by init for " + \
+                            variable_name + " " + level
+
+                    # output file will be saved as png
+                    if key == 'OBAR':
+                        output_png_file = output_filename + "_obar.png"
+                    else:
+                        output_png_file = output_filename + "_fbar.png"
+                    # print("output filename: ", output_png_file)
+                    renderer.render(lons, lats, value, title, output_png_file)
 
     def get_nc_files(self, input_dir_base):
         '''
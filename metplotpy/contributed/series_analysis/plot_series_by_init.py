@@ -17,15 +17,12 @@ import sys
 import yaml
 import errno
 import warnings
-import matplotlib.pyplot as plt
 import matplotlib.cbook
-from matplotlib import cm
-import cartopy.crs as ccrs
-from cartopy.util import add_cyclic_point
 #pylint: disable=import-error
 from netCDF4 import Dataset
 sys.path.append("../..")
 import metplotpy.plots.util as util
+from metplotpy.contributed.series_analysis.map_renderer import MapRenderer
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
@@ -94,76 +91,23 @@ class PlotSeriesByInit():
             print("FBAR: ", fbar)
             print("OBAR: ", obar)
 
-            # Use the reversed Spectral colormap to reflect temperatures.
-            cmap = cm.get_cmap('Spectral_r')
-
             vars_dict = {'FBAR': fbar, 'OBAR': obar}
-            for key, value in vars_dict.items():
-                # generate a contour map of OBAR/FBAR values
-                plt.figure(figsize=(13, 6.2))
-                geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-                # set number of contour levels to 65, higher number results in more smoothing.
-                plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-                # Only plot the coastlines if the background map is requested
-                if background_on:
-                    geo_ax.coastlines()
-
-                if key == 'OBAR':
-                    var_in_title = "OBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR
-                    # temperature and use these values in the
-                    # plt.Normalize() call.
-                    minimum = obar.min()
-                    maximum = obar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude
-                    # to cycle (encircle the globe)
-
-                    # pylint: disable=unused-variable
-                    obar_cyc, lon_cyc = add_cyclic_point(obar, coord=lons)
-                else:
-                    var_in_title = "FBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR
-                    # temperature and use these values in the
-                    # plt.Normalize() call.
-                    minimum = fbar.min()
-                    maximum = fbar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude
-                    # to cycle (encircle the globe)
-                    # pylint: disable=unused-variable
-                    fbar_cyc, lon_cyc = add_cyclic_point(fbar, coord=lons)
-
-                # Adding a legend from Stack Overflow.  Create your own mappable object
-                # (scalar mappable) that can be passed to colorbar.  Normalize values
-                # are the min and max values normalized to 0, 1 in the
-                # solution, here we use the minimum and maximum values found in the FBAR/OBAR
-                # array.
-
-                scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-                # pylint: disable=protected-access
-                scalar_mappable._A = []
-                plt.colorbar(scalar_mappable, ax=geo_ax)
-                title = var_in_title + " from series by init for " + variable_name + \
-                        " " + level + " Storm " \
-                        + storm_number
-                plt.title(title)
-
-                # output file will be saved as png
-                if key == 'OBAR':
-
-                    output_png_filename = output_filename_base + "_obar.png"
-                    # output_png_file = output_dir + "/" + output_png_filename
-                    output_png_file = os.path.join(output_dir, output_png_filename)
-
-
-                else:
-
-                    output_png_filename = output_filename_base + "_fbar.png"
+            with MapRenderer(background_on) as renderer:
+                for key, value in vars_dict.items():
+                    # generate a contour map of OBAR/FBAR values
+                    title = key + " from series by init for " + variable_name + \
+                            " " + level + " Storm " \
+                            + storm_number
+
+                    # output file will be saved as png
+                    if key == 'OBAR':
+                        output_png_filename = output_filename_base + "_obar.png"
+                    else:
+                        output_png_filename = output_filename_base + "_fbar.png"
                     output_png_file = os.path.join(output_dir, output_png_filename)
 
-                print("output filename: ", output_png_file)
-                plt.savefig(output_png_file)
+                    print("output filename: ", output_png_file)
+                    renderer.render(lons, lats, value, title, output_png_file)
 
 
 def main():
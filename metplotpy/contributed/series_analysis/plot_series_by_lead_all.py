@@ -21,30 +21,35 @@ import errno
 import warnings
 from collections import namedtuple
 import re
-import matplotlib.pyplot as plt
-from matplotlib import cm
 import matplotlib.cbook
-import cartopy.crs as ccrs
-from cartopy.util import add_cyclic_point
 #pylint: disable=import-error
 sys.path.append("../..")
-import metplotpy.plots.util as util
+from metplotpy.contributed.series_analysis.map_renderer import MapRenderer
+from metplotpy.contributed.series_analysis.render_maps import MapTask, render_map_tasks, \
+    print_result, print_failures, read_command_line
 
 from netCDF4 import Dataset
 # ignore the MatplotlibFutureDeprecation warning which does not affect this code
 # since changes must be made in Cartopy code
 warnings.simplefilter(action='ignore', category=matplotlib.cbook.mplDeprecation)
 
+# the statistics plotted for each netcdf file
+STATISTICS = ['FBAR', 'OBAR']
+
+
 class PlotSeriesByLeadAll():
     def __init__(self, cfg):
         self.config = cfg
 
     # input_file, hour, variable_name, level_type, level, output_filename)
     def generate_plot(self, input_nc_filename, fhr, variable_name,
-                      level_type, level, output_filename):
+                      level_type, level, output_filename, renderer=None):
         '''
+        Generates the FBAR and OBAR plots (png) of the netcdf file
 
-
+        :param renderer: The MapRenderer that draws the maps, shared by all the files
+                         of a run.  If None, a new figure is created and closed
+                         for this file.
         :return:
         '''
 
@@ -80,64 +85,51 @@ class PlotSeriesByLeadAll():
             # print("FBAR: ", fbar)
             # print("OBAR: ", obar)
 
-            # Use the reversed Spectral colormap to reflect temperatures.
-            cmap = cm.get_cmap('Spectral_r')
-
-            vars_dict = {'FBAR': fbar, 'OBAR': obar}
-            for key, value in vars_dict.items():
-                # generate a contour map of OBAR/FBAR values
-                plt.figure(figsize=(13, 6.2))
-                geo_ax = plt.axes(projection=ccrs.PlateCarree())
-
-                # set number of contour levels to 65, higher number results in more smoothing.
-                plt.contourf(lons, lats, value, 65, transform=ccrs.PlateCarree(), cmap=cmap)
-
-                # Only plot the coastlines if the background map is requested
-                if background_on:
-                    geo_ax.coastlines()
-
-                if key == 'OBAR':
-                    var_in_title = "OBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR temperature
-                    # and use these values in the plt.Normalize() call.
-                    minimum = obar.min()
-                    maximum = obar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to cycle
-                    # (encircle the globe)
-                    # pylint: disable=unused-variable
-                    obar_cyc, lon_cyc = add_cyclic_point(obar, coord=lons)
-                else:
-                    var_in_title = "FBAR"
-                    # Figure out the minimum and maximum values of the OBAR/FBAR temperature
-                    # and use these values in the plt.Normalize() call.
-                    minimum = fbar.min()
-                    maximum = fbar.max()
-                    # Allow the temperature values (OBAR, FBAR) and the longitude to
-                    # cycle (encircle the globe)
-                    # pylint: disable=unused-variable
-                    fbar_cyc, lon_cyc = add_cyclic_point(fbar, coord=lons)
-
-                # Adding a legend from Stack Overflow.  Create your own mappable
-                # object (scalar mappable) that can be passed to colorbar.
-                # Normalize values are the min and max values normalized to
-                # 0, 1 in the solution, here we use the minimum and maximum
-                # values found in the FBAR/OBAR array.
-
-                scalar_mappable = plt.cm.ScalarMappable(cmap=cmap, norm=plt.Normalize(minimum, maximum))
-                # pylint: disable=protected-access
-                scalar_mappable._A = []
-                plt.colorbar(scalar_mappable, ax=geo_ax)
-                title = " series by init " + var_in_title + " for fhr " + fhr + " " + \
-                        variable_name + " " + level_type + level
-                plt.title(title)
-
-                # output file will be saved as png
-                if key == 'OBAR':
-                    output_png_file = output_filename + "_obar.png"
-                else:
-                    output_png_file = output_filename + "_fbar.png"
-                print("output filename: ", output_png_file)
-                plt.savefig(output_png_file)
+            # reuse the figure of the caller, otherwise render both maps into a new figure
+            own_renderer = renderer is None
+            if own_renderer:
+                renderer = MapRenderer(background_on)
+
+            try:
+                vars_dict = {'FBAR': fbar, 'OBAR': obar}
+                for key, value in vars_dict.items():
+                    # generate a contour map of OBAR/FBAR values
+                    title = self.get_title(key, fhr, variable_name, level_type, level)
+
+                    # output file will be saved as png
+                    output_png_file = output_filename + "_" + key.lower() + ".png"
+                    print("output filename: ", output_png_file)
+                    renderer.render(lons, lats, value, title, output_png_file)
+            finally:
+                if own_renderer:
+                    renderer.close()
+
+    def get_title(self, statistic, fhr, variable_name, level_type, level):
+        '''
+        Creates the title of the plot
+
+        :param statistic: The statistic of interest: eg. FBAR or OBAR
+        :return: the title
+        '''
+        return " series by init " + statistic + " for fhr " + fhr + " " + \
+               variable_name + " " + level_type + level
+
+    def create_tasks(self, file_info_list):
+        '''
+        Creates the rendering tasks of the FBAR and OBAR plots of the netcdf files
+
+        :param file_info_list: A list of named tuples returned by get_info()
+        :return: list of MapTask, the FBAR and OBAR plots of each file in the order of the files
+        '''
+        tasks = []
+        for file_info in file_info_list:
+            for statistic in STATISTICS:
+                title = self.get_title(statistic, file_info.fhr, file_info.variable_name,
+                                       file_info.level_type, file_info.level)
+                output_png_file = file_info.output_filename + "_" + statistic.lower() + ".png"
+                tasks.append(MapTask(file_info.input_file, 'series_cnt_' + statistic,
+                                     title, output_png_file))
+        return tasks
 
     def get_info(self, base_dir, output_base_dir):
         '''From the base_dir, where the series_F### subdirectories reside (and contain the
@@ -148,6 +140,7 @@ class PlotSeriesByLeadAll():
            3) from the netcdf file, extract the fhr, variable name, and level information
            4) Create the output filename, variable name, level, forecast hour to be used
            to create the title for the plot.
+           The directories and files are visited in the sorted order.
 
            :param base_dir  The base directory containing the series_F### subdirectories,
                             which in turn contain the netcdf
@@ -157,20 +150,22 @@ class PlotSeriesByLeadAll():
 
            :return: file_info_list   A list of named tuples that contain the file info
                                      needed to generate the title of
-                                     each plot and the output filename of each plot.
+                                     each plot, the output filename of each plot and
+                                     the full path of the netcdf file.
         '''
 
         # Get a list of all the subdirectories under the base_dir and create a list of named
         # tuples that contain the forecast hour, variable (TMP or HGT), level type
         # (ie P or Z) and level.
-        FileInfo = namedtuple('FileInfo', 'fhr, variable_name,level_type, level, output_filename')
+        FileInfo = namedtuple('FileInfo', 'fhr, variable_name,level_type, level, output_filename, input_file')
 
         # filename looks like the following: series_[fhr]_to_[fhr]_[variable]_[level].nc
         file_info_list = []
 
         # pylint: disable=unused-variable
         for root, dirs, files in os.walk(base_dir):
-            for file in files:
+            dirs.sort()
+            for file in sorted(files):
                 # match = re.search('series_F([0-9]{3})_(HGT|TMP)_(P|Z)([0-9]{3}).nc', file)
                 match = re.search('series_F([0-9]{1,3})_to_F([0-9]{1,3})_(HGT|TMP)_(P|Z)([0-9]{1,3}).nc', file)
                 if match:
@@ -181,7 +176,8 @@ class PlotSeriesByLeadAll():
                     # Create the output filename (full path) but omit the extension
                     output_filename = 'series_F' + fhr + "_to_F" + fhr + "_" + variable_name + '_' + level_type + level
                     output_file_no_ext = os.path.join(output_base_dir, output_filename)
-                    cur_file_info = FileInfo(fhr, variable_name, level_type, level, output_file_no_ext)
+                    cur_file_info = FileInfo(fhr, variable_name, level_type, level, output_file_no_ext,
+                                             os.path.join(root, file))
                     file_info_list.append(cur_file_info)
 
         return file_info_list
@@ -193,9 +189,9 @@ def main():
     series_F000/, series_F006/, series_F012, and series_F018
     """
 
-    config_file = util.read_config_from_command_line()
+    args = read_command_line('Generates the plots of the series analysis by lead for all fhrs')
 
-    with open(config_file, 'r') as stream:
+    with open(args.Path, 'r') as stream:
         try:
             config = yaml.load(stream, Loader=yaml.FullLoader)
         except yaml.YAMLError as exc:
@@ -220,23 +216,13 @@ def main():
             # directory already exists, proceed
             pass
 
-    # Invoke the function that generates the plot
+    # Find the netcdf files and render their plots, in parallel with --jobs > 1
     file_info_list = psl.get_info(input_nc_file_dir, output_dir)
-
-    for file_info in file_info_list:
-        hour = file_info.fhr
-        fhr = 'series_F' + hour
-        input_dir = os.path.join(input_nc_file_dir, fhr)
-        level_type = file_info.level_type
-        level = file_info.level
-        variable_name = file_info.variable_name
-        input_filename = 'series_F' + hour + '_to_F' + hour + '_' + variable_name + '_' + level_type + \
-                         level + '.nc'
-        input_file = os.path.join(input_dir, input_filename)
-        output_filename = file_info.output_filename
-
-        psl.generate_plot(input_file, hour, variable_name, level_type, level, output_filename)
+    tasks = psl.create_tasks(file_info_list)
+    results = render_map_tasks(tasks, plot_background_map, args.jobs, print_result)
+    failed = print_failures(results)
+    return failed
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(1 if main() else 0)
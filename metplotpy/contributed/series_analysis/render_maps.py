@@ -0,0 +1,167 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Renders many contour maps of netcdf fields in one process or in a pool of
+worker processes.  Each map is a task: the netcdf file, the name of the field,
+the title and the output png file.  Every process draws its maps into one
+MapRenderer and reads only the lon, lat and field variables of the file.
+An error in one map doesn't stop the others, the failures are reported at the end.
+"""
+
+import argparse
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+#pylint: disable=import-error
+from netCDF4 import Dataset
+from metplotpy.contributed.series_analysis.map_renderer import MapRenderer
+
+# a map to render
+MapTask = namedtuple('MapTask', ['input_file', 'nc_var_name', 'title', 'output_png_file'])
+
+# the result of rendering one map: the time in seconds and the error message or None
+MapResult = namedtuple('MapResult', ['output_png_file', 'seconds', 'error'])
+
+# the renderer of a worker process, created by _init_worker()
+_WORKER_RENDERER = None
+
+
+def read_field(input_file: str, nc_var_name: str) -> tuple:
+    '''
+    Reads the longitudes, latitudes and the field from the netcdf file
+
+    :param input_file: The full path of the netcdf file
+    :param nc_var_name: The variable name as described in the netcdf file
+    :return: tuple of lons, lats and the field
+    '''
+    with Dataset(input_file, mode='r') as file_handle:
+        lons = file_handle.variables['lon'][:]
+        lats = file_handle.variables['lat'][:]
+        values = file_handle.variables[nc_var_name][:]
+    return lons, lats, values
+
+
+def render_map_tasks(tasks: list, background_on: bool = False, jobs: int = 1, log=None) -> list:
+    '''
+    Renders the maps.  If jobs > 1 the maps are rendered by a pool of worker processes.
+
+    :param tasks: list of MapTask
+    :param background_on: Boolean value to indicate whether to draw coastlines on the maps.
+    :param jobs: The number of worker processes
+    :param log: A function that is called with each MapResult or None
+    :return: list of MapResult in the order of the tasks; the order
+             doesn't depend on the number of jobs
+    '''
+    results = []
+    if jobs > 1 and len(tasks) > 1:
+        # send the tasks in chunks to reduce the communication with the workers
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(background_on,)) as executor:
+            for result in executor.map(_render_worker_task, tasks, chunksize=chunksize):
+                results.append(result)
+                if log is not None:
+                    log(result)
+        return results
+
+    with MapRenderer(background_on) as renderer:
+        for task in tasks:
+            result = render_map_task(renderer, task)
+            results.append(result)
+            if log is not None:
+                log(result)
+    return results
+
+
+def render_map_task(renderer: MapRenderer, task: MapTask) -> MapResult:
+    '''
+    Reads the field of the task and draws its map
+
+    :param renderer: The MapRenderer that draws the map
+    :param task: The map to render
+    :return: the result with the rendering time
+    '''
+    start = time.perf_counter()
+    error = None
+    try:
+        lons, lats, values = read_field(task.input_file, task.nc_var_name)
+        renderer.render(lons, lats, values, task.title, task.output_png_file)
+    except Exception:
+        error = traceback.format_exc(limit=-1).strip()
+    return MapResult(task.output_png_file, time.perf_counter() - start, error)
+
+
+def _init_worker(background_on: bool) -> None:
+    '''
+    Creates the renderer of the worker process.  Its figure is released
+    when the process exits.
+
+    :param background_on: Boolean value to indicate whether to draw coastlines on the maps.
+    '''
+    global _WORKER_RENDERER
+    _WORKER_RENDERER = MapRenderer(background_on)
+
+
+def _render_worker_task(task: MapTask) -> MapResult:
+    '''
+    Renders the map with the renderer of the worker process
+
+    :param task: The map to render
+    :return: the result with the rendering time
+    '''
+    return render_map_task(_WORKER_RENDERER, task)
+
+
+def print_result(result: MapResult) -> None:
+    '''
+    Prints the output file of the map and its error if the map failed
+
+    :param result: the result of rendering the map
+    '''
+    status = 'OK' if result.error is None else 'FAILED'
+    print(f'{result.seconds:8.2f} s  {status:6s} {result.output_png_file}')
+
+
+def print_failures(results: list) -> int:
+    '''
+    Prints the summary and the list of the failed maps with their errors
+
+    :param results: list of MapResult
+    :return: the number of the failed maps
+    '''
+    failed = [result for result in results if result.error is not None]
+    if failed:
+        print(f'\n{len(failed)} failed maps:')
+        for result in failed:
+            print(f'{result.output_png_file}:')
+            print(result.error.splitlines()[-1])
+    print(f'{len(results)} maps, {len(failed)} failed')
+    return len(failed)
+
+
+def read_command_line(description: str) -> argparse.Namespace:
+    '''
+    Reads the config file and the number of the worker processes from the command line
+
+    :param description: The description of the script
+    :return: the arguments with the Path and jobs attributes
+    '''
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('Path', metavar='path', type=str,
+                        help='the full path to config file')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of worker processes (default 1 - render in this process)')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    return args
@@ -21,6 +21,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 import xarray as xr
 
+from tc_utils import render_frames, assemble_animation
+
 matplotlib.use('Agg')
 
 
@@ -40,6 +42,76 @@ def plot_cross_section(config, data_set, args):
 
     """
 
+    # the azimuthal mean of the plotted time slice only
+    field = data_set[config['field']]
+    azimuth_dim, time_dim = field.dims[1], field.dims[3]
+    field_azi_mean = field.isel({time_dim: config['index_time_slice']}).mean(dim=azimuth_dim)
+
+    render_cross_section(config, data_set['range'].values,
+                         data_set[config['vertical_coord_name']].values,
+                         field_azi_mean.values,
+                         os.path.join(args.plotdir, config['plot_filename']))
+
+
+def plot_all_cross_sections(config, data_set, args):
+    """
+        Generate the cross-section plots of the field specified in the YAML config file
+        for every time slice. The azimuthal means are computed one time slice at a time
+        and the plots are rendered by a pool of args.workers processes.
+        The plots are named after the plot_filename with the time slice index
+        and they are assembled into an animated GIF if args.animation is set.
+
+       Args:
+          @param config: The config object of items in the YAML configuration file (used to
+                         customize the appearance of the plot).
+          @param data_set: The xarray dataset (gridded data, either netCDF or grib2).
+          @param args: The command line arguments indicating the location of input and output dirs,
+                       the number of worker processes and the animation settings.
+
+       Returns:
+       None, generates output files: .png and .pdf versions of the cross-section plot
+       of each time slice and the optional .gif animation.
+       Requires dask.
+
+    """
+
+    # read and average one time slice at a time, the dask array is
+    # created from the lazily loaded field without reading it
+    field = data_set[config['field']]
+    azimuth_dim, time_dim = field.dims[1], field.dims[3]
+    field = field.chunk({time_dim: 1})
+    field_azi_mean = field.mean(dim=azimuth_dim).transpose(field.dims[0], field.dims[2], time_dim).values
+
+    range_values = data_set['range'].values
+    vertical_values = data_set[config['vertical_coord_name']].values
+    plot_base = os.path.join(args.plotdir, config['plot_filename'])
+    frames = [(config, range_values, vertical_values, field_azi_mean[:, :, itime],
+               f'{plot_base}_{itime:03d}')
+              for itime in range(field_azi_mean.shape[2])]
+    render_frames(render_cross_section, frames, args.workers)
+
+    if args.animation:
+        assemble_animation([frame[-1] + '.png' for frame in frames], plot_base + '.gif',
+                           args.frame_duration)
+
+
+def render_cross_section(config, range_values, vertical_values, field_azi_mean, plot_base):
+    """
+        Render the cross-section plot of the azimuthal mean of one time slice
+
+       Args:
+          @param config: The config object of items in the YAML configuration file (used to
+                         customize the appearance of the plot).
+          @param range_values: The range coordinate values
+          @param vertical_values: The vertical coordinate values
+          @param field_azi_mean: The 2-D array (range, vertical) of the azimuthal mean of the field
+          @param plot_base: The path of the output files without the extension
+
+       Returns:
+       None, generates output files: .png and .pdf versions of the cross-section plot.
+
+    """
+
     # pylint raises issues with the use of 'ax' for matplotlib calls,
     # Keep the use of 'ax' as this is commonly used
     # pylint: disable=invalid-name
@@ -49,12 +121,8 @@ def plot_cross_section(config, data_set, args):
     plot_height = config['plot_size_height']
     fig, ax = plt.subplots(figsize=(plot_width, plot_height))
 
-    field = data_set[config['field']]
-    itime = config['index_time_slice']
-    field_azi_mean = np.mean(field, axis=1)[:, :, itime]
-
-    scalar_contour = ax.contour(data_set['range'],
-                                data_set[config['vertical_coord_name']],
+    scalar_contour = ax.contour(range_values,
+                                vertical_values,
                                 field_azi_mean.transpose(),
                                 levels=np.arange(config['contour_level_start'],
                                                  config['contour_level_end'],
@@ -72,9 +140,9 @@ def plot_cross_section(config, data_set, args):
                             config['y_tick_stepsize']))
     ax.set_yscale(config['y_scale'])
     ax.set_ylim(config['y_lim_start'], config['y_lim_end'])
-    plot_outdir = args.plotdir
-    fig.savefig(os.path.join(plot_outdir, config['plot_filename'] + '.png'), dpi=config['plot_res'])
-    fig.savefig(os.path.join(plot_outdir, config['plot_filename'] + '.pdf'))
+    fig.savefig(plot_base + '.png', dpi=config['plot_res'])
+    fig.savefig(plot_base + '.pdf')
+    plt.close(fig)
 
 
 if __name__ == '__main__':
@@ -93,6 +161,14 @@ if __name__ == '__main__':
     parser.add_argument('--config', type=str,
                         required=True,
                         help='configuration file')
+    parser.add_argument('--all_tracks', action='store_true',
+                        help='plot every time slice instead of index_time_slice')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of processes that render the plots with --all_tracks')
+    parser.add_argument('--animation', action='store_true',
+                        help='assemble the plots of --all_tracks into an animated GIF')
+    parser.add_argument('--frame_duration', type=int, default=500,
+                        help='display time of each animation frame in milliseconds')
 
     input_args = parser.parse_args()
 
@@ -106,4 +182,7 @@ if __name__ == '__main__':
     Read dataset and call for plotting
     """
     input_data = xr.open_dataset(os.path.join(input_args.datadir, input_args.filename))
-    plot_cross_section(plotting_config, input_data, input_args)
+    if input_args.all_tracks:
+        plot_all_cross_sections(plotting_config, input_data, input_args)
+    else:
+        plot_cross_section(plotting_config, input_data, input_args)
@@ -35,7 +35,8 @@ def plot_fields(datadir, plotdir, filename, params):
     valid_time, lat_grid, lon_grid, \
         range_grid, azimuth_grid, pressure_grid, \
         track_data, wind_data, scalar_data \
-        = read_tcrmw(os.path.join(datadir, filename))
+        = read_tcrmw(os.path.join(datadir, filename),
+                     variables=['U', 'UGRD', 'V', 'VGRD', params['scalar_field']])
     lat_track, lon_track \
         = lat_grid[0, 0, :], lon_grid[0, 0, :]
     lat_min, lat_max = lat_track.min(), lat_track.max()
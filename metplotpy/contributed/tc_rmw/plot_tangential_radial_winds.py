@@ -19,11 +19,60 @@ import argparse
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
-import xarray as xr
 import metcalcpy.process_tcrmw as pt
+from tc_utils import open_tcrmw, compute_wind_components, render_frames, assemble_animation
 
 
 def plot_pressure_lev(arg, ds, track_index=0):
+    """
+    Plot the azimuthal means of the tangential wind and temperature
+    at one track point
+    """
+    # Azimuthal averages of the plotted track point only
+    ds_track = ds.isel(track_point=track_index)
+    u_tangential_azi_mean = ds_track['u_tangential'].mean(dim='azimuth', skipna=False).values
+    T_azi_mean = ds_track[arg.T].mean(dim='azimuth', skipna=False).values
+
+    render_pressure_lev(ds['range'].values, ds['pressure'].values,
+                        ds['RMW'].values[track_index],
+                        u_tangential_azi_mean, T_azi_mean,
+                        os.path.join(arg.outputdir, arg.output + ".png"))
+
+
+def plot_all_pressure_levs(arg, ds):
+    """
+    Plot the azimuthal means of the tangential wind and temperature
+    at every track point. The means of all track points are computed at once
+    and the plots are rendered by a pool of arg.workers processes.
+    The plots are named after the output with the track point index
+    and they are assembled into an animated GIF if arg.animation is set.
+    """
+    # Azimuthal averages, dimensions are range, pressure, track_point.
+    # The means of the dask arrays are computed one chunk (track point) at a time
+    u_tangential_azi_mean = ds['u_tangential'].mean(dim='azimuth', skipna=False).values
+    T_azi_mean = ds[arg.T].mean(dim='azimuth', skipna=False).values
+
+    range_values = ds['range'].values
+    pressure_values = ds['pressure'].values
+    rmw = ds['RMW'].values
+    output_base = os.path.join(arg.outputdir, arg.output)
+    frames = [(range_values, pressure_values, rmw[track_index],
+               u_tangential_azi_mean[:, :, track_index], T_azi_mean[:, :, track_index],
+               f'{output_base}_{track_index:03d}.png')
+              for track_index in range(len(rmw))]
+    render_frames(render_pressure_lev, frames, arg.workers)
+
+    if arg.animation:
+        assemble_animation([frame[-1] for frame in frames], output_base + '.gif',
+                           arg.frame_duration)
+
+
+def render_pressure_lev(range_values, pressure_values, rmw,
+                        u_tangential_azi_mean, T_azi_mean, output_file):
+    """
+    Render the plot of the azimuthal means (range, pressure)
+    of the tangential wind and temperature at one track point
+    """
     # Plot setup
     textcolor = (175 / 255, 177 / 255, 179 / 255)
     plt.rcParams['figure.dpi'] = 300
@@ -39,7 +88,7 @@ def plot_pressure_lev(arg, ds, track_index=0):
     # nautical miles to kilometers conversion factor
     nm_to_km = 1.852
     ax.set_xlabel(
-        'Range (RMW = %4.1f km)' % (nm_to_km * ds['RMW'][track_index]))
+        'Range (RMW = %4.1f km)' % (nm_to_km * rmw))
     ax.set_xticks(np.arange(1, 20))
     ax.set_ylabel('Pressure (mb)')
     ax.set_yscale('symlog')
@@ -47,24 +96,18 @@ def plot_pressure_lev(arg, ds, track_index=0):
     ax.set_yticks(np.arange(1000, 250, -100))
     ax.set_yticklabels(np.arange(1000, 250, -100))
 
-    # Azimuthal averages
-    u_radial_azi_mean = np.mean(ds['u_radial'].values, axis=1)
-    u_tangential_azi_mean = np.mean(ds['u_tangential'].values, axis=1)
-    T_azi_mean = np.mean(ds[arg.T].values, axis=1)
-
     # Contour plots
-    u_contour = ax.contour(ds['range'].values, ds['pressure'].values,
-        u_tangential_azi_mean[:, :, track_index].transpose(),
+    u_contour = ax.contour(range_values, pressure_values,
+        u_tangential_azi_mean.transpose(),
         levels=np.arange(5, 40, 5), colors='darkgreen', linewidths=1)
     ax.clabel(u_contour, colors='darkgreen', fmt='%1.0f')
-    T_contour = ax.contour(ds['range'].values, ds['pressure'].values,
-        T_azi_mean[:, :, track_index].transpose(),
+    T_contour = ax.contour(range_values, pressure_values,
+        T_azi_mean.transpose(),
         levels=np.arange(250, 300, 10), colors='darkblue', linewidths=1)
     ax.clabel(T_contour, colors='darkblue', fmt='%1.0f')
 
-    # plt.savefig(os.path.join(args.datadir, 'test.pdf'))
-    output_plot = args.output + ".png"
-    plt.savefig(os.path.join(args.outputdir, output_plot), dpi=300)
+    plt.savefig(output_file, dpi=300)
+    plt.close(fig)
     #plt.show()
 
 
@@ -113,6 +156,19 @@ if __name__ == '__main__':
     parser.add_argument('--levels', type=str,
                         help='vertical height levels',
                         default='100,200,500,1000,1500,2000,3000,4000,5000')
+    parser.add_argument('--track_index', type=int,
+                        help='index of the plotted track point',
+                        default=0)
+    parser.add_argument('--all_tracks', action='store_true',
+                        help='plot every track point instead of track_index')
+    parser.add_argument('--workers', type=int,
+                        help='number of processes that render the plots with --all_tracks',
+                        default=1)
+    parser.add_argument('--animation', action='store_true',
+                        help='assemble the plots of --all_tracks into an animated GIF')
+    parser.add_argument('--frame_duration', type=int,
+                        help='display time of each animation frame in milliseconds',
+                        default=500)
 
     args = parser.parse_args()
 
@@ -154,9 +210,14 @@ if __name__ == '__main__':
     logging.info(('vars', var_list))
 
     """
-    Open dataset
+    Open dataset, only the plotted variables at the plotted track points are read.
+    With all_tracks the variables are dask arrays with one track point per chunk,
+    so the winds and the means are computed one track point at a time
     """
-    ds = pt.read_tcrmw(filename_in)
+    track_indices = None if args.all_tracks else [args.track_index]
+    chunks = {'track_point': 1} if args.all_tracks else None
+    ds = open_tcrmw(filename_in, variables=[args.u, args.v, args.T, 'RMW'],
+                    track_indices=track_indices, chunks=chunks)
 
     """
     Compute interpolation weights
@@ -164,21 +225,21 @@ if __name__ == '__main__':
     pt.compute_interpolation_weights(args, ds, levels)
 
     """
-    Compute tangential and radial wind components
+    Compute tangential and radial wind components of all track points at once
     """
-    u_radial, u_tangential = pt.compute_wind_components(args, ds)
+    u_radial, u_tangential = compute_wind_components(ds, args.u, args.v)
 
     """
-    Write dataset
+    Write dataset of the plotted track points
     """
-    ds['u_radial'] = xr.DataArray(u_radial, coords=ds[args.T].coords)
-    ds['u_tangential'] = xr.DataArray(u_tangential, coords=ds[args.T].coords)
+    ds['u_radial'] = u_radial
+    ds['u_tangential'] = u_tangential
     ds.to_netcdf(filename_out + ".nc")
 
     """
     Make plots
     """
-    plot_pressure_lev(args, ds)
-
-
-
+    if args.all_tracks:
+        plot_all_pressure_levs(args, ds)
+    else:
+        plot_pressure_lev(args, ds)
@@ -13,12 +13,17 @@ import sys
 import logging
 import calendar
 import math
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import xarray as xr
 from netCDF4 import Dataset
 
 # nautical miles to kilometers conversion factor
 nm_to_km = 1.852
 
+# dimensions of the TCRMW variables in the order used by the plots
+tcrmw_dims = ('range', 'azimuth', 'pressure', 'track_point', 'track_line')
+
 def format_valid_time(valid_time):
     """
     Format valid time.
@@ -31,10 +36,135 @@ def format_valid_time(valid_time):
     valid_time_str = '%d %s %2.2d %2.2d:00Z' % (year, month_name, day, hour)
     return valid_time_str
 
-def read_tcrmw(filename):
+def open_tcrmw(filename, variables=None, track_indices=None, chunks=None):
+    """
+        Lazily open the netcdf file generated by the TCRMW tool.
+        Nothing is read from the file until the values are used, so only
+        the selected variables at the selected track points are loaded.
+
+        Args:
+            @param filename: The TCRMW netCDF file
+            @param variables: Names of the variables to keep or None to keep all variables.
+                              The coordinate variables are always kept.
+            @param track_indices: Index, slice or list of indices of the track points to keep
+                                  or None to keep all track points. An integer index removes
+                                  the track_point dimension.
+            @param chunks: Dask chunk sizes, e.g. {'track_point': 1}, to get dask arrays
+                           (requires dask) or None to get lazily loaded numpy arrays
+
+        Returns:
+            @param ds: xarray Dataset with the dimensions ordered as
+                       range, azimuth, pressure, track_point
+    """
+
+    try:
+        ds = xr.open_dataset(filename, chunks=chunks)
+        logging.info('opening ' + filename)
+    except IOError:
+        logging.error('failed to open ' + filename)
+        sys.exit()
+
+    if variables is not None:
+        ds = ds[list(variables)]
+    if track_indices is not None and 'track_point' in ds.dims:
+        ds = ds.isel(track_point=track_indices)
+
+    dims = [dim for dim in tcrmw_dims if dim in ds.dims]
+    return ds.transpose(*dims, ...)
+
+def compute_wind_components(ds, u_name, v_name):
+    """
+        Compute the radial and tangential wind components at all
+        track points at once. The results are the same as the results of
+        metcalcpy process_tcrmw compute_wind_components.
+        e_r = cos(theta) e_x + sin(theta) e_y
+        e_theta = - sin(theta) e_x + cos(theta) e_y
+
+        Args:
+            @param ds: The dataset with the azimuth coordinate and the wind variables
+            @param u_name: The name of the zonal wind variable
+            @param v_name: The name of the meridional wind variable
+
+        Returns:
+            @param u_radial: DataArray of the radial wind with the dimensions of the zonal wind
+            @param u_tangential: DataArray of the tangential wind with the dimensions of the zonal wind
+    """
+    theta = ((np.pi / 180) * ds['azimuth'].values + np.pi / 2).astype(np.float32)
+    mask = np.greater(theta, 2 * np.pi)
+    theta[mask] = theta[mask] - 2 * np.pi
+    theta = xr.DataArray(theta, dims=['azimuth'])
+
+    u = ds[u_name]
+    v = ds[v_name]
+    u_radial = np.cos(theta) * u + np.sin(theta) * v
+    u_tangential = - np.sin(theta) * u + np.cos(theta) * v
+    return u_radial.transpose(*u.dims), u_tangential.transpose(*u.dims)
+
+def render_frames(render_function, frames, workers=1):
+    """
+        Render the frames of the track points with a pool of worker processes.
+
+        Args:
+            @param render_function: A module level function that renders one frame
+            @param frames: List of tuples with the arguments of the function for each frame
+            @param workers: The number of worker processes, 1 renders the frames in this process
+
+        Returns:
+            @param results: List of the function results in the order of the frames
+    """
+    if workers <= 1 or len(frames) <= 1:
+        return [render_function(*frame) for frame in frames]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_function, *frame) for frame in frames]
+        return [future.result() for future in futures]
+
+def assemble_animation(frame_files, animation_file, frame_duration=500):
+    """
+        Assemble the frame images into an animated GIF that loops forever.
+
+        Args:
+            @param frame_files: List of the image files in the order of the frames
+            @param animation_file: The output GIF file
+            @param frame_duration: The display time of each frame in milliseconds
+    """
+    from PIL import Image
+
+    frames = [Image.open(frame_file) for frame_file in frame_files]
+    try:
+        frames[0].save(animation_file, save_all=True, append_images=frames[1:],
+                       duration=frame_duration, loop=0)
+    finally:
+        for frame in frames:
+            frame.close()
+    logging.info('wrote ' + animation_file)
+
+def read_variable(file_id, var, track_indices=None):
+    """
+        Read a variable of the open netcdf file.
+
+        Args:
+            @param file_id: The netCDF4 Dataset
+            @param var: The name of the variable
+            @param track_indices: List of indices of the track points to read
+                                  or None to read all track points
+
+        Returns:
+            @param values: The masked array of the variable values
+    """
+    variable = file_id.variables[var]
+    if track_indices is None or 'track_point' not in variable.dimensions:
+        return variable[:]
+    index = [slice(None)] * variable.ndim
+    index[variable.dimensions.index('track_point')] = track_indices
+    return variable[tuple(index)]
+
+def read_tcrmw(filename, variables=None, track_indices=None):
     """
     Read pressure level variables from
     netcdf file generated by the TCRMW tool.
+    Only the wind and scalar variables in the variables list are read
+    if the list is given, and only the track points in track_indices
+    if they are given.
     """
 
     try:
@@ -44,10 +174,10 @@ def read_tcrmw(filename):
         logging.error('failed to open ' + filename)
         sys.exit()
 
-    valid_time = file_id.variables['valid_time'][:]
+    valid_time = read_variable(file_id, 'valid_time', track_indices)
     # read grid variables
-    lat_grid = file_id.variables['lat'][:]
-    lon_grid = file_id.variables['lon'][:]
+    lat_grid = read_variable(file_id, 'lat', track_indices)
+    lon_grid = read_variable(file_id, 'lon', track_indices)
     range_grid = file_id.variables['range'][:]
     azimuth_grid = file_id.variables['azimuth'][:]
     pressure_grid = file_id.variables['pressure'][:]
@@ -57,9 +187,9 @@ def read_tcrmw(filename):
 
     # read track center and cyclone radius
     track_data = {}
-    track_data['Lat'] = file_id.variables['Lat'][:]
-    track_data['Lon'] = file_id.variables['Lon'][:]
-    track_data['RMW'] = file_id.variables['RMW'][:] * nm_to_km
+    track_data['Lat'] = read_variable(file_id, 'Lat', track_indices)
+    track_data['Lon'] = read_variable(file_id, 'Lon', track_indices)
+    track_data['RMW'] = read_variable(file_id, 'RMW', track_indices) * nm_to_km
     track_data['TrackLines'] = file_id.variables['TrackLines'][:]
 
     # possible U, V variable names
@@ -72,15 +202,17 @@ def read_tcrmw(filename):
     wind_data = {}
     scalar_data = {}
 
-    # read all variables and group as either wind or scalar
+    # read the variables and group as either wind or scalar
     for var in file_id.variables:
+        if variables is not None and var not in variables:
+            continue
         logging.info(var)
         if var in u_vars:
-            wind_data['U'] = file_id.variables[var][:]
+            wind_data['U'] = read_variable(file_id, var, track_indices)
         if var in v_vars:
-            wind_data['V'] = file_id.variables[var][:]
+            wind_data['V'] = read_variable(file_id, var, track_indices)
         if var not in grid_vars.union(track_vars).union(u_vars).union(v_vars):
-            scalar_data[var] = file_id.variables[var][:]
+            scalar_data[var] = read_variable(file_id, var, track_indices)
 
     file_id.close()
 
@@ -148,10 +280,13 @@ def read_vert_interp_tcrmw(filename):
         range_grid, azimuth_grid, pressure_grid, \
         wind_data
 
-def read_tcrmw_levels(filename, levels=['L0']):
+def read_tcrmw_levels(filename, levels=['L0'], variables=None, track_indices=None):
     """
     Read level-labeled variables from
     netcdf file generated by the TCRMW tool.
+    Only the wind and scalar variables in the variables list are read
+    if the list is given, and only the track points in track_indices
+    if they are given.
     """
 
     try:
@@ -161,9 +296,9 @@ def read_tcrmw_levels(filename, levels=['L0']):
         logging.error('failed to open ' + filename)
         sys.exit()
 
-    valid_time = file_id.variables['valid_time'][:]
-    lat_grid = file_id.variables['lat'][:]
-    lon_grid = file_id.variables['lon'][:]
+    valid_time = read_variable(file_id, 'valid_time', track_indices)
+    lat_grid = read_variable(file_id, 'lat', track_indices)
+    lon_grid = read_variable(file_id, 'lon', track_indices)
 
     logging.debug('lat_grid.shape=' + str(lat_grid.shape))
     logging.debug('lon_grid.shape=' + str(lon_grid.shape))
@@ -177,13 +312,15 @@ def read_tcrmw_levels(filename, levels=['L0']):
         v_vars = set(['V_' + level, 'VGRD_' + level])
 
         for var in file_id.variables:
+            if variables is not None and var not in variables:
+                continue
             logging.info(var)
             if var in u_vars:
-                wind_data['U'] = file_id.variables[var][:]
+                wind_data['U'] = read_variable(file_id, var, track_indices)
             if var in v_vars:
-                wind_data['V'] = file_id.variables[var][:]
+                wind_data['V'] = read_variable(file_id, var, track_indices)
             if var not in grid_vars.union(u_vars).union(v_vars):
-                scalar_data[var] = file_id.variables[var][:]
+                scalar_data[var] = read_variable(file_id, var, track_indices)
 
     file_id.close()
 
@@ -22,7 +22,6 @@ from itertools import chain
 
 import yaml
 import numpy as np
-import pandas as pd
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -34,7 +33,7 @@ from metplotpy.plots.bar.bar_series import BarSeries
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots import util
 
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 
 
 class Bar(BasePlot):
@@ -73,7 +72,7 @@ class Bar(BasePlot):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -106,8 +105,8 @@ class Bar(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
-                           header='infer', float_precision='round_trip')
+        return self._read_stat_input(self.config_obj.get_stat_input_columns(),
+                                     self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -452,7 +451,7 @@ class Bar(BasePlot):
             f.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, bar plot using the
             default and custom config files on sample data found in this directory.
@@ -460,6 +459,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -481,6 +481,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
@@ -96,43 +96,18 @@ class BarSeries(Series):
                     if utils.is_string_integer(filter_val):
                         filter_list[i] = int(filter_val)
 
-                all_filters.append((self.input_data[field].isin(filter_list)))
+                all_filters.append((field, filter_list))
 
             # filter by provided indy
-            # Duck typing is different in Python 3.6 and Python 3.8, for
-            # Python 3.8 and above, explicitly type cast the self.input_data[self.config.indy_var]
-            # Panda Series object to 'str' if the list of indy_vals are of str type.
-            # This will ensure we are doing str to str comparisons.
+            # explicitly do str to str comparisons if the list of indy_vals are of str type
+            all_filters.append((self.config.indy_var, self.config.indy_vals))
             if isinstance(self.config.indy_vals[0], str):
-                indy_var_series = self.input_data[self.config.indy_var].astype(str)
+                str_columns = [self.config.indy_var]
             else:
-                indy_var_series = self.input_data[self.config.indy_var]
-
-            all_filters.append(indy_var_series.isin(self.config.indy_vals))
-
-            # use numpy to select the rows where any record evaluates to True
-            mask = np.array(all_filters).all(axis=0)
-            self.series_data = self.input_data.loc[mask]
-
-            # sort data by date/time - needed for CI calculations
-            if 'fcst_lead' in self.series_data.columns:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid', 'fcst_lead'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init', 'fcst_lead'])
-            else:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init'])
+                str_columns = None
+
+            # select the rows where all filters evaluate to True
+            self.series_data = self._select_series_data(all_filters, str_columns)
 
         else:
             # this is a derived series
@@ -14,12 +14,203 @@ Class Name: base_plot.py
  """
 __author__ = 'Tatiana Burek'
 
+import atexit
+import multiprocessing
 import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 import yaml
 from typing import Union
 
 from .config import Config
+from .util import read_stat_input
+from .stat_input_cache import StatInputCache
+
+# the parsed stat_input files shared by the plots created inside share_stat_input()
+_SHARED_STAT_INPUT = None
+
+# the stat_input cache directory shared by the processes that use share_stat_input(cache_dir)
+_SHARED_STAT_INPUT_DIR = None
+
+
+@contextmanager
+def share_stat_input(cache_dir: Union[str, None] = None):
+    """Shares the parsed stat_input files between the plots created inside the context.
+    Each file is parsed once with all columns and every plot gets its own
+    shallow copy (or its own subset of the columns) of the data frame.
+    If cache_dir is set the parsed files are also saved there as Arrow IPC files
+    (see StatInputCache), so other processes that use the same cache_dir
+    memory-map them instead of parsing the files again.
+    The nested contexts reuse the outer one.
+
+    To use:
+        with share_stat_input():
+            Line(docs_1)
+            Line(docs_2)
+    """
+    global _SHARED_STAT_INPUT, _SHARED_STAT_INPUT_DIR
+    if _SHARED_STAT_INPUT is not None:
+        yield
+        return
+    _SHARED_STAT_INPUT = {}
+    _SHARED_STAT_INPUT_DIR = cache_dir
+    try:
+        yield
+    finally:
+        _SHARED_STAT_INPUT = None
+        _SHARED_STAT_INPUT_DIR = None
+
+
+# the exporter used by BasePlot.save_to_file() inside export_in_background()
+_BACKGROUND_EXPORTER = None
+
+# the exporter shared by the asynchronous export methods outside export_in_background()
+_DEFAULT_EXPORTER = None
+
+
+def _start_exporter() -> None:
+    """Starts Kaleido in the exporter process, so the first figure
+    doesn't wait for the Chromium start
+    """
+    import plotly.io as pio
+    pio.to_image({'data': [], 'layout': {}}, format='png', width=10, height=10)
+
+
+def _export_figure(figure: dict, outputs: list, width, height, scale) -> list:
+    """Exports the figure to the images in the exporter process.
+    The figure is converted to JSON once and all the images are created from it.
+
+    :param figure: the figure as a dictionary
+    :param outputs: list of (image format, image file) pairs; the format is
+        inferred from the file extension if it is None and the image is returned
+        instead of being written if the file is None
+    :param width: the image width in pixels or None
+    :param height: the image height in pixels or None
+    :param scale: the image scale or None
+    :return: list with the image bytes or the image file for each output
+    """
+    import plotly.io as pio
+    results = []
+    for image_format, image_name in outputs:
+        if image_name is None:
+            results.append(pio.to_image(figure, format=image_format, width=width,
+                                        height=height, scale=scale, validate=False))
+        else:
+            pio.write_image(figure, image_name, format=image_format, width=width,
+                            height=height, scale=scale, validate=False)
+            results.append(image_name)
+    return results
+
+
+class ImageExporter:
+    """Exports Plotly figures to images in a pool of warm exporter processes.
+    Each process keeps its Kaleido (Chromium) process alive between figures, so
+    only the first figure pays for its start. The figures are queued to the
+    processes and the results are returned as futures, so the caller can build
+    the next figure while the previous one is rasterized.
+
+     To use:
+        exporter = ImageExporter(workers=2)
+        future = exporter.submit(figure, [(None, 'plot.png'), ('svg', 'plot.svg')])
+        future.result()
+        exporter.shutdown()
+    """
+
+    def __init__(self, workers: int = 1):
+        """Starts the exporter processes
+
+        Args:
+            @param workers: the number of exporter processes
+        """
+        if workers < 1:
+            raise ValueError('The number of exporter processes must be at least 1')
+        self.workers = workers
+        # Kaleido runs threads and a subprocess, so the exporters are not forked
+        self._executor = ProcessPoolExecutor(max_workers=workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_start_exporter)
+        self._pending = set()
+
+    def submit(self, figure, outputs: list, width=None, height=None, scale=None) -> Future:
+        """Queues the figure to the exporter processes
+
+        Args:
+            @param figure: the Plotly figure or its dictionary
+            @param outputs: list of (image format, image file) pairs; the format is
+              inferred from the file extension if it is None and the image is returned
+              instead of being written if the file is None
+            @param width: the image width in pixels or None
+            @param height: the image height in pixels or None
+            @param scale: the image scale or None
+
+        Returns:
+            - a future with the list of the image bytes or the image file for each output
+        """
+        if not isinstance(figure, dict):
+            figure = figure.to_dict()
+        future = self._executor.submit(_export_figure, figure, list(outputs), width, height, scale)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def wait(self) -> None:
+        """Waits until all queued figures are exported
+        """
+        for future in list(self._pending):
+            try:
+                future.result()
+            except Exception:
+                # the error is reported by the owner of the future
+                pass
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops the exporter processes
+
+        Args:
+            @param wait: True to wait for the queued figures
+        """
+        self._executor.shutdown(wait=wait)
+
+
+def get_image_exporter() -> ImageExporter:
+    """Returns the exporter used by the asynchronous export methods:
+    the one of export_in_background() or the shared one with one process
+    that is created on the first call and stopped at exit
+    """
+    global _DEFAULT_EXPORTER
+    if _BACKGROUND_EXPORTER is not None:
+        return _BACKGROUND_EXPORTER
+    if _DEFAULT_EXPORTER is None:
+        _DEFAULT_EXPORTER = ImageExporter()
+        atexit.register(_DEFAULT_EXPORTER.shutdown)
+    return _DEFAULT_EXPORTER
+
+
+@contextmanager
+def export_in_background(workers: int = 1):
+    """Exports the images of the plots created inside the context in a pool
+    of warm exporter processes (see ImageExporter). BasePlot.save_to_file() queues
+    the figure and returns, so the next plot is built while the image is rasterized.
+    The context waits for all images when it exits.
+    The nested contexts reuse the outer one.
+
+    To use:
+        with export_in_background(workers=2):
+            Line(docs_1).save_to_file()
+            Line(docs_2).save_to_file()
+    """
+    global _BACKGROUND_EXPORTER
+    if _BACKGROUND_EXPORTER is not None:
+        yield _BACKGROUND_EXPORTER
+        return
+    exporter = ImageExporter(workers)
+    _BACKGROUND_EXPORTER = exporter
+    try:
+        yield exporter
+    finally:
+        _BACKGROUND_EXPORTER = None
+        exporter.shutdown(wait=True)
 
 
 class BasePlot:
@@ -308,6 +499,83 @@ class BasePlot:
                 return self._get_nested(value, args[1:])
         return None
 
+    def _read_stat_input(self, columns: Union[list, None] = None,
+                         categorical_columns: Union[list, None] = None):
+        """Reads the stat_input file specified in the config file into a pandas dataframe.
+        The parser, the type of the floating point columns and the storage of
+        the label columns as categorical data are controlled by the optional
+        stat_input_engine ('c' by default), stat_input_float_type ('float64' by default)
+        and stat_input_categorical (True by default) settings.
+        If stat_input_cache_dir is set the parsed data is cached in this directory
+        and reused while the stat_input file doesn't change. The size of the cache
+        is limited by stat_input_cache_size (in MB)
+
+        Args:
+            @param columns - names of the columns to read or None to read all columns
+            @param categorical_columns - names of the label columns that can be stored
+                                         as categorical data
+
+        Returns:
+            - the stat_input data
+        """
+        engine = self.get_config_value('stat_input_engine')
+        float_type = self.get_config_value('stat_input_float_type')
+        categorical = self.get_config_value('stat_input_categorical')
+        if categorical is not None and categorical is not True \
+                and str(categorical).lower() != 'true':
+            categorical_columns = None
+
+        file_name = self.get_config_value('stat_input')
+        options = {'columns': columns,
+                   'categorical_columns': categorical_columns,
+                   'float_type': float_type if float_type else 'float64'}
+
+        engine = engine if engine else 'c'
+
+        if _SHARED_STAT_INPUT is None:
+            return self._load_stat_input(file_name, options, engine)
+
+        # parse all columns once and select the requested columns for each plot
+        file_stat = os.stat(file_name)
+        key = (os.path.realpath(file_name), file_stat.st_size, file_stat.st_mtime_ns,
+               str(options['categorical_columns']), options['float_type'])
+        if key not in _SHARED_STAT_INPUT:
+            _SHARED_STAT_INPUT[key] = self._load_stat_input(file_name, {**options, 'columns': None},
+                                                            engine, _SHARED_STAT_INPUT_DIR)
+        input_data = _SHARED_STAT_INPUT[key]
+        if columns is None:
+            return input_data.copy(deep=False)
+        return input_data[[column for column in input_data.columns if column in columns]]
+
+    def _load_stat_input(self, file_name: str, options: dict, engine: str,
+                         cache_dir: Union[str, None] = None):
+        """Reads the stat_input file from the stat_input_cache_dir cache if it is set
+        or parses it and saves it to the cache
+
+        Args:
+            @param file_name - the path to the stat_input file
+            @param options - the columns, categorical_columns and float_type arguments
+                             of read_stat_input
+            @param engine - the parser to use
+            @param cache_dir - the cache directory to use if stat_input_cache_dir is not set
+
+        Returns:
+            - the stat_input data
+        """
+        cache = None
+        if self.get_config_value('stat_input_cache_dir'):
+            cache_dir = self.get_config_value('stat_input_cache_dir')
+        if cache_dir:
+            cache = StatInputCache(cache_dir, self.get_config_value('stat_input_cache_size'))
+            input_data = cache.get(file_name, options)
+            if input_data is not None:
+                return input_data
+
+        input_data = read_stat_input(file_name, engine=engine, **options)
+        if cache is not None:
+            cache.put(file_name, options, input_data)
+        return input_data
+
     def get_img_bytes(self):
         """Returns an image as a bytes object in a format specified in the config file
 
@@ -324,15 +592,48 @@ class BasePlot:
 
         return None
 
+    def get_img_bytes_async(self) -> Union[Future, None]:
+        """Queues the figure to the exporter processes (see get_image_exporter)
+
+        Args:
+
+        Returns:
+            - a future with the image as a bytes object in a format specified
+              in the config file or None if the figure was not created
+        """
+        if not self.figure:
+            return None
+        future = get_image_exporter().submit(self.figure,
+                                             [(self.get_config_value('image_format'), None)],
+                                             width=self.get_config_value('width'),
+                                             height=self.get_config_value('height'),
+                                             scale=self.get_config_value('scale'))
+        result = Future()
+
+        def _copy_result(export_future):
+            if export_future.exception() is not None:
+                result.set_exception(export_future.exception())
+            else:
+                result.set_result(export_future.result()[0])
+
+        future.add_done_callback(_copy_result)
+        return result
+
     def save_to_file(self):
         """Saves the image to a file specified in the config file.
-         Prints a message if fails
+         Prints a message if fails.
+         Inside export_in_background() the image is queued to the exporter processes
+         and the method returns before the file is written
 
         Args:
 
         Returns:
 
         """
+        if _BACKGROUND_EXPORTER is not None:
+            self.save_to_file_async()
+            return
+
         image_name = self.get_config_value('plot_filename')
 
         # Create the directory for the output plot if it doesn't already exist
@@ -349,6 +650,50 @@ class BasePlot:
         else:
             print("Oops!  The figure was not created. Can't save.")
 
+    def save_to_file_async(self, formats: Union[list, None] = None) -> Union[Future, None]:
+        """Queues the figure to the exporter processes (see get_image_exporter)
+         that save it to a file specified in the config file and, in the same pass,
+         to the files with the same name and the extensions of the additional formats.
+         Prints a message if fails
+
+        Args:
+            @param formats: the additional image formats, for example ['svg', 'pdf']
+
+        Returns:
+            - a future with the list of the saved files or None if the figure was not created
+        """
+        image_name = self.get_config_value('plot_filename')
+
+        # Create the directory for the output plot if it doesn't already exist
+        dirname = os.path.dirname(os.path.abspath(image_name))
+        if not os.path.exists(dirname):
+            os.mkdir(dirname)
+        if not self.figure:
+            print("Oops!  The figure was not created. Can't save.")
+            return None
+
+        outputs = [(None, image_name)]
+        if formats:
+            image_root = os.path.splitext(image_name)[0]
+            for image_format in formats:
+                if image_format not in self.IMAGE_FORMATS:
+                    raise ValueError(f'Unsupported image format {image_format}. '
+                                     f'Supported formats are {", ".join(self.IMAGE_FORMATS)}')
+                file_name = f'{image_root}.{image_format}'
+                if file_name != image_name:
+                    outputs.append((image_format, file_name))
+
+        def _print_error(export_future):
+            ex = export_future.exception()
+            if isinstance(ex, FileNotFoundError):
+                print("Can't save to file " + image_name)
+            elif ex is not None:
+                print(ex)
+
+        future = get_image_exporter().submit(self.figure, outputs)
+        future.add_done_callback(_print_error)
+        return future
+
     def remove_file(self):
         """Removes previously made image file .
         """
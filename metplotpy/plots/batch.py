@@ -0,0 +1,314 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Class Name: batch.py
+
+Renders many plots in one process or in a pool of worker processes.
+The configuration files are grouped by stat_input so each file is parsed once,
+and all images of a process are exported by the same (warm) Kaleido process.
+The worker processes share the parsed stat_input files through memory-mapped
+Arrow IPC files.
+With --export-workers the images are exported by a pool of warm exporter
+processes while the next plots are built (one process mode only).
+Every plot is created by the main() function of its plot type, so the output
+is the same as the output of the single plot entry points.
+
+Usage:
+    python batch.py [--jobs 8 | --export-workers 2] --plot line 'line_configs/*.yaml' --plot box box1.yaml box2.yaml
+ """
+
+import argparse
+import glob
+import importlib
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Union
+
+import yaml
+
+from metplotpy.plots.base_plot import share_stat_input, export_in_background
+
+# plot types supported by the batch mode and the modules with their main() functions
+PLOT_MODULES = {
+    'bar': 'metplotpy.plots.bar.bar',
+    'box': 'metplotpy.plots.box.box',
+    'contour': 'metplotpy.plots.contour.contour',
+    'eclv': 'metplotpy.plots.eclv.eclv',
+    'ens_ss': 'metplotpy.plots.ens_ss.ens_ss',
+    'equivalence_testing_bounds': 'metplotpy.plots.equivalence_testing_bounds.equivalence_testing_bounds',
+    'histogram_2d': 'metplotpy.plots.histogram_2d.histogram_2d',
+    'hovmoeller': 'metplotpy.plots.hovmoeller.hovmoeller',
+    'line': 'metplotpy.plots.line.line',
+    'mpr_plot': 'metplotpy.plots.mpr_plot.mpr_plot',
+    'performance_diagram': 'metplotpy.plots.performance_diagram.performance_diagram',
+    'prob_hist': 'metplotpy.plots.histogram.prob_hist',
+    'rank_hist': 'metplotpy.plots.histogram.rank_hist',
+    'rel_hist': 'metplotpy.plots.histogram.rel_hist',
+    'reliability': 'metplotpy.plots.reliability_diagram.reliability',
+    'revision_box': 'metplotpy.plots.revision_box.revision_box',
+    'revision_series': 'metplotpy.plots.revision_series.revision_series',
+    'roc_diagram': 'metplotpy.plots.roc_diagram.roc_diagram',
+    'taylor_diagram': 'metplotpy.plots.taylor_diagram.taylor_diagram',
+    'wind_rose': 'metplotpy.plots.wind_rose.wind_rose',
+}
+
+# a plot to render: the plot type and the path to its configuration file
+BatchItem = namedtuple('BatchItem', ['plot_type', 'config_file'])
+
+# the result of rendering one plot: the time in seconds and the error message or None
+BatchResult = namedtuple('BatchResult', ['plot_type', 'config_file', 'seconds', 'error'])
+
+
+def expand_configs(plot_type: str, patterns: list) -> list:
+    """
+    Creates the batch items for the configuration files that match the patterns
+    :param plot_type: the plot type, one of the PLOT_MODULES keys
+    :param patterns: paths or glob patterns of the configuration files
+    :return: list of BatchItem in the order of the patterns
+    """
+    if plot_type not in PLOT_MODULES:
+        raise ValueError(f'Unsupported plot type {plot_type}. '
+                         f'Supported types are {", ".join(PLOT_MODULES)}')
+    items = []
+    for pattern in patterns:
+        config_files = sorted(glob.glob(pattern))
+        if not config_files:
+            raise ValueError(f'No configuration files match {pattern}')
+        items.extend(BatchItem(plot_type, config_file) for config_file in config_files)
+    return items
+
+
+def group_by_stat_input(items: list) -> list:
+    """
+    Groups the batch items by the stat_input file of their configuration.
+    The groups and the items in each group keep the original order.
+    :param items: list of BatchItem
+    :return: list of lists of BatchItem
+    """
+    groups = {}
+    for item in items:
+        with open(item.config_file, 'r') as stream:
+            try:
+                docs = yaml.load(stream, Loader=yaml.FullLoader)
+            except yaml.YAMLError:
+                docs = None
+        stat_input = docs.get('stat_input') if isinstance(docs, dict) else None
+        key = os.path.realpath(stat_input) if stat_input else item.config_file
+        groups.setdefault(key, []).append(item)
+    return list(groups.values())
+
+
+def render_batch(items: list, log=None, jobs: int = 1, export_workers: int = 0) -> list:
+    """
+    Renders the plots. The plots that use the same stat_input file are rendered
+    one after another and share the parsed data frame. An error in one plot
+    doesn't stop the batch.
+    If jobs > 1 the plots are rendered by a pool of worker processes.
+    The first plot of each stat_input group saves the parsed data frame to
+    a temporary Arrow IPC file and the other plots of the group are started
+    after it so they memory-map the file instead of parsing the stat_input again.
+    :param items: list of BatchItem
+    :param log: a function that is called with each BatchResult or None
+    :param jobs: the number of worker processes
+    :param export_workers: the number of the background image exporter processes
+        used if jobs is 1; 0 to export the images in the rendering process.
+        The images are written when the function returns and the export errors
+        are printed but not included in the results
+    :return: list of BatchResult in the order of the groups; the order
+        doesn't depend on the number of jobs
+    """
+    groups = group_by_stat_input(items)
+    if jobs > 1 and len(items) > 1:
+        return _render_parallel(groups, log, jobs)
+
+    if export_workers > 0:
+        with export_in_background(export_workers):
+            return render_batch(items, log)
+
+    results = []
+    for group in groups:
+        # release the data frame of the previous group
+        with share_stat_input():
+            for item in group:
+                result = render_plot(item)
+                results.append(result)
+                if log is not None:
+                    log(result)
+    return results
+
+
+def _render_parallel(groups: list, log, jobs: int) -> list:
+    """
+    Renders the groups of plots with a pool of worker processes
+    :param groups: list of lists of BatchItem
+    :param log: a function that is called with each BatchResult or None
+    :param jobs: the number of worker processes
+    :return: list of BatchResult in the order of the groups
+    """
+    ordered_items = [item for group in groups for item in group]
+    results = [None] * len(ordered_items)
+    logged = 0
+
+    # the data frames are shared through the Arrow IPC files that require pyarrow,
+    # without it every plot parses its stat_input
+    share = importlib.util.find_spec('pyarrow') is not None
+
+    with tempfile.TemporaryDirectory(prefix='metplotpy_batch_') as tmp_dir, \
+            ProcessPoolExecutor(max_workers=jobs) as executor:
+        cache_dir = tmp_dir if share else None
+        futures = {}
+        waiting_groups = {}
+
+        def submit(position):
+            try:
+                futures[executor.submit(render_plot, ordered_items[position], cache_dir)] = position
+            except Exception:
+                # the pool is broken
+                results[position] = _failed_result(ordered_items[position])
+
+        position = 0
+        for group in groups:
+            if share:
+                # start the first plot of the group, the others wait for its data frame
+                submit(position)
+                waiting_groups[position] = range(position + 1, position + len(group))
+            else:
+                for group_position in range(position, position + len(group)):
+                    submit(group_position)
+            position += len(group)
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                position = futures.pop(future)
+                try:
+                    results[position] = future.result()
+                except Exception:
+                    # the worker process died
+                    results[position] = _failed_result(ordered_items[position])
+                for waiting in waiting_groups.pop(position, []):
+                    submit(waiting)
+
+            # log the results in the deterministic order
+            while logged < len(results) and results[logged] is not None:
+                if log is not None:
+                    log(results[logged])
+                logged += 1
+    return results
+
+
+def _failed_result(item: BatchItem) -> BatchResult:
+    """
+    Creates the result of the plot that couldn't be rendered from the current exception
+    :param item: the plot type and the configuration file
+    :return: the result with the error
+    """
+    return BatchResult(item.plot_type, item.config_file, 0.0,
+                       traceback.format_exc(limit=-1).strip())
+
+
+def render_plot(item: BatchItem, cache_dir: Union[str, None] = None) -> BatchResult:
+    """
+    Renders one plot with the main() function of its plot type.
+    The errors, including SystemExit, are returned in the result
+    :param item: the plot type and the configuration file
+    :param cache_dir: the directory of the parsed stat_input files shared
+        by the processes or None
+    :return: the result with the rendering time
+    """
+    if cache_dir is not None:
+        with share_stat_input(cache_dir):
+            return render_plot(item)
+
+    start = time.perf_counter()
+    error = None
+    try:
+        module = importlib.import_module(PLOT_MODULES[item.plot_type])
+        # main() prints the ValueError and returns if raise_errors is not set
+        module.main(item.config_file, raise_errors=True)
+    except (Exception, SystemExit):
+        # some plots call sys.exit() if the input can't be read
+        error = traceback.format_exc(limit=-1).strip()
+    return BatchResult(item.plot_type, item.config_file, time.perf_counter() - start, error)
+
+
+def print_result(result: BatchResult) -> None:
+    """
+    Prints the time of the plot and its error if the plot failed
+    :param result: the result of rendering the plot
+    """
+    status = 'OK' if result.error is None else 'FAILED'
+    print(f'{result.seconds:8.2f} s  {status:6s} {result.plot_type:28s} {result.config_file}')
+    if result.error is not None:
+        print(result.error)
+
+
+def print_failures(results: list) -> None:
+    """
+    Prints the list of the failed plots with their errors
+    :param results: list of BatchResult
+    """
+    failed = [result for result in results if result.error is not None]
+    if not failed:
+        return
+    print(f'\n{len(failed)} failed plots:')
+    for result in failed:
+        print(f'{result.plot_type} {result.config_file}:')
+        print(result.error.splitlines()[-1])
+
+
+def main(args: Union[list, None] = None) -> int:
+    """
+    Renders the plots from the command line arguments
+    :param args: the command line arguments or None to use sys.argv
+    :return: the number of the failed plots
+    """
+    parser = argparse.ArgumentParser(description='Renders many METplotpy plots in one or more processes')
+    parser.add_argument('--plot', nargs='+', action='append', required=True,
+                        metavar=('PLOT_TYPE', 'CONFIG'),
+                        help='plot type followed by the paths or glob patterns of its '
+                             f'configuration files. Plot types: {", ".join(PLOT_MODULES)}')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of worker processes (default 1 - render in this process)')
+    parser.add_argument('--export-workers', type=int, default=0,
+                        help='number of background image exporter processes with --jobs 1 '
+                             '(default 0 - export in the rendering process)')
+    parsed_args = parser.parse_args(args)
+    if parsed_args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if parsed_args.export_workers < 0:
+        parser.error('--export-workers must not be negative')
+
+    items = []
+    for plot_args in parsed_args.plot:
+        if len(plot_args) < 2:
+            parser.error(f'--plot {plot_args[0]}: no configuration files')
+        try:
+            items.extend(expand_configs(plot_args[0], plot_args[1:]))
+        except ValueError as val_er:
+            parser.error(str(val_er))
+
+    start = time.perf_counter()
+    results = render_batch(items, print_result, parsed_args.jobs, parsed_args.export_workers)
+    print_failures(results)
+    failed = sum(1 for result in results if result.error is not None)
+    print(f'{len(results)} plots, {failed} failed, {time.perf_counter() - start:.2f} s')
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -21,17 +21,18 @@ from typing import Union
 from operator import add
 from itertools import chain
 import yaml
-import pandas as pd
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from plotly.graph_objects import Figure
 
 import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots.box.box_config import BoxConfig
 from metplotpy.plots.box.box_series import BoxSeries
+from metplotpy.plots.box.box_statistics import calculate_box_statistics
 from metplotpy.plots import util
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
 
@@ -72,7 +73,7 @@ class Box(BasePlot):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -99,8 +100,8 @@ class Box(BasePlot):
             Returns:
 
         """
-        file = self.config_obj.parameters['stat_input']
-        return pd.read_csv(file, sep='\t', header='infer', float_precision='round_trip')
+        return self._read_stat_input(self.config_obj.get_stat_input_columns(),
+                                     self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -235,10 +236,21 @@ class Box(BasePlot):
             marker_symbol = 'circle'
             marker_line_color = series.color
 
+        if self.config_obj.box_precomputed:
+            # send only the statistics of the boxes (and the points to display) to Plotly
+            box_data = calculate_box_statistics(series.series_data['stat_value'],
+                                                series.series_data[self.config_obj.indy_var],
+                                                self.config_obj.boxpoints,
+                                                self.config_obj.box_notch,
+                                                self.config_obj.box_avg)
+        else:
+            box_data = dict(x=series.series_data[self.config_obj.indy_var],
+                            y=series.series_data['stat_value'],
+                            boxpoints=self.config_obj.boxpoints)
+
         # create a trace
         self.figure.add_trace(
-            go.Box(x=series.series_data[self.config_obj.indy_var],
-                   y=series.series_data['stat_value'],
+            go.Box(**box_data,
                    notched=self.config_obj.box_notch,
                    line=line_color,
                    fillcolor=fillcolor,
@@ -246,7 +258,6 @@ class Box(BasePlot):
                    showlegend=True,
                    # quartilemethod='linear', #"exclusive", "inclusive", or "linear"
                    boxmean=self.config_obj.box_avg,
-                   boxpoints=self.config_obj.boxpoints,  # outliers, all, False
                    pointpos=0,
                    marker=dict(size=4,
                                color=marker_color,
@@ -588,7 +599,7 @@ class Box(BasePlot):
                     file_object.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
         Generates a sample, default, box plot using a combination of
         default and custom config files on sample data found in this directory.
@@ -596,6 +607,7 @@ def main(config_filename=None):
         custom config file.
         Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
     """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -618,6 +630,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 
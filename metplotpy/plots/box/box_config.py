@@ -147,6 +147,9 @@ class BoxConfig(Config):
         if self.box_pts is True:
             self.boxpoints = 'all'
 
+        # calculate the box statistics instead of sending all values to Plotly
+        self.box_precomputed = self._get_bool('box_precomputed')
+
     def _get_plot_disp(self) -> list:
         """
         Retrieve the values that determine whether to display a particular series
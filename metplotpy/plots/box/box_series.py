@@ -16,7 +16,6 @@ __author__ = 'Tatiana Burek'
 from typing import Union
 import re
 
-import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
@@ -109,23 +108,12 @@ class BoxSeries(Series):
                     if utils.is_string_integer(filter_val):
                         filter_list[i] = int(filter_val)
 
-                all_filters.append((self.input_data[field].isin(filter_list)))
+                all_filters.append((field, filter_list))
 
             # filter by provided indy
-            all_filters.append((self.input_data[self.config.indy_var].isin(self.config.indy_vals)))
-            # use numpy to select the rows where any record evaluates to True
-            mask = np.array(all_filters).all(axis=0)
-            self.series_data = self.input_data.loc[mask]
-
-            # sort data by date/time - needed for CI calculations
-            if 'fcst_valid_beg' in self.series_data.columns:
-                self.series_data = self.series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
-            if 'fcst_valid' in self.series_data.columns:
-                self.series_data = self.series_data.sort_values(['fcst_valid', 'fcst_lead'])
-            if 'fcst_init_beg' in self.series_data.columns:
-                self.series_data = self.series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
-            if 'fcst_init' in self.series_data.columns:
-                self.series_data = self.series_data.sort_values(['fcst_init', 'fcst_lead'])
+            all_filters.append((self.config.indy_var, self.config.indy_vals))
+            # select the rows where all filters evaluate to True
+            self.series_data = self._select_series_data(all_filters)
 
         else:
             # this is a derived series
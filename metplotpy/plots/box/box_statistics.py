@@ -0,0 +1,124 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Class Name: box_statistics.py
+ """
+
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+
+def calculate_box_statistics(values, positions=None, boxpoints: Union[str, bool] = 'outliers',
+                             notched: bool = False, box_mean: bool = False) -> dict:
+    """
+    Calculates the statistics of the boxes the same way as Plotly does it
+    for the raw values (the default 'linear' quartile method) and returns them
+    as the arguments of the Plotly precomputed box: q1, median, q3, lowerfence,
+    upperfence, boxpoints and, if needed, mean, notchspan and the points to display.
+    The size of the figure doesn't depend on the number of values because only
+    the outliers are sent to Plotly if boxpoints is 'outliers'.
+
+    :param values: the values of the boxes, NaN values are ignored
+    :param positions: the position (x value) of each value or None for one box
+    :param boxpoints: Plotly boxpoints - 'outliers', 'all' or False
+    :param notched: if the notch spans should be calculated
+    :param box_mean: if the means should be calculated
+    :return: a dictionary with the go.Box arguments. If positions are provided,
+        the 'x' argument has the positions of the boxes in the order of
+        their first appearance
+    """
+    values = np.asarray(values, dtype=float)
+    if positions is None:
+        positions = np.zeros(len(values), dtype=int)
+        with_positions = False
+    else:
+        positions = np.asarray(positions)
+        with_positions = True
+
+    # Plotly ignores the values that are not numbers
+    is_valid = ~np.isnan(values)
+    values = values[is_valid]
+    positions = positions[is_valid]
+
+    # the codes of the boxes in the order of their first appearance
+    codes, unique_positions = pd.factorize(positions)
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    boundaries = np.searchsorted(codes[order], np.arange(len(unique_positions) + 1))
+
+    statistics = {'q1': [], 'median': [], 'q3': [], 'lowerfence': [], 'upperfence': []}
+    if box_mean:
+        statistics['mean'] = []
+    if notched:
+        statistics['notchspan'] = []
+    points = []
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        box_values = sorted_values[start:end]
+        q1 = _interpolate(box_values, 0.25)
+        median = _interpolate(box_values, 0.5)
+        q3 = _interpolate(box_values, 0.75)
+        statistics['q1'].append(q1)
+        statistics['median'].append(median)
+        statistics['q3'].append(q3)
+
+        # the most extreme values within 1.5 IQR from the box
+        low_index = np.searchsorted(box_values, 2.5 * q1 - 1.5 * q3, side='left')
+        lower_fence = min(q1, box_values[min(low_index, len(box_values) - 1)])
+        high_index = np.searchsorted(box_values, 2.5 * q3 - 1.5 * q1, side='right') - 1
+        upper_fence = max(q3, box_values[max(high_index, 0)])
+        if not boxpoints:
+            # without points the whiskers go to the minimum and maximum
+            statistics['lowerfence'].append(box_values[0])
+            statistics['upperfence'].append(box_values[-1])
+        else:
+            statistics['lowerfence'].append(lower_fence)
+            statistics['upperfence'].append(upper_fence)
+
+        if box_mean:
+            statistics['mean'].append(box_values.mean())
+        if notched:
+            statistics['notchspan'].append(1.57 * (q3 - q1) / np.sqrt(len(box_values)))
+
+        if boxpoints == 'all':
+            points.append(box_values)
+        elif boxpoints == 'outliers':
+            points.append(box_values[(box_values < lower_fence) | (box_values > upper_fence)])
+
+    result = {key: np.array(value, dtype=float) for key, value in statistics.items()}
+    # Plotly draws the whiskers of the precomputed boxes to the fences only if
+    # boxpoints is set, otherwise it extends them to the notches
+    result['boxpoints'] = boxpoints if boxpoints else 'outliers'
+    if any(len(box_points) > 0 for box_points in points):
+        result['y'] = [box_points.tolist() for box_points in points]
+    if with_positions:
+        result['x'] = list(unique_positions)
+    return result
+
+
+def _interpolate(sorted_values: np.ndarray, quantile: float) -> float:
+    """
+    Calculates the quantile of the sorted values like Plotly
+    (Lib.interp, the Hazen method)
+
+    :param sorted_values: the sorted values
+    :param quantile: the quantile between 0 and 1
+    :return: the value of the quantile
+    """
+    index = quantile * len(sorted_values) - 0.5
+    if index < 0:
+        return sorted_values[0]
+    if index > len(sorted_values) - 1:
+        return sorted_values[-1]
+    fraction = index % 1
+    return fraction * sorted_values[int(np.ceil(index))] + \
+        (1 - fraction) * sorted_values[int(np.floor(index))]
@@ -719,3 +719,41 @@ class Config:
                         line['type'] = None
 
         return lines
+
+    def get_stat_input_columns(self) -> list:
+        """
+         Returns the names of the stat_input columns needed to build the series:
+         the series, fixed and independent variables, the statistic value with its
+         confidence intervals and the date/time columns used by the event equalization.
+         Args:
+
+         Returns:
+             :return: list of the column names
+         """
+        columns = []
+        for param in ('series_val_1', 'series_val_2', 'fixed_vars_vals_input'):
+            param_val = self.get_config_value(param)
+            if param_val:
+                columns.extend(param_val.keys())
+        if self.indy_var:
+            columns.append(self.indy_var)
+        columns.extend(constants.STAT_INPUT_COMMON_COLUMNS)
+        return list(dict.fromkeys(columns))
+
+    def get_stat_input_categorical_columns(self) -> list:
+        """
+         Returns the names of the stat_input label columns that can be stored
+         as categorical data: the series and fixed variables, fcst_var and stat_name.
+         The independent variable is compared to the indy_vals and is not included.
+         Args:
+
+         Returns:
+             :return: list of the column names
+         """
+        columns = []
+        for param in ('series_val_1', 'series_val_2', 'fixed_vars_vals_input'):
+            param_val = self.get_config_value(param)
+            if param_val:
+                columns.extend(param_val.keys())
+        columns.extend(['fcst_var', 'stat_name'])
+        return [column for column in dict.fromkeys(columns) if column != self.indy_var]
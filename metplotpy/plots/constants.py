@@ -98,3 +98,11 @@ MV_TO_MPL_CAPTION_STYLE = {1:('normal', 'normal'), 2:('normal','bold'), 3:('ital
 
 # Matplotlib constants
 MPL_FONT_SIZE_DEFAULT = 11
+
+# stat_input columns that are read for any of the stat_value based plots
+# in addition to the series, fixed and independent variables.
+# beta_value is needed for the warning about the different DMAP GBETA beta values
+STAT_INPUT_COMMON_COLUMNS = ['fcst_var', 'stat_name', 'stat_value', 'nstats',
+                             'stat_bcl', 'stat_bcu', 'stat_btcl', 'stat_btcu', 'stat_ncl', 'stat_ncu',
+                             'fcst_valid_beg', 'fcst_valid', 'fcst_init_beg', 'fcst_init', 'fcst_lead',
+                             'beta_value']
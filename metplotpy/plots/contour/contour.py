@@ -18,7 +18,6 @@ import re
 import csv
 
 import yaml
-import pandas as pd
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -31,7 +30,7 @@ from metplotpy.plots.contour.contour_config import ContourConfig
 from metplotpy.plots.contour.contour_series import ContourSeries
 from metplotpy.plots.series import Series
 
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 
 
 class Contour(BasePlot):
@@ -73,7 +72,7 @@ class Contour(BasePlot):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -105,8 +104,8 @@ class Contour(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
-                           header='infer', float_precision='round_trip')
+        return self._read_stat_input(self.config_obj.get_stat_input_columns(),
+                                     self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -404,7 +403,7 @@ class Contour(BasePlot):
                 file.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, Contour plot using the
             default and custom config files on sample data found in this directory.
@@ -412,6 +411,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -434,6 +434,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
@@ -15,7 +15,7 @@ __author__ = 'Tatiana Burek'
 
 from typing import Union
 import numpy as np
-import warnings
+import pandas as pd
 from ..series import Series
 
 
@@ -53,31 +53,6 @@ class ContourSeries(Series):
 
         return all_fields_values_no_indy
 
-    def _calc_point_stat(self, data: list) -> Union[float, None]:
-        """
-        Calculates the statistic specified in the config 'plot_stat' parameter
-        using input data list
-        :param data: list os numbers
-        :return:  mean, median or sum of the values from the input list or
-            None if the statistic parameter is invalid
-        """
-        # calculate point stat
-        if self.config.plot_stat == 'MEAN':
-            with warnings.catch_warnings():
-                warnings.filterwarnings(action='ignore', message='All-NaN slice encountered')
-                point_stat = np.nanmean(data)
-        elif self.config.plot_stat == 'MEDIAN':
-            with warnings.catch_warnings():
-                warnings.filterwarnings(action='ignore', message='All-NaN slice encountered')
-                point_stat = np.nanmedian(data)
-        elif self.config.plot_stat == 'SUM':
-            with warnings.catch_warnings():
-                warnings.filterwarnings(action='ignore', message='All-NaN slice encountered')
-                point_stat = np.nansum(data)
-        else:
-            point_stat = None
-        return point_stat
-
     def _create_series_points(self) -> dict:
         """
         Subset the data for the appropriate series.
@@ -97,13 +72,36 @@ class ContourSeries(Series):
         if self.config.reverse_y is True:
             x_real.reverse()
 
-        z = [[None for i in range(len(y_real))] for j in range(len(x_real))]
-        for ind_y, y in enumerate(y_real):
-            for ind_x, x in enumerate(x_real):
-                all_filters = [self.input_data[self.config.indy_var].isin([y]),
-                               self.input_data[self.config.series_val_names[0]].isin([x])]
-                mask = np.array(all_filters).all(axis=0)
-                data = self.input_data.loc[mask]
-                z[ind_x][ind_y] = self._calc_point_stat(data['stat_value'])
+        z = self._calc_grid_stat(y_real, x_real)
 
         return {'x': y_real, 'y': x_real, 'z': z}
+
+    def _calc_grid_stat(self, indy_vals: list, series_vals: list) -> np.ndarray:
+        """
+        Calculates the statistic specified in the config 'plot_stat' parameter
+        for all (indy value, series value) cells in one aggregation:
+        mean, median or sum of the values of each cell. The NaN values are ignored
+        :param indy_vals: the values of the indy variable (columns of the grid)
+        :param series_vals: the values of the series variable (rows of the grid)
+        :return: 2-dim array with the statistic for each series value and indy value:
+            NaN if the cell has no data (0 for SUM) or the statistic parameter is invalid
+        """
+        how = {'MEAN': 'mean', 'MEDIAN': 'median', 'SUM': 'sum'}.get(self.config.plot_stat)
+        empty_value = 0.0 if how == 'sum' else np.nan
+
+        # the position of each row in the grid of the unique axis values
+        unique_indy = pd.Index(indy_vals).unique()
+        unique_series = pd.Index(series_vals).unique()
+        indy_index = unique_indy.get_indexer(self.input_data[self.config.indy_var])
+        series_index = unique_series.get_indexer(self.input_data[self.config.series_val_names[0]])
+
+        grid = np.full((len(unique_series), len(unique_indy)), empty_value)
+        in_grid = (indy_index >= 0) & (series_index >= 0)
+        if how is not None and in_grid.any():
+            cell = series_index[in_grid] * len(unique_indy) + indy_index[in_grid]
+            stat_values = pd.Series(self.input_data['stat_value'].to_numpy(dtype=float)[in_grid])
+            cell_stat = stat_values.groupby(cell).agg(how)
+            grid.flat[cell_stat.index.to_numpy()] = cell_stat.to_numpy()
+
+        # expand the unique values to the requested ones (they can be repeated)
+        return grid[np.ix_(unique_series.get_indexer(series_vals), unique_indy.get_indexer(indy_vals))]
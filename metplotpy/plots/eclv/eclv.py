@@ -23,8 +23,8 @@ import itertools
 
 import plotly.graph_objects as go
 
-from metcalcpy.event_equalize import event_equalize
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots.event_equalization import event_equalize
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH
 from metplotpy.plots.eclv.eclv_config import EclvConfig
 from metplotpy.plots.eclv.eclv_series import EclvSeries
@@ -108,6 +108,21 @@ class Eclv(Line):
 
         return f'Eclv({self.parameters!r})'
 
+    def _read_input_data(self):
+        """
+            Read the input data file with all ECLV line type columns
+            and store as a pandas dataframe so we can subset the
+            data to represent each of the series defined by the
+            series_val permutations.
+
+            Args:
+
+            Returns:
+
+        """
+        return self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
+
     def _create_series(self, input_data):
         """
            Generate all the series objects that are to be displayed as specified by the plot_disp
@@ -340,7 +355,7 @@ class Eclv(Line):
                 file.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, eclv plot using the
             default and custom config files on sample data found in this directory.
@@ -348,6 +363,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -370,6 +386,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
@@ -16,6 +16,7 @@ __author__ = 'Tatiana Burek'
 import math
 
 import numpy as np
+import pandas as pd
 from scipy.stats import norm
 
 import metcalcpy.util.utils as utils
@@ -54,143 +55,117 @@ class EclvSeries(LineSeries):
                 if utils.is_string_integer(filter_val):
                     filter_list[i] = int(filter_val)
 
-            all_filters.append((self.input_data[field].isin(filter_list)))
+            all_filters.append((field, filter_list))
 
-        # use numpy to select the rows where any record evaluates to True
-        mask = np.array(all_filters).all(axis=0)
-        self.series_data = self.input_data.loc[mask]
+        # select the rows where all filters evaluate to True
+        self.series_data = self._select_series_data(all_filters, sort_keys=[])
 
-        # init the list of thresholds
-        if 'thresh_i' in self.series_data.columns:
-            list_thresh = self.series_data['thresh_i'].unique().tolist()
+        series_data = self.series_data
+
+        # the points are grouped by the threshold in the order of the first appearance
+        # and by x_pnt_i in the ascending order
+        if 'thresh_i' in series_data.columns:
+            thresh_codes = pd.factorize(series_data['thresh_i'])[0]
         else:
-            list_thresh = [0]
+            thresh_codes = np.zeros(len(series_data), dtype=int)
+        group_keys = [thresh_codes, series_data['x_pnt_i'].to_numpy()]
+        if 'stat_bcl' in series_data.columns:
+            # each row is a separate point
+            group_keys.append(np.arange(len(series_data)))
 
-        series_points_results = []
+        y_pnt_i = series_data['y_pnt_i'].astype(float)
+        grouped = y_pnt_i.groupby(group_keys, sort=True)
 
+        # calculate point stat for all points
+        point_stat = self._calc_grouped_point_stat(y_pnt_i, group_keys)
+        number_of_points = len(point_stat)
+
+        # calculate CI
         dbl_alpha = self.config.parameters['alpha']
         dbl_z = norm.ppf(1 - (dbl_alpha / 2))
         dbl_z_val = (dbl_z + dbl_z / math.sqrt(2)) / 2
-
-        for thresh in list_thresh:
-            series_points_for_thresh = {'dbl_lo_ci': [], 'dbl_med': [], 'dbl_up_ci': [], 'nstat': [], 'x_pnt': []}
-            if 'thresh_i' in self.series_data.columns:
-                thresh_series_data = self.series_data.loc[self.series_data['thresh_i'] == thresh]
+        series_ci = self.config.get_config_value('plot_ci')[self.idx].upper()
+        dbl_lo_ci = [0] * number_of_points
+        dbl_up_ci = [0] * number_of_points
+
+        if series_ci == 'STD':
+            # count al values that are not non and more than 0
+            nansum = (y_pnt_i.notna() & (y_pnt_i != 0.0)).groupby(group_keys, sort=True).sum().to_numpy()
+            compute_std_err = {
+                'MEAN': utils.compute_std_err_from_mean,
+                'MEDIAN': utils.compute_std_err_from_median_no_variance_inflation_factor,
+                'SUM': utils.compute_std_err_from_sum
+            }.get(self.config.plot_stat)
+            if compute_std_err is not None:
+                # the standard error depends on the order of the values in the point
+                for ind, (_, point_data) in enumerate(grouped):
+                    if nansum[ind] > 0:
+                        std_err_vals = compute_std_err(point_data.tolist())
+                        if std_err_vals[1] == 0:
+                            dbl_std_err = dbl_z_val * std_err_vals[0]
+                            dbl_lo_ci[ind] = dbl_std_err
+                            dbl_up_ci[ind] = dbl_std_err
+
+        elif series_ci in ('BOOT', 'MET_BOOT', 'MET_PRM'):
+            ci_columns = {'BOOT': ('stat_btcl', 'stat_btcu'),
+                          'MET_BOOT': ('stat_bcl', 'stat_bcu'),
+                          'MET_PRM': ('stat_ncl', 'stat_ncu')}[series_ci]
+            if all(column in series_data.columns for column in ci_columns):
+                stat_cl, stat_cu = [
+                    self._calc_grouped_point_stat(series_data[column].astype(float), group_keys)
+                    .replace(-9999, 0).to_numpy()
+                    for column in ci_columns]
             else:
-                thresh_series_data = self.series_data
+                stat_cl = stat_cu = np.zeros(number_of_points, dtype=int)
+            dbl_lo_ci = (point_stat.to_numpy() - stat_cl).tolist()
+            dbl_up_ci = (stat_cu - point_stat.to_numpy()).tolist()
+
+        # calculate the number of records for each point
+        if 'nstats' in series_data.columns:
+            nstats = series_data['nstats']
+            nstat = nstats.groupby(group_keys, sort=True).sum()
+            # a missing value makes the sum missing
+            nstat[nstats.isna().groupby(group_keys, sort=True).any()] = np.nan
+        else:
+            nstat = grouped.size()
 
-            if 'stat_bcl' in self.series_data.columns:
-                unique_x_pnt_i = thresh_series_data['x_pnt_i'].tolist()
-            else:
-                unique_x_pnt_i = thresh_series_data['x_pnt_i'].unique().tolist()
-            unique_x_pnt_i.sort()
-
-            #for each x_pnt_i calculate statistic and CIs
-            for ind_x_pnt_i, x_pnt_i in enumerate(unique_x_pnt_i):
-                if 'stat_bcl' in self.series_data.columns:
-                    point_data = thresh_series_data[ind_x_pnt_i]
-                else:
-                    point_data = thresh_series_data.loc[thresh_series_data['x_pnt_i'] == x_pnt_i]
-
-                if len(point_data) > 0:
-                    # calculate point stat
-                    point_stat = self._calc_point_stat(point_data['y_pnt_i'].tolist())
-
-                    # calculate CI
-                    dbl_lo_ci = 0
-                    dbl_up_ci = 0
-                    series_ci = self.config.get_config_value('plot_ci')[self.idx].upper()
-
-                    # count al values that are not non and more than 0
-                    nansum = 0
-                    for val in point_data['y_pnt_i'].tolist():
-                        if not np.isnan(val) and val != 0.0:
-                            nansum = nansum + 1
-
-                    if series_ci == 'STD' and nansum > 0:
-                        std_err_vals = None
-                        if self.config.plot_stat == 'MEAN':
-                            std_err_vals = utils.compute_std_err_from_mean(point_data['y_pnt_i'].tolist())
-
-                        elif self.config.plot_stat == 'MEDIAN':
-                            std_err_vals = utils.compute_std_err_from_median_no_variance_inflation_factor(
-                                point_data['y_pnt_i'].tolist())
-
-                        elif self.config.plot_stat == 'SUM':
-                            std_err_vals = utils.compute_std_err_from_sum(point_data['y_pnt_i'].tolist())
-
-                        if std_err_vals is not None and std_err_vals[1] == 0:
-                            dbl_std_err = dbl_z_val * std_err_vals[0]
-                            dbl_lo_ci = dbl_std_err
-                            dbl_up_ci = dbl_std_err
-
-                    elif series_ci == 'BOOT':
-                        stat_btcu = 0
-                        stat_btcl = 0
-                        if 'stat_btcu' in point_data.head() and 'stat_btcl' in point_data.head():
-                            stat_btcu = self._calc_point_stat(point_data['stat_btcu'].tolist())
-                            stat_btcl = self._calc_point_stat(point_data['stat_btcl'].tolist())
-                            if stat_btcu == -9999:
-                                stat_btcu = 0
-                            if stat_btcl == -9999:
-                                stat_btcl = 0
-
-                        dbl_lo_ci = point_stat - stat_btcl
-                        dbl_up_ci = stat_btcu - point_stat
-
-                    elif series_ci == 'MET_BOOT':
-                        stat_bcu = 0
-                        stat_bcl = 0
-                        if 'stat_bcu' in point_data.head() and 'stat_bcl' in point_data.head():
-                            stat_bcu = self._calc_point_stat(point_data['stat_bcu'].tolist())
-                            stat_bcl = self._calc_point_stat(point_data['stat_bcl'].tolist())
-                            if stat_bcu == -9999:
-                                stat_bcu = 0
-                            if stat_bcl == -9999:
-                                stat_bcl = 0
-
-                        dbl_lo_ci = point_stat - stat_bcl
-                        dbl_up_ci = stat_bcu - point_stat
-
-                    elif series_ci == 'MET_PRM':
-                        stat_ncu = 0
-                        stat_ncl = 0
-                        if 'stat_ncu' in point_data.head() and 'stat_ncl' in point_data.head():
-                            stat_ncu = self._calc_point_stat(point_data['stat_ncu'].tolist())
-                            stat_ncl = self._calc_point_stat(point_data['stat_ncl'].tolist())
-                            if stat_ncu == -9999:
-                                stat_ncu = 0
-                            if stat_ncl == -9999:
-                                stat_ncl = 0
-
-                        dbl_lo_ci = point_stat - stat_ncl
-                        dbl_up_ci = stat_ncu - point_stat
-
-                else:
-                    dbl_lo_ci = None
-                    point_stat = None
-                    dbl_up_ci = None
-
-                series_points_for_thresh['dbl_lo_ci'].append(dbl_lo_ci)
-                series_points_for_thresh['dbl_med'].append(point_stat)
-                series_points_for_thresh['dbl_up_ci'].append(dbl_up_ci)
-                series_points_for_thresh['x_pnt'].append(x_pnt_i)
-
-                # calculate the number of records for thresh
-                if 'nstats' in self.series_data.columns:
-                    total = sum(point_data['nstats'].tolist())
-                else:
-                    total = sum(x is not None or np.isnan(x) is False for x in point_data['y_pnt_i'])
-
-                # add number of records for thresh to the number of records for series
-                if ind_x_pnt_i < len(series_points_for_thresh['nstat']):
-                    series_points_for_thresh['nstat'][ind_x_pnt_i] = total + series_points_for_thresh['nstat'][ind_x_pnt_i]
-                else:
-                    series_points_for_thresh['nstat'].append(total)
-            series_points_results.append(series_points_for_thresh)
+        # split the points by threshold
+        if len(thresh_codes) > 0:
+            number_of_thresholds = thresh_codes.max() + 1
+        else:
+            number_of_thresholds = 0 if 'thresh_i' in series_data.columns else 1
+        bounds = np.searchsorted(point_stat.index.get_level_values(0).to_numpy(),
+                                 np.arange(number_of_thresholds + 1))
+        x_pnt = point_stat.index.get_level_values(1).tolist()
+        point_stat = point_stat.tolist()
+        nstat = nstat.tolist()
+        series_points_results = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            series_points_results.append({
+                'dbl_lo_ci': dbl_lo_ci[start:end],
+                'dbl_med': point_stat[start:end],
+                'dbl_up_ci': dbl_up_ci[start:end],
+                'nstat': nstat[start:end],
+                'x_pnt': x_pnt[start:end]
+            })
 
         return series_points_results
 
+    def _calc_grouped_point_stat(self, values: pd.Series, group_keys: list) -> pd.Series:
+        """
+        Calculates the statistic specified in the config 'plot_stat' parameter
+        for each group of values. The NaN values are ignored like in _calc_point_stat
+        :param values: the values
+        :param group_keys: the group of each value
+        :return: mean, median or sum of each group sorted by the group keys or
+            None for each group if the statistic parameter is invalid
+        """
+        grouped = values.groupby(group_keys, sort=True)
+        how = {'MEAN': 'mean', 'MEDIAN': 'median', 'SUM': 'sum'}.get(self.config.plot_stat)
+        if how is None:
+            return pd.Series(None, index=grouped.size().index, dtype=object)
+        return grouped.agg(how)
+
     def _create_all_fields_values_no_indy(self) -> dict:
         """
         Creates a dictionary with two keys that represents each axis
@@ -18,18 +18,16 @@ import re
 import itertools
 
 import yaml
-import numpy as np
-import pandas as pd
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from plotly.graph_objects import Figure
 
-from metcalcpy.event_equalize import event_equalize
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH, PLOTLY_PAPER_BGCOOR
 from metplotpy.plots.ens_ss.ens_ss_config import EnsSsConfig
 from metplotpy.plots.ens_ss.ens_ss_series import EnsSsSeries
 from metplotpy.plots.base_plot import BasePlot
+from metplotpy.plots.event_equalization import event_equalize
 import metplotpy.plots.util as util
 import metcalcpy.util.utils as utils
 
@@ -109,37 +107,26 @@ class EnsSs(BasePlot):
         unique_bin_n = self.input_df['bin_n'].unique().tolist()
         fix_vals_permuted_list.append(unique_bin_n)
         if len(self.config_obj.series_val_names) > 0:
-            input_df_ee = None
+            subsets = []
             all_fields_values_orig = self.config_obj.get_config_value('series_val_1').copy()
             all_fields_values = {}
             for field in reversed(list(all_fields_values_orig.keys())):
                 all_fields_values[field] = all_fields_values_orig.get(field)
 
+            # the data of each series field is equalized independently
             for field_name, field_value in all_fields_values.items():
-                all_filters = []
+                filter_list = []
                 for val in field_value:
-                    filter_list = [val]
-                    for i, filter_val in enumerate(filter_list):
-                        if utils.is_string_integer(filter_val):
-                            filter_list[i] = int(filter_val)
-
-                    all_filters.append((self.input_df[field_name].isin(filter_list)))
-
-                # use numpy to select the rows where any record evaluates to True
-                mask = np.array(all_filters).all(axis=0)
-                series_data_for_ee = self.input_df.loc[mask]
-                series_data_after_ee = \
-                    event_equalize(series_data_for_ee, "fcst_valid_beg",
-                                   self.config_obj.get_config_value('series_val_1'),
-                                   fix_vals_keys,
-                                   fix_vals_permuted_list, True,
-                                   False)
-                if input_df_ee is None:
-                    input_df_ee = series_data_after_ee
-                else:
-                    input_df_ee = [input_df_ee, series_data_after_ee]
+                    if utils.is_string_integer(val):
+                        val = int(val)
+                    filter_list.append(val)
+                subsets.append(self.input_df[field_name].isin(filter_list).to_numpy())
 
-            self.input_df = input_df_ee
+            self.input_df = event_equalize(self.input_df, "fcst_valid_beg",
+                                           self.config_obj.get_config_value('series_val_1'),
+                                           fix_vals_keys,
+                                           fix_vals_permuted_list, True,
+                                           False, subsets=subsets)
 
     def __repr__(self):
         """ Implement repr which can be useful for debugging this
@@ -160,8 +147,8 @@ class EnsSs(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
-                           header='infer', float_precision='round_trip')
+        return self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -516,7 +503,7 @@ class EnsSs(BasePlot):
                 file.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, Plotly Ensemble spread-skill plot using the
             default and custom config files on sample data found in this directory.
@@ -524,6 +511,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -545,6 +533,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
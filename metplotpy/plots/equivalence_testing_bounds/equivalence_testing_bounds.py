@@ -32,7 +32,7 @@ from metplotpy.plots.line.line_series import LineSeries
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots import util
 
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 
 
 class EquivalenceTestingBounds(BasePlot):
@@ -70,7 +70,7 @@ class EquivalenceTestingBounds(BasePlot):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -94,7 +94,8 @@ class EquivalenceTestingBounds(BasePlot):
 
     def _read_input_data(self):
         """
-            Read the input data file
+            Read the input data file with all line type columns
+            (they are used to recalculate the statistics)
             and store as a pandas dataframe so we can subset the
             data to represent each of the series defined by the
             series_val permutations.
@@ -104,8 +105,8 @@ class EquivalenceTestingBounds(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
-                           header='infer', float_precision='round_trip')
+        return self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -530,7 +531,7 @@ class EquivalenceTestingBounds(BasePlot):
             print('Can\'t save points to a file')
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, Equivalence Testing Bounds plot using the
             default and custom config files on sample data found in this directory.
@@ -538,6 +539,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -560,6 +562,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
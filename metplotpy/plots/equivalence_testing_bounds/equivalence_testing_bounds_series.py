@@ -15,7 +15,6 @@ __author__ = 'Tatiana Burek'
 
 from typing import Union
 import statistics
-import math
 
 import numpy as np
 import pandas as pd
@@ -70,10 +69,9 @@ class EquivalenceTestingBoundsSeries(LineSeries):
                     if utils.is_string_integer(filter_val):
                         filter_list[i] = int(filter_val)
 
-                all_filters.append((self.input_data[field].isin(filter_list)))
-            # use numpy to select the rows where any record evaluates to True
-            mask = np.array(all_filters).all(axis=0)
-            self.series_data = self.input_data.loc[mask]
+                all_filters.append((field, filter_list))
+            # select the rows where all filters evaluate to True
+            self.series_data = self._select_series_data(all_filters, sort_keys=[])
             return dict()
 
         # this is a derived series
@@ -120,6 +118,29 @@ class EquivalenceTestingBoundsSeries(LineSeries):
 
         return self.series_data
 
+    @staticmethod
+    def _calculate_stat_values(series_data: DataFrame) -> None:
+        """
+        Calculates the statistic of each row from its partial sums and saves
+        the values to the 'stat_value' column. The rows are passed to the metcalcpy
+        statistic function as views of one numpy matrix and the column is updated once.
+
+        :param series_data: data frame with the partial sums and the 'stat_name' column
+        """
+        # the metcalcpy statistic aggregates all rows it gets, so it is called for each row;
+        # the column names are a numpy array to look up the columns without pandas
+        values = series_data.to_numpy()
+        columns = series_data.columns.to_numpy()
+        stat_name = series_data['stat_name'][0].lower()
+        stat_values = np.array([calculate_statistic(values[i:i + 1], columns, stat_name)
+                                for i in range(len(values))], dtype=float)
+
+        # keep the type of the column if it can hold the values
+        stat_type = series_data['stat_value'].dtype
+        if not np.array_equal(stat_values.astype(stat_type), stat_values, equal_nan=True):
+            stat_type = stat_values.dtype
+        series_data['stat_value'] = stat_values.astype(stat_type)
+
     def _calculate_tost_paired(self, series_data_1: DataFrame, series_data_2: DataFrame) -> None:
         """
         Validates if both DataFrames have the same fcst_valid_beg values and if it is TRUE
@@ -132,25 +153,13 @@ class EquivalenceTestingBoundsSeries(LineSeries):
         :param series_data_2: 2nd data frame sorted  by fcst_init_beg
         """
 
-        all_zero_1 = all(elem is None or math.isnan(elem)
-                         for elem in series_data_1['stat_value'].tolist())
-        all_zero_2 = all(elem is None or math.isnan(elem)
-                         for elem in series_data_2['stat_value'].tolist())
+        all_zero_1 = np.isnan(series_data_1['stat_value'].to_numpy(dtype=float)).all()
+        all_zero_2 = np.isnan(series_data_2['stat_value'].to_numpy(dtype=float)).all()
 
-        if all_zero_1 is True and all_zero_2 is True:
+        if all_zero_1 and all_zero_2:
             # calculate stat values
-            for index, row in series_data_1.iterrows():
-                row_array = np.expand_dims(row.to_numpy(), axis=0)
-                stat_value = calculate_statistic(row_array, series_data_1.columns,
-                                                 series_data_1["stat_name"][0].lower())
-                # save the value to the 'stat_value' column
-                series_data_1.at[index, 'stat_value'] = stat_value
-            for index, row in series_data_2.iterrows():
-                row_array = np.expand_dims(row.to_numpy(), axis=0)
-                stat_value = calculate_statistic(row_array, series_data_2.columns,
-                                                 series_data_2["stat_name"][0].lower())
-                # save the value to the 'stat_value' column
-                series_data_2.at[index, 'stat_value'] = stat_value
+            self._calculate_stat_values(series_data_1)
+            self._calculate_stat_values(series_data_2)
 
         corr = pg.corr(x=series_data_1['stat_value'],
                        y=series_data_2['stat_value'])['r'].tolist()[0]
@@ -0,0 +1,425 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Class Name: event_equalization.py
+
+Event equalization of the stat_input data frames.
+The results are the same as the results of metcalcpy event_equalize and
+perform_event_equalization but the common cases of all permutations of
+the series and fixed variable values are found in one pass: each row gets
+the code of its case (fcst_valid_beg or fcst_valid, fcst_lead and the independent
+variable) and the code of its permutation, and a case is kept if the number
+of the unique permutations that have it is equal to the number of permutations.
+ """
+
+import itertools
+import re
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from metcalcpy import DATE_TIME_REGEX
+from metcalcpy.util.utils import is_string_integer
+
+from metplotpy.plots import GROUP_SEPARATOR
+
+# the columns that are never used as the equalization variables
+EXCEPTION_COLUMNS = ['', 'fcst_valid_beg', 'fcst_lead', 'fcst_valid', 'fcst_init', 'fcst_init_beg',
+                     'VALID', 'LEAD']
+
+
+def event_equalize(input_data: DataFrame, indy_var: str, series_var_vals: Union[dict, None],
+                   fix_vars: Union[list, str, None], fix_vals_permuted: Union[list, None],
+                   equalize_by_indep: bool = True, multi: bool = False,
+                   subsets: Union[list, None] = None) -> DataFrame:
+    """
+    Performs event equalization. The rows that don't have the same case
+    (fcst_valid_beg, fcst_lead and the independent variable value) in every
+    permutation of the series and fixed variable values are removed.
+    Unlike metcalcpy event_equalize the input data frame is not changed
+    and the result doesn't have the 'equalize' column.
+
+    :param input_data: data frame with the records to equalize
+    :param indy_var: name of the independent variable
+    :param series_var_vals: series variable names and values
+    :param fix_vars: names of the fixed variables
+    :param fix_vals_permuted: fixed variable values to equalize over
+    :param equalize_by_indep: include or not the independent variable to the case
+    :param multi: False for normal event equalization, True for equalization of multiple
+        events at each case - for example with MODE objects
+    :param subsets: list of boolean masks or positions of the rows that are equalized
+        independently or None to equalize all rows
+    :return: the equalized rows of each subset concatenated in the order of the subsets
+    """
+    vars_for_ee = _get_vars_for_ee(series_var_vals, fix_vars, fix_vals_permuted)
+    number_of_permutations = int(np.prod([len(vals) for vals in vars_for_ee.values()]))
+
+    # the positions of the rows of all subsets and the subset of each position
+    if subsets is None:
+        subsets = [np.arange(len(input_data))]
+    subsets = [np.flatnonzero(subset) if np.asarray(subset).dtype == bool
+               else np.asarray(subset, dtype=np.int64) for subset in subsets]
+    positions = np.concatenate(subsets + [np.empty(0, dtype=np.int64)])
+    subset_ids = np.repeat(np.arange(len(subsets)), [len(subset) for subset in subsets])
+
+    case_codes = _get_case_codes(input_data, indy_var, equalize_by_indep)
+    permutation_codes = _get_permutation_codes(input_data, vars_for_ee)
+
+    # the case in the subset is the unit of equalization
+    groups = pd.factorize(subset_ids * (case_codes.max(initial=0) + 1) + case_codes[positions])[0]
+    permutations = permutation_codes[positions]
+    in_permutation = permutations >= 0
+    group_permutations = groups[in_permutation] * number_of_permutations + permutations[in_permutation]
+
+    if not multi:
+        _report_non_unique_events(group_permutations, subset_ids[in_permutation],
+                                  number_of_permutations, vars_for_ee)
+
+    # count the unique permutations of each group
+    if number_of_permutations > 0:
+        unique_group_permutations = pd.unique(group_permutations)
+        permutations_per_group = np.bincount(unique_group_permutations // number_of_permutations,
+                                             minlength=groups.max(initial=-1) + 1)
+        keep = permutations_per_group[groups] == number_of_permutations
+    else:
+        keep = np.zeros(len(positions), dtype=bool)
+
+    removed_rows = np.bincount(subset_ids[~keep], minlength=len(subsets))
+    for removed in removed_rows[removed_rows > 0]:
+        print(f"WARNING: event equalization removed {removed} rows")
+
+    return input_data.iloc[positions[keep]]
+
+
+def perform_event_equalization(params: dict, input_data: DataFrame) -> DataFrame:
+    """
+    Performs event equalization on the input data the same way as
+    metcalcpy perform_event_equalization. If there are 2 axis:
+    performs EE on each and then on both.
+
+    :param params: parameters for the statistic calculations and data description
+    :param input_data: data as DataFrame
+    :return: DataFrame with equalized data
+    """
+    fix_vals_keys, fix_vals_permuted_list = get_fixed_vars_vals(params)
+
+    # perform EE for each forecast variable on the axis 1
+    output_ee_data = _equalize_axis_data(fix_vals_keys, fix_vals_permuted_list, params,
+                                         input_data, axis='1')
+
+    # if the second Y axis is present - run event equalizer on Y1
+    # and then run event equalizer on Y1 and Y2 equalized data
+    if 'series_val_2' in params.keys() and params['series_val_2']:
+        # perform EE for each forecast variable on the axis 2
+        output_ee_data_2 = _equalize_axis_data(fix_vals_keys, fix_vals_permuted_list, params,
+                                               input_data, axis='2')
+
+        # create a single unique dictionary from series for Y1 and Y2 to use in EE
+        all_series = {**params['series_val_1'], **params['series_val_2']}
+        for key in all_series:
+            all_series[key] = list(set(all_series[key]))
+
+        # run event equalizer on Y1 and Y2
+        output_ee_data = event_equalize(pd.concat([output_ee_data, output_ee_data_2]),
+                                        params['indy_var'], all_series,
+                                        fix_vals_keys, fix_vals_permuted_list, True,
+                                        params['line_type'] == "ssvar")
+
+    return output_ee_data
+
+
+def get_fixed_vars_vals(params: dict) -> tuple:
+    """
+    Creates the names of the fixed variables and the lists of their values
+    from the 'fixed_vars_vals_input' parameter
+
+    :param params: parameters with the optional 'fixed_vars_vals_input' dictionary
+    :return: a tuple with the list of the fixed variable names and
+        the list of the lists of their values
+    """
+    fix_vals_permuted_list = []
+    fix_vals_keys = []
+    if 'fixed_vars_vals_input' in params:
+        for key in params['fixed_vars_vals_input']:
+            if isinstance(params['fixed_vars_vals_input'][key], dict):
+                list_for_permut = params['fixed_vars_vals_input'][key].values()
+            else:
+                list_for_permut = [params['fixed_vars_vals_input'][key]]
+            vals_permuted = list(itertools.product(*list_for_permut))
+            fix_vals_permuted_list.append([item for sublist in vals_permuted for item in sublist])
+
+        fix_vals_keys = list(params['fixed_vars_vals_input'].keys())
+    return fix_vals_keys, fix_vals_permuted_list
+
+
+def _equalize_axis_data(fix_vals_keys: list, fix_vals_permuted: list, params: dict,
+                        input_data: DataFrame, axis: str = '1') -> DataFrame:
+    """
+    Performs event equalization for each forecast variable and statistic
+    of the axis. All forecast variables and statistics are equalized in one pass.
+
+    :param fix_vals_keys: names of the fixed variables
+    :param fix_vals_permuted: fixed variable values
+    :param params: parameters for the statistic calculations and data description
+    :param input_data: data as DataFrame
+    :param axis: '1' or '2'
+    :return: DataFrame with equalized data of the axis
+    """
+    if 'fcst_var_val_' + axis in params:
+        fcst_var_val = params['fcst_var_val_' + axis]
+        if fcst_var_val is None:
+            fcst_var_val = {}
+    else:
+        fcst_var_val = {'': ['']}
+
+    series_val = params['series_val_' + axis]
+    all_rows = np.ones(len(input_data), dtype=bool)
+
+    # as in metcalcpy each series variable starts from all rows so only the last
+    # one filters the data, and without series the data is not filtered at all
+    series_rows = None
+    if len(series_val) > 0:
+        series_var, series_var_vals = list(series_val.items())[-1]
+        series_rows = all_rows
+        if series_var in input_data.keys():
+            series_rows = input_data[series_var].isin(_ungroup_values(series_var_vals)).to_numpy()
+    fcst_var_rows = _EqualRows(input_data, 'fcst_var')
+    stat_name_rows = _EqualRows(input_data, 'stat_name')
+
+    subsets = []
+    for fcst_var, fcst_var_stats in fcst_var_val.items():
+        for fcst_var_stat in fcst_var_stats:
+            if series_rows is None:
+                subsets.append(all_rows)
+            else:
+                subsets.append(series_rows & fcst_var_rows.get(fcst_var)
+                               & stat_name_rows.get(fcst_var_stat))
+
+    # for SSVAR line_type use equalization of multiple events
+    output_ee_data = event_equalize(input_data, params['indy_var'], series_val,
+                                    fix_vals_keys, fix_vals_permuted, True,
+                                    params['line_type'] == "ssvar", subsets=subsets)
+
+    if output_ee_data.empty:
+        print("\nINFO: Event equalization has produced no results.  Data frame is empty.")
+    return output_ee_data
+
+
+class _EqualRows:
+    """
+        Finds the rows of the data frame that have the value in the column.
+        The column is factorized once and the values are compared with
+        its unique values.
+    """
+
+    def __init__(self, input_data: DataFrame, column_name: str):
+        """
+        :param input_data: the data frame
+        :param column_name: the name of the column, all rows match
+            if the data frame doesn't have the column
+        """
+        self.codes = None
+        if column_name in input_data.keys():
+            self.codes, self.uniques = pd.factorize(input_data[column_name])
+        self.size = len(input_data)
+
+    def get(self, value) -> np.ndarray:
+        """
+        :param value: the value to compare with
+        :return: boolean array with True for the rows equal to the value
+        """
+        if self.codes is None:
+            return np.ones(self.size, dtype=bool)
+        # the missing values have the code -1 and are never equal
+        matches = np.append(np.asarray(pd.Index(self.uniques) == value, dtype=bool), False)
+        return matches[self.codes]
+
+
+def _ungroup_values(values: Union[list, str]) -> list:
+    """
+    Splits the grouped series values to the individual values
+
+    :param values: series values, some of them can be groups of values
+    :return: list of the individual values
+    """
+    if isinstance(values, str):
+        values = [values]
+    values_no_groups = []
+    for value in values:
+        actual_vals = re.findall(DATE_TIME_REGEX, value)
+        if len(actual_vals) == 0:
+            actual_vals = value.split(GROUP_SEPARATOR)
+        values_no_groups.extend(actual_vals)
+    return values_no_groups
+
+
+def _get_vars_for_ee(series_var_vals: Union[dict, None], fix_vars: Union[list, str, None],
+                     fix_vals_permuted: Union[list, None]) -> dict:
+    """
+    Creates the variables and their values that are used for the permutations
+
+    :param series_var_vals: series variable names and values
+    :param fix_vars: names of the fixed variables
+    :param fix_vals_permuted: fixed variable values
+    :return: dictionary with the variable names and the dictionaries
+        of the unique value filters and the values
+    """
+    vars_for_ee = {}
+    if series_var_vals:
+        for series_var, series_vals in series_var_vals.items():
+            if series_var not in EXCEPTION_COLUMNS:
+                vars_for_ee[series_var] = _ungroup_values(series_vals)
+
+    if isinstance(fix_vars, str):
+        fix_vars = [fix_vars]
+    if fix_vars:
+        for var_for_ee_ind, fix_var in enumerate(fix_vars):
+            if fix_var not in EXCEPTION_COLUMNS:
+                vals = fix_vals_permuted[var_for_ee_ind]
+                if isinstance(vals, str):
+                    vals = [vals]
+                vars_for_ee[fix_var] = vals
+
+    # the equal values select the same rows and create the same permutations
+    vals_filters = {}
+    for var_for_ee, vals in vars_for_ee.items():
+        vals_filters[var_for_ee] = {}
+        for val in vals:
+            vals_filters[var_for_ee].setdefault(_get_value_filter(val), val)
+    return vals_filters
+
+
+def _get_case_codes(input_data: DataFrame, indy_var: str, equalize_by_indep: bool) -> np.ndarray:
+    """
+    Creates the code of the case of each row. The rows have the same code
+    if the string representations of their case columns are the same.
+
+    :param input_data: data frame with the records to equalize
+    :param indy_var: name of the independent variable
+    :param equalize_by_indep: include or not the independent variable to the case
+    :return: array with the case code of each row
+    """
+    if 'equalize' in input_data.columns:
+        case_columns = ['equalize']
+    elif 'fcst_valid_beg' in input_data.columns:
+        case_columns = ['fcst_valid_beg', 'fcst_lead']
+    elif 'fcst_valid' in input_data.columns:
+        case_columns = ['fcst_valid', 'fcst_lead']
+    else:
+        raise KeyError('The data has no fcst_valid_beg or fcst_valid column for event equalization')
+    if equalize_by_indep and indy_var not in EXCEPTION_COLUMNS:
+        case_columns.append(indy_var)
+
+    case_codes = np.zeros(len(input_data), dtype=np.int64)
+    for column in case_columns:
+        codes = _get_string_codes(input_data[column])
+        case_codes = pd.factorize(case_codes * (codes.max(initial=0) + 1) + codes)[0]
+    return case_codes
+
+
+def _get_string_codes(column: pd.Series) -> np.ndarray:
+    """
+    Creates the codes of the values of the column. The values have the same
+    code if their string representations are the same.
+
+    :param column: the column
+    :return: array with the code of each value
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Series(uniques, dtype=column.dtype)
+    missing = codes == -1
+    if missing.any():
+        # the last unique value is the missing value, code -1 selects it
+        uniques = pd.concat([uniques, column[missing].iloc[:1]], ignore_index=True)
+    return pd.factorize(uniques.astype(str))[0][codes]
+
+
+def _get_value_filter(val) -> tuple:
+    """
+    Creates the filter of the variable value. The values are compared
+    the same way as in metcalcpy event_equalize: the integer strings
+    as integers and 'NA' selects the missing values.
+
+    :param val: the value of the variable
+    :return: a tuple with the type of the filter and the value to compare with
+    """
+    if is_string_integer(val):
+        return 'int', int(val)
+    if val == 'NA':
+        return 'NA', None
+    return 'eq', val
+
+
+def _get_permutation_codes(input_data: DataFrame, vars_for_ee: dict) -> np.ndarray:
+    """
+    Creates the code of the permutation of the variable values that selects each row.
+    The codes are the positions of the permutations in the itertools.product order.
+
+    :param input_data: data frame with the records to equalize
+    :param vars_for_ee: dictionary with the variable names and the dictionaries
+        of the value filters and the values
+    :return: array with the permutation code of each row or -1 if the row
+        doesn't belong to any permutation
+    """
+    permutation_codes = np.zeros(len(input_data), dtype=np.int64)
+    for var_for_ee, val_filters in vars_for_ee.items():
+        value_codes = _get_value_codes(input_data[var_for_ee], list(val_filters))
+        permutation_codes = np.where((permutation_codes >= 0) & (value_codes >= 0),
+                                     permutation_codes * len(val_filters) + value_codes, -1)
+    return permutation_codes
+
+
+def _get_value_codes(column: pd.Series, val_filters: list) -> np.ndarray:
+    """
+    Finds the position of the value filter that selects each row of the column.
+    The filters are evaluated on the unique values of the column.
+
+    :param column: the column of the variable
+    :param val_filters: the filters created by _get_value_filter
+    :return: array with the position of the filter for each row or -1
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Index(uniques)
+    # the last item is for the missing values that have the code -1
+    unique_value_codes = np.full(len(uniques) + 1, -1, dtype=np.int64)
+    for position, (filter_type, filter_value) in enumerate(val_filters):
+        if filter_type == 'NA':
+            unique_value_codes[-1] = position
+        else:
+            unique_value_codes[:-1][np.asarray(uniques == filter_value, dtype=bool)] = position
+    return unique_value_codes[codes]
+
+
+def _report_non_unique_events(group_permutations: np.ndarray, subset_ids: np.ndarray,
+                              number_of_permutations: int, vars_for_ee: dict) -> None:
+    """
+    Prints a warning for each permutation that has several rows with the same case
+
+    :param group_permutations: the code of the case in the subset and the permutation of each row
+    :param subset_ids: the subset of each row
+    :param number_of_permutations: the number of permutations
+    :param vars_for_ee: dictionary with the variable names and the dictionaries
+        of the value filters and the values
+    """
+    duplicated = pd.Series(group_permutations).duplicated().to_numpy()
+    if not duplicated.any():
+        return
+    subset_permutations = pd.unique(subset_ids[duplicated] * number_of_permutations
+                                     + group_permutations[duplicated] % number_of_permutations)
+    var_vals = [list(val_filters.values()) for val_filters in vars_for_ee.values()]
+    for subset_permutation in np.sort(subset_permutations):
+        permutation_code = subset_permutation % number_of_permutations
+        indexes = np.unravel_index(permutation_code, [len(vals) for vals in var_vals])
+        permutation = tuple(vals[index] for vals, index in zip(var_vals, indexes))
+        print(f"WARNING: eventEqualize() detected non-unique events for {permutation}"
+              f" using [fcst_valid_beg,fcst_lead)]")
@@ -19,9 +19,6 @@ import sys
 import os
 from typing import Union
 
-import numpy as np
-import pandas as pd
-
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from plotly.graph_objects import Figure
@@ -31,9 +28,9 @@ from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_W
 from metplotpy.plots.histogram.hist_series import HistSeries
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots import util
+from metplotpy.plots.event_equalization import event_equalize
 
 import metcalcpy.util.utils as utils
-from metcalcpy.event_equalize import event_equalize
 
 
 class Hist(BasePlot):
@@ -118,8 +115,9 @@ class Hist(BasePlot):
         fix_vals_permuted_list.append(self.input_df['i_value'].unique().tolist())
 
         # do EE for the each ser data
+        subsets = None
         if len(self.config_obj.series_val_names) > 0:
-            input_df_ee = None
+            subsets = []
             all_fields_values_orig = self.config_obj.get_config_value('series_val_1').copy()
             all_fields_values = {}
             for field in reversed(list(all_fields_values_orig.keys())):
@@ -127,7 +125,6 @@ class Hist(BasePlot):
 
             for field_name, field_value in all_fields_values.items():
                 for val in field_value:
-                    all_filters = []
                     filter_list = val
                     if not isinstance(filter_list, str):
                         for i, filter_val in enumerate(filter_list):
@@ -136,23 +133,11 @@ class Hist(BasePlot):
                     else:
                         filter_list = [filter_list]
 
-                    all_filters.append((self.input_df[field_name].isin(filter_list)))
-
-                    # use numpy to select the rows where any record evaluates to True
-                    mask = np.array(all_filters).all(axis=0)
-                    series_data_for_ee = self.input_df.loc[mask]
-                    series_data_after_ee = event_equalize(series_data_for_ee, "fcst_valid_beg",
-                                                          {}, fix_vals_keys,
-                                                          fix_vals_permuted_list, True, False)
-                    if input_df_ee is None:
-                        input_df_ee = series_data_after_ee
-                    else:
-                        input_df_ee = input_df_ee.append(series_data_after_ee).reindex()
-        else:
-            input_df_ee = event_equalize(self.input_df, "fcst_valid_beg", {}, fix_vals_keys,
-                                         fix_vals_permuted_list, True, False)
+                    # each ser is equalized independently
+                    subsets.append(self.input_df[field_name].isin(filter_list).to_numpy())
 
-        self.input_df = input_df_ee.drop('equalize', axis=1)
+        self.input_df = event_equalize(self.input_df, "fcst_valid_beg", {}, fix_vals_keys,
+                                       fix_vals_permuted_list, True, False, subsets=subsets)
 
     def __repr__(self):
         """ Implement repr which can be useful for debugging this
@@ -171,8 +156,8 @@ class Hist(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
-                           header='infer', float_precision='round_trip')
+        return self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
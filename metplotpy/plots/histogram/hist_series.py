@@ -14,7 +14,6 @@ Class Name: HistSeries
 __author__ = 'Tatiana Burek'
 
 from typing import Union
-import numpy as np
 
 import metcalcpy.util.utils as utils
 from ..series import Series
@@ -77,19 +76,18 @@ class HistSeries(Series):
                 if utils.is_string_integer(filter_val):
                     filter_list[i] = int(filter_val)
 
-            all_filters.append((self.input_data[field].isin(filter_list)))
+            all_filters.append((field, filter_list))
 
-        # use numpy to select the rows where any record evaluates to True
+        # select the rows where all filters evaluate to True
         if len(all_filters) > 0:
-            mask = np.array(all_filters).all(axis=0)
-            self.series_data = self.input_data.loc[mask]
+            self.series_data = self._select_series_data(all_filters, sort_keys=[])
         else:
             self.series_data = self.input_data
 
         # group by i_value, ser value, calculate sums of rank_i and store them as stat_value
         columns = self.sum_by_columns.copy()
         columns.extend(self.config.series_val_names)
-        self.series_data = self.series_data.groupby(columns) \
+        self.series_data = self.series_data.groupby(columns, observed=True) \
             .agg(stat_value=self.stat_value).reset_index()
 
         if self.config.normalized_histogram is True:
@@ -173,7 +173,7 @@ class Histogram_2d(BasePlot):
         return ds
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     metplotpy_base = os.getenv('METPLOTPY_BASE')
     if not metplotpy_base:
         metplotpy_base = ''
@@ -195,6 +195,8 @@ def main(config_filename=None):
         h = Histogram_2d(docs)
         h.save_to_file()
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 
@@ -25,6 +25,7 @@ Import standard modules
 """
 import os
 import sys
+import glob
 import logging
 import yaml
 import numpy as np
@@ -59,8 +60,11 @@ class Hovmoeller(BasePlot):
         self.time = self.ds.time.sel(time=slice(self.config_obj.date_start, self.config_obj.date_end))
         self.time_str = self.get_time_str(self.time)
         self.lon = self.ds.lon
+        # the band mean of the chunked (dask) data is computed here,
+        # one chunk at a time
         self.data = self.lat_avg(dataset,
-            self.config_obj.lat_min, self.config_obj.lat_max)
+            self.config_obj.lat_min, self.config_obj.lat_max,
+            self.config_obj.lat_weighted).load()
         self.lat_str = self.get_lat_str(
             self.config_obj.lat_min, self.config_obj.lat_max)
 
@@ -135,7 +139,7 @@ class Hovmoeller(BasePlot):
 
         return lat_str
 
-    def lat_avg(self, data, lat_min, lat_max):
+    def lat_avg(self, data, lat_min, lat_max, lat_weighted=False):
         """
         Compute latitudinal average.
         :param data: input data (time, lat, lon)
@@ -144,12 +148,18 @@ class Hovmoeller(BasePlot):
         :type lat_min: float
         :param lat_max: northern latitude for averaging
         :type lat_max: float
+        :param lat_weighted: weight the average by the cosine of the latitude
+        :type lat_weighted: bool
         :return: data (time, lon)
         :rtype: xarray.DataArray
         """
         data = data.sel(lat=slice(lat_min, lat_max))
         units = data.attrs['units']
-        data = data.mean(dim='lat')
+        if lat_weighted:
+            weights = np.cos(np.deg2rad(data.lat))
+            data = data.weighted(weights).mean(dim='lat')
+        else:
+            data = data.mean(dim='lat')
         data.attrs['units'] = units
         data = data.squeeze()
 
@@ -157,7 +167,11 @@ class Hovmoeller(BasePlot):
 
     def read_data_set(self):
         """
-        Read the input netCDF data and return an xarray dataset
+        Read the input netCDF data and return an xarray dataset.
+        The data is read lazily: only the selected time period and
+        latitude band are read from the file(s) and converted. If the chunks
+        are set, the data is a dask array that is read one chunk at a time.
+        A list of files or a glob pattern is opened with xarray.open_mfdataset.
 
         Args:
 
@@ -165,18 +179,28 @@ class Hovmoeller(BasePlot):
                 dataset: xarray dataset
        """
         filename_in = self.config_obj.input_data_file
+        chunks = self.config_obj.chunks
         try:
-            logging.info('Opening ' + filename_in)
-            self.ds = xr.open_dataset(filename_in)
+            logging.info('Opening ' + str(filename_in))
+            if isinstance(filename_in, list) or glob.has_magic(filename_in):
+                # the files are concatenated along time, the other variables
+                # and coordinates are taken from the first file
+                self.ds = xr.open_mfdataset(filename_in, chunks=chunks, combine='by_coords',
+                                            data_vars='minimal', coords='minimal',
+                                            compat='override')
+            else:
+                self.ds = xr.open_dataset(filename_in, chunks=chunks)
         except IOError as exc:
-            logging.error('Unable to open ' + filename_in)
+            logging.error('Unable to open ' + str(filename_in))
             logging.error(exc)
             sys.exit(1)
         logging.debug(self.ds)
 
         dataset = self.ds[self.config_obj.var_name]
         logging.debug(dataset)
-        dataset = dataset.sel(time=slice(self.config_obj.date_start, self.config_obj.date_end))
+        # subset before any arithmetic so the rest of the file is never read
+        dataset = dataset.sel(time=slice(self.config_obj.date_start, self.config_obj.date_end),
+                              lat=slice(self.config_obj.lat_min, self.config_obj.lat_max))
 
         dataset = dataset * self.config_obj.unit_conversion
         dataset.attrs['units'] = self.config_obj.var_units
@@ -195,7 +219,7 @@ class Hovmoeller(BasePlot):
             # save html
             self.figure.write_html(html_name, include_plotlyjs=False)
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
                 Generates a sample hovmoeller diagram using the
                 default and custom config files on sample data.
@@ -204,6 +228,7 @@ def main(config_filename=None):
 
                  Args:
                     @param config_filename: default is None, the name of the custom config file to apply
+                    @param raise_errors: re-raise the ValueError instead of printing it
                 Returns:
 
 
@@ -228,6 +253,8 @@ def main(config_filename=None):
         plot = Hovmoeller(config)
         plot.save_to_file()
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 if __name__ == "__main__":
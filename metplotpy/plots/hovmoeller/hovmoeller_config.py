@@ -41,6 +41,8 @@ class HovmoellerConfig(Config):
         self.date_end = self.get_config_value('date_end')
         self.lat_min = self.get_config_value('lat_min')
         self.lat_max = self.get_config_value('lat_max')
+        self.lat_weighted = self._get_bool('lat_weighted')
+        self.chunks = self.get_config_value('chunks')
         self.var_name = self.get_config_value('var_name')
         self.var_units = self.get_config_value('var_units')
         self.unit_conversion = self.get_config_value('unit_conversion')
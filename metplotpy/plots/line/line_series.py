@@ -28,6 +28,12 @@ import metcalcpy.util.utils as utils
 from ..series import Series
 from .. import GROUP_SEPARATOR
 
+# upper and lower bound columns used by each type of the CI
+CI_COLUMNS = {
+    'BOOT': ('stat_btcu', 'stat_btcl'),
+    'MET_BOOT': ('stat_bcu', 'stat_bcl'),
+    'MET_PRM': ('stat_ncu', 'stat_ncl')
+}
 
 
 
@@ -75,7 +81,7 @@ class LineSeries(Series):
 
         return all_fields_values_no_indy
 
-    def _calc_point_stat(self, data: list) -> Union[float, None]:
+    def _calc_point_stat(self, data: Union[list, np.ndarray]) -> Union[float, None]:
         """
         Calculates the statistic specified in the config 'plot_stat' parameter
         using input data list
@@ -139,45 +145,18 @@ class LineSeries(Series):
                     if utils.is_string_integer(filter_val):
                         filter_list[i] = int(filter_val)
 
-                all_filters.append((self.input_data[field].isin(filter_list)))
+                all_filters.append((field, filter_list))
 
             # filter by provided indy
-
-            # Duck typing is different in Python 3.6 and Python 3.8, for
-            # Python 3.8 and above, explicitly type cast the self.input_data[self.config.indy_var]
-            # Panda Series object to 'str' if the list of indy_vals are of str type.
-            # This will ensure we are doing str to str comparisons.
+            # explicitly do str to str comparisons if the list of indy_vals are of str type
+            all_filters.append((self.config.indy_var, self.config.indy_vals))
             if isinstance(self.config.indy_vals[0], str):
-                indy_var_series = self.input_data[self.config.indy_var].astype(str)
-            else:
-                # The Panda series is as it was originally coded.
-                indy_var_series = self.input_data[self.config.indy_var]
-
-            all_filters.append(indy_var_series.isin(self.config.indy_vals))
-
-            # use numpy to select the rows where any record evaluates to True
-            mask = np.array(all_filters).all(axis=0)
-            self.series_data = self.input_data.loc[mask]
-
-            # sort data by date/time - needed for CI calculations
-            if 'fcst_lead' in self.series_data.columns:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid', 'fcst_lead'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init', 'fcst_lead'])
+                str_columns = [self.config.indy_var]
             else:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init'])
+                str_columns = None
+
+            # select the rows where all filters evaluate to True
+            self.series_data = self._select_series_data(all_filters, str_columns)
 
             # print a message if needed for inconsistent beta_values
             self._check_beta_value()
@@ -272,7 +251,37 @@ class LineSeries(Series):
                 # no data with with the series name value was found - calculate derived statistic for the each line
                 self._calculate_derived_values(operation, series_data_1, series_data_2)
 
+        return self._create_series_points_grouped()
+
+    def _create_series_points_grouped(self) -> dict:
+        """
+        Calculates values for each point including CI using a single grouping
+        of the series data by the independent variable.
+        The rows of every point are located with one hash-based pass instead of
+        scanning the whole series for each independent value. The stat_value and
+        the needed CI columns are converted to a NumPy array only once.
+
+        Returns:
+               dictionary with CI ,point values and number of stats as keys
+        """
         series_points_results = {'dbl_lo_ci': [], 'dbl_med': [], 'dbl_up_ci': [], 'nstat': []}
+        series_ci = self.config.get_config_value('plot_ci')[self.idx].upper()
+
+        # the columns needed to calculate the CI bounds for this series
+        ci_columns = []
+        if series_ci in CI_COLUMNS:
+            ci_columns = [column for column in CI_COLUMNS[series_ci]
+                          if column in self.series_data.columns]
+            if len(ci_columns) != 2:
+                ci_columns = []
+        columns = ['stat_value'] + ci_columns
+
+        # one row per column so every reduction runs over contiguous values
+        # in the same order as the series data
+        values = np.ascontiguousarray(self.series_data[columns].to_numpy(dtype=float).T)
+
+        # positions of the rows for each independent value
+        point_indices = self.series_data.groupby(self.config.indy_var, sort=False).indices
 
         # for each point calculate plot statistic and CI
         indy_vals_ordered = self.config.create_list_by_plot_val_ordering(self.config.indy_vals)
@@ -280,33 +289,31 @@ class LineSeries(Series):
             if utils.is_string_integer(indy):
                 indy = int(indy)
 
-
-            point_data = self.series_data.loc[self.series_data[self.config.indy_var] == indy]
-
-            if len(point_data) > 0:
-                # calculate point stat
-                point_stat = self._calc_point_stat(point_data['stat_value'].tolist())
+            indices = point_indices.get(indy)
+            if indices is not None and len(indices) > 0:
+                point_stats = [self._calc_point_stat(column_values)
+                               for column_values in values[:, indices]]
+                point_stat = point_stats[0]
 
                 # calculate CI
                 dbl_lo_ci = 0
                 dbl_up_ci = 0
-                series_ci = self.config.get_config_value('plot_ci')[self.idx].upper()
-
                 if series_ci == 'STD':
                     std_err_vals = None
+                    stat_values = self.series_data['stat_value'].iloc[indices].tolist()
                     if self.config.plot_stat == 'MEAN':
-                        std_err_vals = utils.compute_std_err_from_mean(point_data['stat_value'].tolist())
+                        std_err_vals = utils.compute_std_err_from_mean(stat_values)
 
                     elif self.config.plot_stat == 'MEDIAN':
                         if self.config.variance_inflation_factor is True:
                             std_err_vals = utils.compute_std_err_from_median_variance_inflation_factor(
-                                point_data['stat_value'].tolist())
+                                stat_values)
                         else:
                             std_err_vals = utils.compute_std_err_from_median_no_variance_inflation_factor(
-                                point_data['stat_value'].tolist())
+                                stat_values)
 
                     elif self.config.plot_stat == 'SUM':
-                        std_err_vals = utils.compute_std_err_from_sum(point_data['stat_value'].tolist())
+                        std_err_vals = utils.compute_std_err_from_sum(stat_values)
 
                     if std_err_vals is not None and std_err_vals[1] == 0:
                         dbl_alpha = self.config.parameters['alpha']
@@ -315,57 +322,30 @@ class LineSeries(Series):
                         dbl_std_err = dbl_z_val * std_err_vals[0]
                         dbl_lo_ci = dbl_std_err
                         dbl_up_ci = dbl_std_err
-                elif series_ci == 'BOOT':
-                    stat_btcu = 0
-                    stat_btcl = 0
-                    if 'stat_btcu' in point_data.head() and 'stat_btcl' in point_data.head():
-                        stat_btcu = self._calc_point_stat(point_data['stat_btcu'].tolist())
-                        stat_btcl = self._calc_point_stat(point_data['stat_btcl'].tolist())
-                        if stat_btcu == -9999:
-                            stat_btcu = 0
-                        if stat_btcl == -9999:
-                            stat_btcl = 0
-
-                    dbl_lo_ci = point_stat - stat_btcl
-                    dbl_up_ci = stat_btcu - point_stat
-
-                elif series_ci == 'MET_BOOT':
-                    stat_bcu = 0
-                    stat_bcl = 0
-                    if 'stat_bcu' in point_data.head() and 'stat_bcl' in point_data.head():
-                        stat_bcu = self._calc_point_stat(point_data['stat_bcu'].tolist())
-                        stat_bcl = self._calc_point_stat(point_data['stat_bcl'].tolist())
-                        if stat_bcu == -9999:
-                            stat_bcu = 0
-                        if stat_bcl == -9999:
-                            stat_bcl = 0
-
-                    dbl_lo_ci = point_stat - stat_bcl
-                    dbl_up_ci = stat_bcu - point_stat
-
-                elif series_ci == 'MET_PRM':
-                    stat_ncu = 0
-                    stat_ncl = 0
-                    if 'stat_ncu' in point_data.head() and 'stat_ncl' in point_data.head():
-                        stat_ncu = self._calc_point_stat(point_data['stat_ncu'].tolist())
-                        stat_ncl = self._calc_point_stat(point_data['stat_ncl'].tolist())
-                        if stat_ncu == -9999:
-                            stat_ncu = 0
-                        if stat_ncl == -9999:
-                            stat_ncl = 0
-
-                    dbl_lo_ci = point_stat - stat_ncl
-                    dbl_up_ci = stat_ncu - point_stat
-
+                elif series_ci in CI_COLUMNS:
+                    stat_up = 0
+                    stat_lo = 0
+                    if ci_columns:
+                        stat_up = point_stats[1]
+                        stat_lo = point_stats[2]
+                        if stat_up == -9999:
+                            stat_up = 0
+                        if stat_lo == -9999:
+                            stat_lo = 0
+
+                    dbl_lo_ci = point_stat - stat_lo
+                    dbl_up_ci = stat_up - point_stat
+                nstat = len(indices)
             else:
                 dbl_lo_ci = None
                 point_stat = None
                 dbl_up_ci = None
+                nstat = 0
 
             series_points_results['dbl_lo_ci'].append(dbl_lo_ci)
             series_points_results['dbl_med'].append(point_stat)
             series_points_results['dbl_up_ci'].append(dbl_up_ci)
-            series_points_results['nstat'].append(len(point_data['stat_value']))
+            series_points_results['nstat'].append(nstat)
 
         return series_points_results
 
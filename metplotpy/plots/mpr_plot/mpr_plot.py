@@ -15,7 +15,9 @@ __author__ = 'Tatiana Burek'
 
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning, module='statsmodels')
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from pandas.api.types import union_categoricals
 import numpy as np
 import statsmodels.formula.api as sm
 import yaml
@@ -31,6 +33,13 @@ from metplotpy.plots.mpr_plot.mpr_plot_config import MprPlotConfig
 from metplotpy.plots.wind_rose.wind_rose import WindRosePlot
 from metplotpy.plots import util
 
+# the columns that define a case
+CASE_COLUMNS = ['MODEL', 'FCST_VAR', 'FCST_LEV', 'OBS_VAR', 'OBS_LEV',
+                'OBTYPE', 'VX_MASK', 'INTERP_MTHD', 'INTERP_PNTS']
+
+# the columns of the MPR line type used by the plots
+MPR_VALUE_COLUMNS = ['FCST', 'OBS']
+
 
 class MprPlotInfo():
     """
@@ -91,29 +100,64 @@ class MprPlot(BasePlot):
 
     def _read_input_data(self) -> None:
         """
-            Aggregates all MPR rows from all files to one DataFrame
+            Aggregates all MPR rows from all files to one DataFrame.
+            The files are read in chunks of mpr_chunk_size rows and only the MPR rows
+            and the columns used by the plots are kept from each chunk,
+            so the memory usage doesn't depend on the size of the files.
+            The files are read by mpr_read_workers threads.
 
             Args:
 
             Returns:
 
         """
-        dtypes = {"VERSION": 'str', 'MODEL': 'str', 'DESC': 'str', 'FCST_LEAD': int}
-
-        # for each file
-        for mpr_file in self.config_obj.mpr_file_list:
-            # read data to the DataFrame
-            input_data = pd.read_csv(mpr_file, delimiter=r"\s+",
-                                     header='infer', float_precision='round_trip',
-                                     dtype=dtypes)
-            # filter MPR data
-            filtered = input_data[input_data['LINE_TYPE'] == 'MPR']
-
-            # append to the main DataFrame
-            if not self.input_df:
-                self.input_df = filtered
-            else:
-                self.input_df = self.input_df.append(filtered)
+        mpr_file_list = self.config_obj.mpr_file_list
+        workers = min(self.config_obj.mpr_read_workers, len(mpr_file_list))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunks_per_file = list(executor.map(self._read_mpr_file, mpr_file_list))
+        else:
+            chunks_per_file = [self._read_mpr_file(mpr_file) for mpr_file in mpr_file_list]
+
+        chunks = [chunk for file_chunks in chunks_per_file for chunk in file_chunks]
+        if not chunks:
+            raise ValueError('mpr_file_list files have no MPR lines')
+
+        # concatenate once; the case columns of the chunks have different categories
+        input_data = {}
+        for column in CASE_COLUMNS:
+            input_data[column] = union_categoricals([chunk[column] for chunk in chunks])
+        for column in MPR_VALUE_COLUMNS:
+            input_data[column] = np.concatenate([chunk[column].to_numpy() for chunk in chunks])
+        self.input_df = pd.DataFrame(input_data)
+
+    def _read_mpr_file(self, mpr_file: str) -> list:
+        """
+            Reads the MPR rows from the file chunk by chunk
+
+            Args:
+                @param mpr_file: the path to the MET output file
+            Returns:
+                the list of DataFrames with the case columns as categories
+                and the FCST and OBS columns
+        """
+        dtypes = {column: 'str' for column in CASE_COLUMNS + ['LINE_TYPE']}
+        dtypes.update({column: 'float64' for column in MPR_VALUE_COLUMNS})
+
+        chunks = []
+        with pd.read_csv(mpr_file, delimiter=r"\s+", header='infer',
+                         float_precision='round_trip',
+                         usecols=list(dtypes), dtype=dtypes,
+                         chunksize=self.config_obj.mpr_chunk_size) as reader:
+            for input_data in reader:
+                # filter MPR data
+                filtered = input_data[input_data['LINE_TYPE'] == 'MPR']
+                if filtered.empty:
+                    continue
+                chunk = {column: filtered[column].astype('category') for column in CASE_COLUMNS}
+                chunk.update({column: filtered[column] for column in MPR_VALUE_COLUMNS})
+                chunks.append(chunk)
+        return chunks
 
     def _create_figure(self) -> go.Figure:
         """
@@ -128,18 +172,11 @@ class MprPlot(BasePlot):
         # read data
         self._read_input_data()
 
-        # Build a list of cases
-        self.input_df['CASE'] = self.input_df.loc[:, 'MODEL'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'FCST_VAR'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'FCST_LEV'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'OBS_VAR'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'OBS_LEV'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'OBTYPE'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'VX_MASK'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'INTERP_MTHD'].astype(str) \
-                                + ' ' + self.input_df.loc[:, 'INTERP_PNTS'].astype(str)
-        # find unique cases
-        cases = self.input_df['CASE'].unique()
+        # find unique cases and their rows in the order of the first appearance;
+        # the category codes are grouped because a missing value is a valid case value
+        case_codes = pd.DataFrame({column: self.input_df[column].cat.codes for column in CASE_COLUMNS})
+        cases = sorted(case_codes.groupby(CASE_COLUMNS, sort=False).indices.values(),
+                       key=lambda case_rows: case_rows[0])
 
         # each case has at least 2 rows (4 plots)
         n_rows = len(cases) * 2
@@ -244,7 +281,7 @@ class MprPlot(BasePlot):
         )
         return fig
 
-    def _create_plots(self, cases: np.ndarray) -> None:
+    def _create_plots(self, cases: list) -> None:
         """
         For the each case create a set of plots:
         - histogram for forecast
@@ -253,14 +290,16 @@ class MprPlot(BasePlot):
         - Q-Q plot
         - wind rose plots for forecast, obs winds and wind error (if requested)
         Calculates the position and the title for each plot
-        :param cases:  list of unique cases
+        :param cases: list of unique cases as arrays with the indices of their rows
         :return:
         """
+        # the case rows by the CASE_COLUMNS values to find the VGRD pair of the UGRD case
+        cases_by_name = {self._get_case_name(case_rows[0]): case_rows for case_rows in cases}
+
         row_n = 1
-        for case_ind, case in enumerate(cases):
+        for case_rows in cases:
             # Get the subset for this case
-            case_subset = self.input_df[self.input_df['CASE'] == case]
-            case_subset.reset_index(inplace=True, drop=True)
+            case_subset = self.input_df.take(case_rows).reset_index(drop=True)
             case_name_1 = f"{case_subset['MODEL'][0]}: {case_subset['FCST_VAR'][0]} at {case_subset['FCST_LEV'][0]}"
             case_name_2 = f"{case_subset['OBTYPE'][0]}, {case_subset['VX_MASK'][0]}, {case_subset['INTERP_MTHD'][0]} ({case_subset['INTERP_PNTS'][0]})"
             case_title = f"{case_name_1}<br>{case_name_2}"
@@ -301,9 +340,10 @@ class MprPlot(BasePlot):
             if self.config_obj.wind_rose and case_subset['FCST_VAR'][0] == \
                     'UGRD' and case_subset['OBS_VAR'][0] == 'UGRD':
                 # Store UGRD/VGRD indices
-                vgrd_case = case.replace("UGRD", "VGRD")
-                vind = self.input_df[self.input_df['CASE'] == vgrd_case]
-                vind.reset_index(inplace=True, drop=True)
+                vgrd_name = tuple(value.replace("UGRD", "VGRD")
+                                  for value in self._get_case_name(case_rows[0]))
+                vgrd_rows = cases_by_name.get(vgrd_name, [])
+                vind = self.input_df.take(vgrd_rows).reset_index(drop=True)
 
                 # in Rscript:  sum(data$OBS_SID[uind] == data$OBS_SID[v_wind_data]) != sum(uind))
                 if len(case_subset) == len(vind):
@@ -325,6 +365,14 @@ class MprPlot(BasePlot):
                 else:
                     print("WARNING: UGRD/VGRD vectors do not exactly match")
 
+    def _get_case_name(self, row: int) -> tuple:
+        """
+        Returns the CASE_COLUMNS values of the row as strings
+        :param row: the index of the row
+        :return: tuple with the case values
+        """
+        return tuple(str(self.input_df[column].iat[row]) for column in CASE_COLUMNS)
+
     def _create_wind_rose_plot(self, u_wind_data: pd.DataFrame,
                                v_wind_data: pd.DataFrame, case_title: str,
                                data_type: str) -> MprPlotInfo:
@@ -553,7 +601,7 @@ class MprPlot(BasePlot):
             print("Oops!  The figure was not created. Can't save.")
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
         Generates a sample, default, line plot using the
         default and custom config files on sample data found in this directory.
@@ -580,6 +628,8 @@ def main(config_filename=None):
         if plot.config_obj.show_in_browser:
             plot.show_in_browser()
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 
@@ -42,6 +42,13 @@ class MprPlotConfig(Config):
         self.wind_rose = self.get_config_value('wind_rose')
         self.plot_filename = self.get_config_value('plot_filename')
         self.mpr_file_list = self.get_config_value('mpr_file_list')
+        # the number of rows read at once and the number of files read at once
+        self.mpr_chunk_size = self.get_config_value('mpr_chunk_size')
+        self.mpr_read_workers = self.get_config_value('mpr_read_workers')
+        if self.mpr_chunk_size is None or self.mpr_chunk_size < 1:
+            raise ValueError('mpr_chunk_size must be a positive number')
+        if self.mpr_read_workers is None or self.mpr_read_workers < 1:
+            raise ValueError('mpr_read_workers must be a positive number')
         self.width = self.get_config_value('width')
         self.height = self.get_config_value('height')
         self.marker_color = self.get_config_value('marker_color')
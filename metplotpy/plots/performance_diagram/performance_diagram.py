@@ -14,16 +14,15 @@ Class Name: performance_diagram.py
 __author__ = 'Minna Win'
 
 import os
+import pickle
 import re
 import matplotlib.pyplot as plt
-from matplotlib.colors import BoundaryNorm
 from matplotlib.colors import LinearSegmentedColormap
 from matplotlib.font_manager import FontProperties
 import numpy as np
 import yaml
-import pandas as pd
 from metplotpy.plots.base_plot import BasePlot
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 from metplotpy.plots.performance_diagram.performance_diagram_config import PerformanceDiagramConfig
 from metplotpy.plots.performance_diagram.performance_diagram_series import PerformanceDiagramSeries
 from metplotpy.plots import util
@@ -32,6 +31,10 @@ import warnings
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+# pickled figures with the equal lines of CSI and bias keyed by
+# the figure width, height and the contour legend setting
+_TEMPLATES = {}
+
 
 class PerformanceDiagram(BasePlot):
     """  Generates a performance diagram (multi-line line plot)
@@ -71,7 +74,7 @@ class PerformanceDiagram(BasePlot):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -96,7 +99,8 @@ class PerformanceDiagram(BasePlot):
                  the pandas dataframe representation of the input data file
 
         """
-        df_full = pd.read_csv(self.config_obj.stat_input, sep='\t', header='infer')
+        df_full = self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
         # Remove any columns that are entirely 'NaN' this will be helpful
         # in determining whether we have aggregated statistics (stat_btcl and
@@ -166,6 +170,34 @@ class PerformanceDiagram(BasePlot):
         else:
             print("Matplotlib implementation of this plot, this plot won't be visible in browser.")
 
+    def _create_template(self):
+        """
+        Creates the figure with the "template" of the performance diagram: the filled
+        contours of the equal lines of CSI, the equal lines of bias with their labels
+        and the optional CSI legend.  The template is drawn once for each figure size
+        and contour legend setting, a pickled copy is kept in _TEMPLATES and the next
+        figures are created from it.
+
+        Args:
+
+        Returns:
+            the new figure (the current pyplot figure) and its two y-axes
+        """
+        key = (self.config_obj.plot_width, self.config_obj.plot_height,
+               bool(self.config_obj.plot_contour_legend))
+        template = _TEMPLATES.get(key)
+        if template is None:
+            fig = _draw_template(*key)
+            _TEMPLATES[key] = pickle.dumps(fig)
+        else:
+            # the unpickled figure is registered with pyplot and becomes the current figure
+            fig = pickle.loads(template)
+        ax1, ax2 = fig.axes[:2]
+
+        # the series, title and tick settings are plotted on the current (twin) axes
+        fig.sca(ax2)
+        return fig, ax1, ax2
+
     def _create_figure(self):
         """
         Generate the performance diagram of varying number of series with POD and 1-FAR
@@ -181,60 +213,15 @@ class PerformanceDiagram(BasePlot):
             and equal lines of bias
         """
 
-        # This creates a figure size that is of a "reasonable" size, in inches
-        fig = plt.figure(figsize=(self.config_obj.plot_width, self.config_obj.plot_height))
-
-        #
-        # PLOT THE "TEMPLATE" THAT CREATES THE EQUAL LINES OF CSI AND EQUAL LINES OF BIAS
-        # THAT COMPRISE THE PERFORMANCE DIAGRAM
-        #
-
-        # add an extra y-axis to indicate tick marks for the equal lines of CSI
-        ax1 = fig.add_subplot(111)
-        ax2 = ax1.twinx()
-        ax1.set_xlim([0, 1])
-        ax1.set_ylim([0, 1])
-        ax2.set_xlim([0, 1])
-        ax2.set_ylim([0, 1])
-
-        # Using Logan Dawson's template for the performance diagram, which is
-        # easier to read and maintain than the previous implementation.
-        x_axis = y_axis = np.arange(0.01, 1.01, 0.01)
-        x_mesh, y_mesh = np.meshgrid(x_axis, y_axis)
-        bounds = np.arange(0, 1.10, 0.10)
-        BoundaryNorm(bounds, len(bounds))
-        colors = ['#ffffff', '#f0f0f0', '#e3e3e3', '#d6d6d6', '#c9c9c9', '#bdbdbd', '#b0b0b0',
-                  '#a3a3a3', '#969696', '#8a8a8a']
-        colormap = LinearSegmentedColormap.from_list('percentdiff_cbar', colors, N=len(bounds))
-
-        csi = ((1 / x_mesh) + (1 / y_mesh) - 1) ** -1
-        cs_var = ax1.contourf(x_mesh, y_mesh, csi, np.arange(0.0, 1.1, 0.1), cmap=colormap)
-        csi_label = "Critical Success Index"
-
-        biases = [0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0, 10.0]
-        bias_loc_x = [0.94, 0.935, 0.94, 0.935, 0.9, 0.58, 0.42, 0.18, 0.03]
-        bias_loc_y = [0.12, 0.2625, 0.5, 0.74, 0.95, 0.95, 0.95, 0.95, 0.95]
-
-        bias = y_mesh / x_mesh
-        ax1.contour(x_mesh, y_mesh, bias, biases, colors='black', linestyles='--')
-
-        for i, j in enumerate(biases):
-            ax1.annotate(j, (bias_loc_x[i], bias_loc_y[i]), fontsize=12)
+        # The equal lines of CSI and bias depend only on the size of the figure
+        # and the contour legend, so they are drawn once and reused
+        fig, ax1, ax2 = self._create_template()
 
         # Format the underlying performance diagram axes, labels, equal lines of CSI,
         # equal lines of bias.
         xlabel = self.config_obj.xaxis
         ylabel = self.config_obj.yaxis_1
 
-        # From original implementation, replace this with Logan's for now
-        # Optional: plot the legend for the contour lines representing the
-        # equal lines of CSI.
-        #
-        plot_contour_legend = self.config_obj.plot_contour_legend
-        if plot_contour_legend:
-            cbar = plt.colorbar(cs_var)
-            cbar.set_label(csi_label, fontsize=9)
-
         # use FontProperties to re-create the weights set in METviewer
         fontobj = FontProperties()
         font_title = fontobj.copy()
@@ -371,8 +358,8 @@ class PerformanceDiagram(BasePlot):
 
         # use plt.tight_layout() to prevent label box from scrolling off the figure
         plt.tight_layout()
-        plt.savefig(self.get_config_value('plot_filename'))
         self.save_to_file()
+        plt.close(fig)
 
     def write_output_file(self):
         """
@@ -434,7 +421,66 @@ class PerformanceDiagram(BasePlot):
             fileobj.close()
 
 
-def main(config_filename=None):
+def _draw_template(plot_width, plot_height, plot_contour_legend):
+    """
+        Draws the equal lines of CSI and the equal lines of bias
+        that comprise the performance diagram on a new figure.
+
+        Args:
+            @param plot_width: the width of the figure in inches
+            @param plot_height: the height of the figure in inches
+            @param plot_contour_legend: True to plot the legend for the equal lines of CSI
+
+        Returns:
+            the figure with two y-axes, the twin axes is the current one
+    """
+
+    # This creates a figure size that is of a "reasonable" size, in inches
+    fig = plt.figure(figsize=(plot_width, plot_height))
+
+    # add an extra y-axis to indicate tick marks for the equal lines of CSI
+    ax1 = fig.add_subplot(111)
+    ax2 = ax1.twinx()
+    ax1.set_xlim([0, 1])
+    ax1.set_ylim([0, 1])
+    ax2.set_xlim([0, 1])
+    ax2.set_ylim([0, 1])
+
+    # Using Logan Dawson's template for the performance diagram, which is
+    # easier to read and maintain than the previous implementation.
+    x_axis = y_axis = np.arange(0.01, 1.01, 0.01)
+    x_mesh, y_mesh = np.meshgrid(x_axis, y_axis)
+    bounds = np.arange(0, 1.10, 0.10)
+    colors = ['#ffffff', '#f0f0f0', '#e3e3e3', '#d6d6d6', '#c9c9c9', '#bdbdbd', '#b0b0b0',
+              '#a3a3a3', '#969696', '#8a8a8a']
+    colormap = LinearSegmentedColormap.from_list('percentdiff_cbar', colors, N=len(bounds))
+
+    csi = ((1 / x_mesh) + (1 / y_mesh) - 1) ** -1
+    cs_var = ax1.contourf(x_mesh, y_mesh, csi, np.arange(0.0, 1.1, 0.1), cmap=colormap)
+    csi_label = "Critical Success Index"
+
+    biases = [0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0, 10.0]
+    bias_loc_x = [0.94, 0.935, 0.94, 0.935, 0.9, 0.58, 0.42, 0.18, 0.03]
+    bias_loc_y = [0.12, 0.2625, 0.5, 0.74, 0.95, 0.95, 0.95, 0.95, 0.95]
+
+    bias = y_mesh / x_mesh
+    ax1.contour(x_mesh, y_mesh, bias, biases, colors='black', linestyles='--')
+
+    for i, j in enumerate(biases):
+        ax1.annotate(j, (bias_loc_x[i], bias_loc_y[i]), fontsize=12)
+
+    # From original implementation, replace this with Logan's for now
+    # Optional: plot the legend for the contour lines representing the
+    # equal lines of CSI.
+    #
+    if plot_contour_legend:
+        cbar = plt.colorbar(cs_var)
+        cbar.set_label(csi_label, fontsize=9)
+
+    return fig
+
+
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, line plot using a combination of
             default and custom config files on sample data found in this directory.
@@ -443,6 +489,7 @@ def main(config_filename=None):
 
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
             Returns:
 
     """
@@ -465,6 +512,8 @@ def main(config_filename=None):
         PerformanceDiagram(docs)
 
     except ValueError as value_error:
+        if raise_errors:
+            raise
         print(value_error)
 
 
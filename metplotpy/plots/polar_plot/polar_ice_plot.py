@@ -28,6 +28,7 @@ import xarray as xr
 import pandas as pd
 from pyproj import Geod
 import pyresample as pyr
+from metplotpy.plots.resample_cache import ResampleCache
 from datetime import datetime, date
 import PIL 
 from PIL import Image
@@ -172,6 +173,12 @@ def process_one_day(config,hemisphere):
     # into the yaml file you are using
     obs_netcdf_var_name = config['obs_netcdf_var_name']
     forecast_netcdf_var_name = config['forecast_netcdf_var_name']
+    # optional: the directory of the cached resampling weights and
+    # the number of processes used to find the neighbours
+    resample_cache_dir = config.get('resample_cache_dir')
+    if resample_cache_dir is not None:
+        resample_cache_dir = os.path.expanduser(resample_cache_dir)
+    nprocs = int(config.get('nprocs', 8))
     ice_data=xr.open_dataset(input_file,decode_times=True)
     obs_ice=ice_data[obs_netcdf_var_name][:-1,:-1,]
     fcst_ice=ice_data[forecast_netcdf_var_name][:-1,:-1,]
@@ -222,12 +229,14 @@ def process_one_day(config,hemisphere):
     targ_def = pyr.geometry.GridDefinition(lons=nlon1,lats=nlat1)
     radius=50000
     sigmas=25000    
-    rice2=pyr.kd_tree.resample_gauss(orig_def,rice,targ_def,
-                                     radius_of_influence=radius,
-                                     sigmas=sigmas,
-                                     nprocs=8,
-                                     neighbours=8,
-                                     fill_value=None)
+    # the weights of the neighbours depend only on the grids, they are
+    # calculated once and reused from the cache directory if it is set
+    resample_cache = ResampleCache(resample_cache_dir)
+    rice2=resample_cache.resample_gauss(orig_def,rice,targ_def,
+                                        radius_of_influence=radius,
+                                        sigmas=sigmas,
+                                        nprocs=nprocs,
+                                        neighbours=8)
             
     print('creating combined mask')
     combined_mask=np.logical_and(nice.mask,rice2.mask)
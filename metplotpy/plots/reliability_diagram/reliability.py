@@ -20,7 +20,6 @@ from typing import Union
 
 import yaml
 import numpy as np
-import pandas as pd
 
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -99,8 +98,8 @@ class Reliability(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.parameters['stat_input'], sep='\t',
-                           header='infer', float_precision='round_trip')
+        return self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -691,7 +690,7 @@ class Reliability(BasePlot):
             print('Can\'t save points to a file')
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, line plot using the
             default and custom config files on sample data found in this directory.
@@ -699,6 +698,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -721,6 +721,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
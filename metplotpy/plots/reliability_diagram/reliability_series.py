@@ -111,33 +111,9 @@ class ReliabilitySeries(Series):
                     if utils.is_string_integer(filter_val):
                         filter_list[i] = int(filter_val)
 
-                all_filters.append((self.input_data[field].isin(filter_list)))
-            # use numpy to select the rows where any record evaluates to True
-            if all_filters:
-                mask = np.array(all_filters).all(axis=0)
-                self.series_data = self.input_data.loc[mask]
-            else:
-                self.series_data = self.input_data
-
-            # sort data by date/time - needed for CI calculations
-            if 'fcst_lead' in self.series_data.columns:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid', 'fcst_lead'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init', 'fcst_lead'])
-            else:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init'])
+                all_filters.append((field, filter_list))
+            # select the rows where all filters evaluate to True
+            self.series_data = self._select_series_data(all_filters)
 
             obar_data = self.series_data.loc[lambda df: df['stat_name'] == 'PSTD_BASER', :]
             calibration_data = self.series_data.loc[lambda df: df['stat_name'] == 'PSTD_CALIBRATION', :]
@@ -0,0 +1,292 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Class Name: resample_cache.py
+ """
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Union
+
+import numpy as np
+from scipy import sparse
+
+# version of the cached weights format, a new version invalidates the old files
+CACHE_VERSION = 1
+
+CACHE_FILE_EXTENSION = '.npz'
+
+
+class GaussWeights:
+    """
+        The Gaussian weights of the pyresample kd-tree resampling between
+        two grids as a sparse matrix. The matrix has a row for each valid target
+        point and a column for each valid source point. It keeps the neighbours
+        outside of the radius of influence as explicit zeros in the order of
+        the neighbours, so applying the weights gives exactly the same values
+        as pyresample.kd_tree.resample_gauss, including the not a number values.
+    """
+
+    def __init__(self, output_shape: tuple, valid_input_index: np.ndarray,
+                 valid_output_index: np.ndarray, matrix: sparse.csr_matrix, norm: np.ndarray):
+        """
+        :param output_shape: the shape of the target grid
+        :param valid_input_index: the boolean index of the source points used by the resampling
+        :param valid_output_index: the boolean index of the resampled target points
+        :param matrix: the weights of the neighbours
+        :param norm: the sum of the weights of each row
+        """
+        self.output_shape = tuple(output_shape)
+        self.valid_input_index = valid_input_index
+        self.valid_output_index = valid_output_index
+        self.matrix = matrix
+        self.norm = norm
+
+    @classmethod
+    def from_grids(cls, source_geo_def, target_geo_def, radius_of_influence: float,
+                   sigmas: float, neighbours: int = 8, epsilon: float = 0, nprocs: int = 1):
+        """
+        Finds the neighbours of the target points with the pyresample kd-tree
+        and calculates their Gaussian weights
+
+        :param source_geo_def: the pyresample geometry definition of the source grid
+        :param target_geo_def: the pyresample geometry definition of the target grid
+        :param radius_of_influence: the cut off distance in meters
+        :param sigmas: the sigma of the Gaussian weights in meters
+        :param neighbours: the number of neighbours of each target point, at least 2
+        :param epsilon: the allowed uncertainty of the neighbour distances in meters
+        :param nprocs: the number of processes used by the kd-tree
+        :return: the weights
+        """
+        from pyresample import kd_tree
+
+        if neighbours < 2:
+            raise ValueError('The Gaussian weights require at least 2 neighbours')
+
+        valid_input_index, valid_output_index, index_array, distance_array = \
+            kd_tree.get_neighbour_info(source_geo_def, target_geo_def, radius_of_influence,
+                                       neighbours=neighbours, epsilon=epsilon, nprocs=nprocs)
+        input_size = int(valid_input_index.sum())
+        rows = index_array.shape[0]
+
+        # the neighbours outside of the radius have the index input_size,
+        # pyresample replaces them with 0 and multiplies their values by a zero weight
+        outside = index_array == input_size
+        distance = np.where(outside, 1, distance_array)
+        weights = np.exp(-distance ** 2 / float(sigmas) ** 2)
+        weights = np.where(outside, 0.0, weights)
+        norm = np.zeros(rows)
+        for i in range(neighbours):
+            norm += weights[:, i]
+
+        matrix = sparse.csr_matrix((weights.ravel(), np.where(outside, 0, index_array).ravel(),
+                                    np.arange(0, rows * neighbours + 1, neighbours)),
+                                   shape=(rows, input_size))
+        return cls(target_geo_def.shape, valid_input_index, valid_output_index, matrix, norm)
+
+    def apply(self, data: np.ndarray) -> np.ma.MaskedArray:
+        """
+        Resamples the field of the source grid to the target grid.
+        The target points are masked if they have a masked neighbour
+        or no neighbours.
+
+        :param data: the field of the source grid, a masked or plain array
+        :return: the masked array of the resampled field
+        """
+        data = data.ravel()[self.valid_input_index]
+        values = np.ma.getdata(data)
+        fill_value = _get_fill_value(values.dtype)
+        channels = [values]
+        is_masked_data = np.ma.is_masked(data)
+        if is_masked_data:
+            channels.append(np.ma.getmaskarray(data).astype(values.dtype))
+
+        results = []
+        valid = self.norm > 0
+        for channel in channels:
+            # the rows of the matrix keep the order of the neighbours
+            # so the sums are the same as the sums of pyresample
+            result = self.matrix.dot(channel)
+            result[valid] /= self.norm[valid]
+            result[~valid] = fill_value
+            full_result = np.full(self.valid_output_index.size, fill_value, dtype=result.dtype)
+            full_result[self.valid_output_index.ravel()] = result
+            results.append(full_result.reshape(self.output_shape))
+
+        result = results[0]
+        if is_masked_data:
+            # all the points affected by the masked points are masked out
+            result = np.ma.array(result, mask=results[1] != 0)
+        return np.ma.masked_equal(result, fill_value)
+
+    def save(self, file_name: str) -> None:
+        """
+        Saves the weights to the uncompressed numpy file
+        :param file_name: the path to the file
+        """
+        np.savez(file_name, version=CACHE_VERSION, output_shape=np.array(self.output_shape),
+                 valid_input_index=self.valid_input_index,
+                 valid_output_index=self.valid_output_index,
+                 data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+                 shape=np.array(self.matrix.shape), norm=self.norm)
+
+    @classmethod
+    def load(cls, file_name: str):
+        """
+        Reads the weights saved by save()
+        :param file_name: the path to the file
+        :return: the weights or None if the file has another version
+        """
+        with np.load(file_name) as arrays:
+            if int(arrays['version']) != CACHE_VERSION:
+                return None
+            matrix = sparse.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                                       shape=tuple(arrays['shape']))
+            return cls(tuple(arrays['output_shape']), arrays['valid_input_index'],
+                       arrays['valid_output_index'], matrix, arrays['norm'])
+
+
+class ResampleCache:
+    """
+        Stores the Gaussian weights of the kd-tree resampling between two grids
+        in the cache directory. The weights are identified by the hash of
+        the longitudes and latitudes of both grids and the resampling options,
+        so they are calculated once and the next fields on the same grids
+        are resampled with a sparse matrix multiplication.
+
+        To use:
+            cache = ResampleCache(cache_dir)
+            resampled = cache.resample_gauss(source_geo_def, data, target_geo_def,
+                                             radius_of_influence=50000, sigmas=25000)
+    """
+
+    def __init__(self, cache_dir: Union[str, None] = None):
+        """
+        Creates the cache directory if it doesn't exist
+
+        :param cache_dir: the path to the cache directory or None to keep
+            the weights only in memory
+        """
+        self.cache_dir = cache_dir
+        self._weights = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def resample_gauss(self, source_geo_def, data: np.ndarray, target_geo_def,
+                       radius_of_influence: float, sigmas: float, neighbours: int = 8,
+                       epsilon: float = 0, nprocs: int = 1) -> np.ma.MaskedArray:
+        """
+        Resamples the field like pyresample.kd_tree.resample_gauss with fill_value=None
+
+        :param source_geo_def: the pyresample geometry definition of the source grid
+        :param data: the field of the source grid
+        :param target_geo_def: the pyresample geometry definition of the target grid
+        :param radius_of_influence: the cut off distance in meters
+        :param sigmas: the sigma of the Gaussian weights in meters
+        :param neighbours: the number of neighbours of each target point
+        :param epsilon: the allowed uncertainty of the neighbour distances in meters
+        :param nprocs: the number of processes used by the kd-tree
+            if the weights are not in the cache
+        :return: the masked array of the resampled field
+        """
+        weights = self.get_weights(source_geo_def, target_geo_def, radius_of_influence,
+                                   sigmas, neighbours, epsilon, nprocs)
+        return weights.apply(data)
+
+    def get_weights(self, source_geo_def, target_geo_def, radius_of_influence: float,
+                    sigmas: float, neighbours: int = 8, epsilon: float = 0,
+                    nprocs: int = 1) -> GaussWeights:
+        """
+        Reads the weights from the cache or calculates and saves them
+
+        :return: the weights
+        """
+        key = _get_key(source_geo_def, target_geo_def,
+                       {'radius_of_influence': float(radius_of_influence), 'sigmas': float(sigmas),
+                        'neighbours': int(neighbours), 'epsilon': float(epsilon)})
+        if key in self._weights:
+            return self._weights[key]
+
+        weights = None
+        cache_file = None
+        if self.cache_dir is not None:
+            cache_file = os.path.join(self.cache_dir, key + CACHE_FILE_EXTENSION)
+            if os.path.exists(cache_file):
+                try:
+                    weights = GaussWeights.load(cache_file)
+                except (OSError, ValueError, KeyError):
+                    # the file is corrupted
+                    weights = None
+
+        if weights is None:
+            weights = GaussWeights.from_grids(source_geo_def, target_geo_def, radius_of_influence,
+                                              sigmas, neighbours, epsilon, nprocs)
+            if cache_file is not None:
+                _save_weights(weights, cache_file, self.cache_dir)
+
+        self._weights[key] = weights
+        return weights
+
+
+def _save_weights(weights: GaussWeights, cache_file: str, cache_dir: str) -> None:
+    """
+    Saves the weights to a temporary file and renames it so the other processes
+    never see a partial file
+    :param weights: the weights
+    :param cache_file: the path to the cached file
+    :param cache_dir: the path to the cache directory
+    """
+    tmp_file = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=CACHE_FILE_EXTENSION,
+                                         delete=False) as tmp:
+            tmp_file = tmp.name
+            weights.save(tmp)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _get_key(source_geo_def, target_geo_def, options: dict) -> str:
+    """
+    Creates the hash of the longitudes and latitudes of the grids and the options
+    :param source_geo_def: the pyresample geometry definition of the source grid
+    :param target_geo_def: the pyresample geometry definition of the target grid
+    :param options: the resampling options
+    :return: the hex digest
+    """
+    key = hashlib.sha256()
+    key.update(json.dumps({'version': CACHE_VERSION, 'options': options}, sort_keys=True)
+               .encode('utf-8'))
+    for geo_def in (source_geo_def, target_geo_def):
+        lons, lats = geo_def.get_lonlats()
+        for coordinate in (lons, lats):
+            coordinate = np.ascontiguousarray(coordinate)
+            key.update(str((coordinate.shape, coordinate.dtype.str)).encode('utf-8'))
+            key.update(coordinate.tobytes())
+    return key.hexdigest()
+
+
+def _get_fill_value(data_type: np.dtype) -> Union[int, float]:
+    """
+    Returns the fill value of the resampled points without neighbours,
+    the maximum value of the data type like pyresample
+    :param data_type: the type of the field
+    :return: the fill value
+    """
+    if issubclass(data_type.type, np.floating):
+        return np.finfo(data_type.type).max
+    if issubclass(data_type.type, np.integer):
+        return np.iinfo(data_type.type).max
+    raise TypeError(f'Type {data_type.type} is unsupported for masked fill values')
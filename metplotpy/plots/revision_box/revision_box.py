@@ -18,9 +18,10 @@ import plotly.graph_objects as go
 from metplotpy.plots.base_plot import BasePlot
 
 from metplotpy.plots.box.box import Box
+from metplotpy.plots.box.box_statistics import calculate_box_statistics
 from metplotpy.plots import util
 
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 from metplotpy.plots.constants import PLOTLY_AXIS_LINE_COLOR, PLOTLY_AXIS_LINE_WIDTH
 from metplotpy.plots.revision_box.revision_box_config import RevisionBoxConfig
 from metplotpy.plots.revision_box.revision_box_series import RevisionBoxSeries
@@ -63,7 +64,7 @@ class RevisionBox(Box):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -191,17 +192,28 @@ class RevisionBox(Box):
             marker_symbol = 'circle'
             marker_line_color = series.color
 
+        if self.config_obj.box_precomputed:
+            # send only the statistics of the box (and the points to display) to Plotly
+            box_data = calculate_box_statistics(series.series_points['points']['stat_value'],
+                                                boxpoints=self.config_obj.boxpoints,
+                                                notched=self.config_obj.box_notch,
+                                                box_mean=self.config_obj.box_avg)
+            # the position of the box is its name like for the raw values
+            box_data['x'] = [series.user_legends]
+        else:
+            box_data = dict(y=series.series_points['points']['stat_value'].tolist(),
+                            boxpoints=self.config_obj.boxpoints)
+
         # create a trace
         self.figure.add_trace(
             go.Box(  # x=[series.idx],
-                y=series.series_points['points']['stat_value'].tolist(),
+                **box_data,
                 notched=self.config_obj.box_notch,
                 line=line_color,
                 fillcolor=fillcolor,
                 name=series.user_legends,
                 showlegend=True,
                 boxmean=self.config_obj.box_avg,
-                boxpoints=self.config_obj.boxpoints,  # outliers, all, False
                 pointpos=0,
                 marker=dict(size=4,
                             color=marker_color,
@@ -280,7 +292,7 @@ class RevisionBox(Box):
                 file_object.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
         Generates a sample, default, revision box plot using a combination of
         default and custom config files on sample data found in this directory.
@@ -288,6 +300,7 @@ def main(config_filename=None):
         custom config file.
         Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
     """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -310,6 +323,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 
@@ -118,6 +118,9 @@ class RevisionBoxConfig(Config):
         if self.box_pts is True:
             self.boxpoints = 'all'
 
+        # calculate the box statistics instead of sending all values to Plotly
+        self.box_precomputed = self._get_bool('box_precomputed')
+
         self.revision_ac = self._get_bool('revision_ac')
         self.revision_run = self._get_bool('revision_run')
         self.indy_stagger = self._get_bool('indy_stagger_1')
@@ -13,7 +13,6 @@ Class Name: RevisionBoxSeries
 
 import math
 import re
-from datetime import datetime
 import numpy as np
 import pandas as pd
 
@@ -32,6 +31,44 @@ class RevisionBoxSeries(BoxSeries):
 
     """
 
+    def _calculate_revisions(self) -> pd.DataFrame:
+        """
+        Calculates the revisions of the series data: the difference between
+        the values of the two longest lead times for each fcst_valid_beg.
+        The result has one row for each fcst_valid_beg, sorted ascending,
+        with the revision in the stat_value column (NaN if fcst_valid_beg
+        has only one lead time) and the label of the valid date/time in
+        the fcst_lead column.
+
+        Returns:
+               the data frame with the revisions
+        """
+        # sort data by fcst_valid_beg ascending and fcst_lead descending
+        self.series_data = self.series_data.sort_values(by=['fcst_valid_beg', 'fcst_lead'],
+                                                        ascending=[True, False])
+
+        # make sure that the data is valid
+        # each valid date/time should have a unique list of lead times
+        # if the list is not unique - throw an error
+        duplicated = self.series_data.duplicated(subset=['fcst_valid_beg', 'fcst_lead'])
+        if duplicated.any():
+            valid = self.series_data.loc[duplicated, 'fcst_valid_beg'].iloc[0]
+            raise ValueError(
+                "Valid date " + valid + " for " + self.user_legends + " doesn't have unique lead times.")
+
+        # calculate revision by calculating the difference between next and current hour
+        # for the first (longest) lead time of each fcst_valid_beg
+        next_value = self.series_data.groupby('fcst_valid_beg', sort=False)['stat_value'].shift(-1)
+        is_first = ~self.series_data['fcst_valid_beg'].duplicated().to_numpy()
+        result = self.series_data.loc[is_first]
+        result = result.assign(
+            stat_value=next_value.to_numpy()[is_first] - result['stat_value'].to_numpy(),
+            fcst_lead=pd.to_datetime(result['fcst_valid_beg']).dt.strftime('%m-%d %H').to_numpy())
+
+        # each fcst_valid_beg has one row with the index 0
+        result.index = np.zeros(len(result), dtype=np.int64)
+        return result
+
     def _create_series_points(self) -> dict:
         """
         Subset the data for the appropriate series.
@@ -64,91 +101,23 @@ class RevisionBoxSeries(BoxSeries):
                 if utils.is_string_integer(filter_val):
                     filter_list[i] = int(filter_val)
 
-            all_filters.append((self.input_data[field].isin(filter_list)))
+            all_filters.append((field, filter_list))
 
             # filter by provided indy
-
-            # Duck typing is different in Python 3.6 and Python 3.8, for
-            # Python 3.8 and above, explicitly type cast the self.input_data[self.config.indy_var]
-            # Panda Series object to 'str' if the list of indy_vals are of str type.
-            # This will ensure we are doing str to str comparisons.
+            # explicitly do str to str comparisons if the list of indy_vals are of str type
+            all_filters.append((self.config.indy_var, self.config.indy_vals))
             if isinstance(self.config.indy_vals[0], str):
-                indy_var_series = self.input_data[self.config.indy_var].astype(str)
-            else:
-                # The Panda series is as it was originally coded.
-                indy_var_series = self.input_data[self.config.indy_var]
-
-            all_filters.append(indy_var_series.isin(self.config.indy_vals))
-
-            # use numpy to select the rows where any record evaluates to True
-            mask = np.array(all_filters).all(axis=0)
-            self.series_data = self.input_data.loc[mask]
-
-            # sort data by date/time - needed for CI calculations
-            if 'fcst_lead' in self.series_data.columns:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg', 'fcst_lead'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid', 'fcst_lead'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg', 'fcst_lead'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init', 'fcst_lead'])
+                str_columns = [self.config.indy_var]
             else:
-                if 'fcst_valid_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid_beg'])
-                if 'fcst_valid' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_valid'])
-                if 'fcst_init_beg' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init_beg'])
-                if 'fcst_init' in self.series_data.columns:
-                    self.series_data = self.series_data.sort_values(['fcst_init'])
+                str_columns = None
+
+            # select the rows where all filters evaluate to True
+            self.series_data = self._select_series_data(all_filters, str_columns)
 
             # print a message if needed for inconsistent beta_values
             self._check_beta_value()
 
-        # sort data by fcst_valid_beg ascending and fcst_lead descending
-        self.series_data = self.series_data.sort_values(by=['fcst_valid_beg', 'fcst_lead'], ascending=[True, False])
-        # get unique fcst_valid_beg
-        unique_fcst_valid_beg = self.series_data.fcst_valid_beg.unique()
-
-        labels_for_x = []
-        result = None
-
-        # suppress the warning by changing the default behavior
-        pd.set_option('mode.chained_assignment', None)
-
-        # for each fcst_valid_beg calculate the differences
-        for valid in unique_fcst_valid_beg:
-            data_for_valid = self.series_data.loc[self.series_data['fcst_valid_beg'] == valid]
-            data_for_valid.reset_index(drop=True, inplace=True)
-            # make sure that the data is valid
-            # each valid date/time should have a unique list of lead times
-            # if the list is not unique - throw an error
-            fcst_leads = data_for_valid['fcst_lead'].tolist()
-            if len(set(fcst_leads)) != len(fcst_leads):
-                raise ValueError(
-                    "Valid date " + valid + " for " + self.user_legends + " doesn't have unique lead times.")
-            if len(data_for_valid) == 1:
-                # van't calculate revision for one value
-                data_for_valid.loc[0, 'stat_value'] = None
-                data_for_valid.loc[0, 'fcst_lead'] = None
-            else:
-                # calculate revision by calculating the difference between next and current hour
-                for i in range(len(data_for_valid)-1):
-                    data_for_valid.loc[i, 'stat_value'] = data_for_valid.loc[i + 1, 'stat_value'] - data_for_valid.loc[
-                            i, 'stat_value']
-                    data_for_valid.loc[i, 'fcst_lead'] = None
-                data_for_valid = data_for_valid.drop(data_for_valid.index.to_list()[1:], axis=0)
-
-            datetime_object = datetime.fromisoformat(data_for_valid.loc[0, 'fcst_valid_beg'])
-            data_for_valid.loc[0, 'fcst_lead'] = datetime_object.strftime('%m-%d %H')
-
-            labels_for_x.extend(data_for_valid['fcst_lead'].tolist())
-            if result is None:
-                result = data_for_valid
-            else:
-                result = pd.concat([result, data_for_valid])
+        result = self._calculate_revisions()
 
         series_points_results = {
             'revision_run': None,
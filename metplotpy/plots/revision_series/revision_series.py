@@ -27,7 +27,7 @@ from metplotpy.plots.line.line import Line
 from metplotpy.plots import util
 from metplotpy.plots.series import Series
 
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 from plots.revision_series.revision_series_config import RevisionSeriesConfig
 from plots.revision_series.revision_series_series import RevisionSeriesSeries
 
@@ -72,7 +72,7 @@ class RevisionSeries(Line):
 
         # Apply event equalization, if requested
         if self.config_obj.use_ee is True:
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -281,7 +281,7 @@ class RevisionSeries(Line):
             file.close()
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, RevisionSeries plot using the
             default and custom config files on sample data found in this directory.
@@ -289,6 +289,7 @@ def main(config_filename=None):
             custom config file.
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
         """
 
     # Retrieve the contents of the custom config file to over-ride
@@ -311,6 +312,8 @@ def main(config_filename=None):
         plot.write_html()
         plot.write_output_file()
     except ValueError as val_er:
+        if raise_errors:
+            raise
         print(val_er)
 
 
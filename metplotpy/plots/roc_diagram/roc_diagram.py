@@ -17,7 +17,6 @@ import os
 import yaml
 import re
 import sys
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from metplotpy.plots import util
@@ -25,7 +24,7 @@ from metplotpy.plots import constants
 from metplotpy.plots.base_plot import BasePlot
 from metplotpy.plots.roc_diagram.roc_diagram_config import ROCDiagramConfig
 from metplotpy.plots.roc_diagram.roc_diagram_series import ROCDiagramSeries
-import metcalcpy.util.utils as calc_util
+from metplotpy.plots.event_equalization import perform_event_equalization
 
 
 class ROCDiagram(BasePlot):
@@ -79,7 +78,7 @@ class ROCDiagram(BasePlot):
                 # add sub-dictionary to fixed_vars_vals_input
                 self.parameters['fixed_vars_vals_input']['thresh_i'] = thresh_i_0
 
-            self.input_df = calc_util.perform_event_equalization(self.parameters, self.input_df)
+            self.input_df = perform_event_equalization(self.parameters, self.input_df)
 
         # Create a list of series objects.
         # Each series object contains all the necessary information for plotting,
@@ -110,7 +109,8 @@ class ROCDiagram(BasePlot):
             Returns:
 
         """
-        return pd.read_csv(self.config_obj.stat_input, sep='\t', header='infer')
+        return self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
     def _create_series(self, input_data):
         """
@@ -440,7 +440,7 @@ class ROCDiagram(BasePlot):
             self.figure.write_html(html_name, include_plotlyjs=False)
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, ROC diagram using the
             default and custom config files on sample data found in this directory.
@@ -449,6 +449,7 @@ def main(config_filename=None):
 
              Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
             Returns:
         """
 
@@ -473,6 +474,8 @@ def main(config_filename=None):
 
         #r.show_in_browser()
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 
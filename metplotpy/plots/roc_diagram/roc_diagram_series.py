@@ -15,6 +15,7 @@ __author__ = 'Minna Win'
 
 import sys
 
+import numpy as np
 import pandas as pd
 import re
 import metcalcpy.util.ctc_statistics as cstats
@@ -62,36 +63,47 @@ class ROCDiagramSeries(Series):
         else:
             # no subsetting of data required, no series_val_1 values
             # were specified in the config file.
-            subset_df = input_df.copy()
+            # The columns are added to a shallow copy and don't change the input data
+            subset_df = input_df.copy(deep=False)
         if self.config.linetype_ctc:
             subset_df = self._add_ctc_columns(subset_df)
-            df_roc = cstats.calculate_ctc_roc(subset_df, ascending=self.config.ctc_ascending)
-            pody = df_roc['pody']
-            pody = pd.Series([1]).append(pody, ignore_index=True)
-            pody = pody.append(pd.Series([0]), ignore_index=True)
-            pofd = df_roc['pofd']
-            pofd = pd.Series([1]).append(pofd, ignore_index=True)
-            pofd = pofd.append(pd.Series([0]), ignore_index=True)
-            thresh = df_roc['thresh']
-            thresh = pd.Series(['']).append(thresh, ignore_index=True)
-            thresh = thresh.append(pd.Series(['']), ignore_index=True)
-            return pofd, pody, thresh
-
+            roc_df = cstats.calculate_ctc_roc(subset_df, ascending=self.config.ctc_ascending)
         elif self.config.linetype_pct:
             roc_df = pstats._calc_pct_roc(subset_df)
-            pody = roc_df['pody']
-            pody = pd.Series([1]).append(pody, ignore_index=True)
-            pody = pody.append(pd.Series([0]), ignore_index=True)
-            pofd = roc_df['pofd']
-            pofd = pd.Series([1]).append(pofd, ignore_index=True)
-            pofd = pofd.append(pd.Series([0]), ignore_index=True)
-            thresh = roc_df['thresh']
-            thresh = pd.Series(['']).append(thresh, ignore_index=True)
-            thresh = thresh.append(pd.Series(['']), ignore_index=True)
-            return pofd, pody, thresh
         else:
             raise ValueError('error neither ctc or pct linetype ')
 
+        pody = self._add_end_points(roc_df['pody'], 1, 0)
+        pofd = self._add_end_points(roc_df['pofd'], 1, 0)
+        thresh = self._add_end_points(roc_df['thresh'], '', '')
+        return pofd, pody, thresh
+
+    @staticmethod
+    def _add_end_points(values: pd.Series, first, last) -> np.ndarray:
+        """
+            Creates the curve points: the first point, the values and the last point
+            in one preallocated array
+
+            Args:
+                @param values: the curve values
+                @param first: the value of the first point
+                @param last: the value of the last point
+
+            Returns:
+                the array with the points. Its type is the same as the type of
+                the concatenated Series: the values type if the end points fit in it
+                or object
+        """
+        if values.dtype == object or isinstance(first, str) or isinstance(last, str):
+            dtype = object
+        else:
+            dtype = np.result_type(values.dtype, np.asarray([first, last]).dtype)
+        points = np.empty(len(values) + 2, dtype=dtype)
+        points[0] = first
+        points[1:-1] = values.to_numpy()
+        points[-1] = last
+        return points
+
     def _subset_data(self, df_full, permutation):
         '''
             Subset the input dataframe, iterating over the column and rows of interest
@@ -110,21 +122,21 @@ class ROCDiagramSeries(Series):
                             and rows of interest.
         '''
 
-        df_subset = df_full.copy()
-
         # only supporting series_val_1 for ROC diagrams, so we are
         # only interested in the series_inner_dict1
-        inner_dict = self.config.series_inner_dict1
-
+        filters = []
         for perm in permutation:
             for k, v in self.config.series_inner_dict1.items():
                 if perm == k:
                     column_header = v
                     row_of_interest = perm
 
-            df_subset = df_subset[df_subset[column_header] == row_of_interest]
+            filters.append((column_header, [row_of_interest]))
 
-        return df_subset
+        # select the rows matching all columns at once with the index shared by all series;
+        # the ctc columns are added to a shallow copy and don't change the input data
+        df_subset = self._select_series_data(filters, sort_keys=[])
+        return df_subset.copy(deep=False)
 
     def _add_ctc_columns(self, df_input):
         '''
@@ -147,43 +159,52 @@ class ROCDiagramSeries(Series):
         # From the fcst_thresh column, create two new columns, thresh_values and
         # op_wts that we can then sort using Pandas' multi-column sorting
         # capability.
+        # Each distinct threshold is parsed once and the results are mapped to the rows
+        thresholds = df_input['fcst_thresh']
+        unique_thresholds = pd.unique(thresholds)
         operators = []
         values = []
-        thresholds = df_input['fcst_thresh']
+        for thrsh in unique_thresholds:
+            operator, value = self._parse_threshold(thrsh)
+            operators.append(operator)
+            values.append(value)
+
         # Assign weights to the operators, 1 for the <, 5 for the > so that
         # > supercedes all other operators.
-        wt_maps = {'<': 1, '<=': 2, '==': 3, '>=': 4, '>': 5}
-        wts = []
-        for thrsh in thresholds:
-            # treat the fcst_thresh as two groups, one for
-            # the operator and the other for the value (which
-            # can be a negative value).
-            match = re.match(r'(\<|\<=|\==|\>=|\>)*((-)*([0-9])(.)*)', thrsh)
-            match_text = re.match(r'(\<|\<=|\==|\>=|\>)*(.*)', thrsh)
-            if match:
-                operators.append(match.group(1))
-                value = float(match.group(2))
-                values.append(value)
-            elif match_text:
-                operators.append(match_text.group(1))
-                value = match_text.group(2)
-                values.append(value)
-            else:
-                raise ValueError("fcst_thresh has a value that doesn't conform to "
-                                 "the expected format")
-
-        for operator in operators:
-            # if no operator precedes the number in fcst_thresh,
-            # then assume this is the same as == and assign a weight of 3
-            if operator is None:
-                wts.append(3)
-            else:
-                wts.append(wt_maps[operator])
+        # If no operator precedes the number in fcst_thresh,
+        # then assume this is the same as == and assign a weight of 3
+        wt_maps = {'<': 1, '<=': 2, '==': 3, '>=': 4, '>': 5, None: 3}
+        wts = [wt_maps[operator] for operator in operators]
 
         # Add these columns to the input dataframe
-        df_input['thresh_values'] = values
-        df_input['op_wts'] = wts
+        positions = pd.Index(unique_thresholds).get_indexer(thresholds)
+        df_input['thresh_values'] = pd.Series(values, dtype=object).infer_objects().to_numpy()[positions]
+        df_input['op_wts'] = np.array(wts)[positions]
 
         # return the input dataframe with two additional columns if
         # everything worked as expected
         return df_input
+
+    @staticmethod
+    def _parse_threshold(thrsh: str) -> tuple:
+        """
+        Splits the fcst_thresh value to the operator and the threshold value.
+
+        Args:
+        @param thrsh:  the fcst_thresh value, for example >=5
+
+        Returns:
+            the operator (<,<=,==, >=,> or None) and the value as a number
+            or as a text if it isn't a number
+        """
+        # treat the fcst_thresh as two groups, one for
+        # the operator and the other for the value (which
+        # can be a negative value).
+        match = re.match(r'(\<|\<=|\==|\>=|\>)*((-)*([0-9])(.)*)', thrsh)
+        if match:
+            return match.group(1), float(match.group(2))
+        match_text = re.match(r'(\<|\<=|\==|\>=|\>)*(.*)', thrsh)
+        if match_text:
+            return match_text.group(1), match_text.group(2)
+        raise ValueError("fcst_thresh has a value that doesn't conform to "
+                         "the expected format")
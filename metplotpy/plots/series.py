@@ -14,8 +14,174 @@ Class Name: series.py
 __author__ = 'Minna Win'
 
 import itertools
+import weakref
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
 import metcalcpy.util.utils as utils
 
+# date/time columns used to sort the series data - needed for CI calculations.
+# The data is sorted by each of them (paired with fcst_lead) in this order,
+# so the last column found in the data is the primary sort key
+DATE_TIME_COLUMNS = ['fcst_valid_beg', 'fcst_valid', 'fcst_init_beg', 'fcst_init']
+
+# indexes of the input data frames keyed by the frame id
+_SERIES_INDEXES = {}
+
+
+class _IndexedColumn:
+    """
+        Holds the categorical codes of a single input data column
+        in the order of the SeriesIndex rows and the rows grouped by code.
+        Code 0 is reserved for the missing values.
+    """
+
+    def __init__(self, column_data: pd.Series, order: np.ndarray, as_str: bool = False):
+        codes, uniques = pd.factorize(column_data)
+        self.uniques = pd.Index(uniques)
+        if as_str:
+            self.uniques = self.uniques.astype(str)
+        self.as_str = as_str
+
+        # keep one missing value to evaluate the filters against it
+        missing = np.flatnonzero(codes == -1)
+        self.missing_value = column_data.iloc[missing[:1]]
+
+        # codes of the rows in the index order
+        self.codes = codes[order] + 1
+
+        # rows of each code
+        self.sorter = np.argsort(self.codes, kind='stable')
+        self.counts = np.bincount(self.codes, minlength=len(self.uniques) + 1)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+
+    def allowed_codes(self, values: list) -> np.ndarray:
+        """
+        Evaluates the isin filter for each distinct value of the column
+        :param values: values to keep
+        :return: boolean array indexed by code
+        """
+        is_missing_allowed = False
+        if len(self.missing_value) > 0:
+            missing_value = self.missing_value
+            if self.as_str:
+                missing_value = missing_value.astype(str)
+            is_missing_allowed = bool(missing_value.isin(values).iloc[0])
+        return np.concatenate(([is_missing_allowed], self.uniques.isin(values)))
+
+    def rows(self, allowed: np.ndarray) -> np.ndarray:
+        """
+        Returns the positions of the rows with the allowed codes in ascending order
+        :param allowed: boolean array indexed by code
+        :return: sorted positions of the rows
+        """
+        groups = [self.sorter[self.offsets[code]:self.offsets[code + 1]]
+                  for code in np.flatnonzero(allowed)]
+        if not groups:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(groups))
+
+
+class SeriesIndex:
+    """
+        Index over the input data frame that is built once and shared by all
+        series of the plot. The rows are stably sorted by the date/time columns
+        and every filtered column is stored as categorical codes, so a series
+        selects its rows by looking up the codes of its filter values instead
+        of scanning and sorting the whole data frame.
+
+        To use:
+            series_data = get_series_index(input_data, sort_keys).select(filters)
+    """
+
+    def __init__(self, input_data: DataFrame, sort_keys: Union[list, None] = None):
+        # don't keep the data frame alive only because it is indexed
+        self._input_data_ref = weakref.ref(input_data)
+        self.sort_keys = list(sort_keys) if sort_keys else []
+        self.shape = input_data.shape
+        if self.sort_keys:
+            sorted_data = input_data[self.sort_keys].reset_index(drop=True) \
+                .sort_values(self.sort_keys, kind='mergesort')
+            self.order = sorted_data.index.to_numpy()
+        else:
+            self.order = np.arange(len(input_data))
+        self._columns = {}
+
+    @property
+    def input_data(self) -> DataFrame:
+        """
+        The indexed data frame
+        """
+        return self._input_data_ref()
+
+    def _get_column(self, column: str, as_str: bool) -> _IndexedColumn:
+        key = (column, as_str)
+        if key not in self._columns:
+            self._columns[key] = _IndexedColumn(self.input_data[column], self.order, as_str)
+        return self._columns[key]
+
+    def select(self, filters: list, str_columns: Union[list, None] = None) -> DataFrame:
+        """
+        Selects the rows matching all filters in the sorted order.
+        The result is the same as combining Series.isin() masks for each filter
+        and sorting the selected rows by the sort keys.
+
+        :param filters: list of (column name, list of values) tuples
+        :param str_columns: columns that are compared to the values as strings
+        :return: the subset of the input data
+        """
+        if not filters:
+            return self.input_data.iloc[self.order]
+        str_columns = str_columns or []
+
+        columns = []
+        for column, values in filters:
+            indexed_column = self._get_column(column, column in str_columns)
+            allowed = indexed_column.allowed_codes(values)
+            columns.append((indexed_column, allowed, indexed_column.counts[allowed].sum()))
+
+        # start from the filter that matches the least rows
+        # and check the rest of the filters only for these rows
+        columns.sort(key=lambda item: item[2])
+        indexed_column, allowed, _ = columns[0]
+        rows = indexed_column.rows(allowed)
+        for indexed_column, allowed, _ in columns[1:]:
+            rows = rows[allowed[indexed_column.codes[rows]]]
+
+        return self.input_data.iloc[self.order[rows]]
+
+
+def get_series_index(input_data: DataFrame, sort_keys: Union[list, None] = None) -> SeriesIndex:
+    """
+    Returns the index of the input data for the sort keys.
+    The index is created on the first call and reused by all series
+    that are built from the same data frame.
+
+    :param input_data: the input data frame
+    :param sort_keys: columns to sort the rows by
+    :return: the SeriesIndex object
+    """
+    key = id(input_data)
+    entry = _SERIES_INDEXES.get(key)
+    if entry is None or entry[0]() is not input_data:
+        def remove_entry(ref, data_id=key):
+            if data_id in _SERIES_INDEXES and _SERIES_INDEXES[data_id][0] is ref:
+                del _SERIES_INDEXES[data_id]
+
+        entry = (weakref.ref(input_data, remove_entry), {})
+        _SERIES_INDEXES[key] = entry
+
+    indexes = entry[1]
+    index_key = tuple(sort_keys) if sort_keys else ()
+    index = indexes.get(index_key)
+    if index is None or index.shape != input_data.shape:
+        index = SeriesIndex(input_data, sort_keys)
+        indexes[index_key] = index
+    return index
+
 
 
 class Series:
@@ -76,6 +242,37 @@ class Series:
         """
         raise NotImplementedError
 
+    def _get_date_time_sort_keys(self) -> list:
+        """
+        Returns the columns to sort the series data by date/time.
+        Sorting by them once is the same as sorting consecutively by each
+        of the DATE_TIME_COLUMNS (paired with fcst_lead) found in the data
+        :return: list of the column names, the primary key first
+        """
+        columns = self.input_data.columns
+        sort_keys = []
+        for column in reversed(DATE_TIME_COLUMNS):
+            if column in columns:
+                sort_keys.append(column)
+                if 'fcst_lead' in columns and 'fcst_lead' not in sort_keys:
+                    sort_keys.append('fcst_lead')
+        return sort_keys
+
+    def _select_series_data(self, filters: list, str_columns: Union[list, None] = None,
+                            sort_keys: Union[list, None] = None) -> DataFrame:
+        """
+        Selects the rows of the input data for this series using the index
+        shared by all series of the plot
+        :param filters: list of (column name, list of values) tuples
+        :param str_columns: columns that are compared to the values as strings
+        :param sort_keys: columns to sort the rows by.
+            The default is to sort them by date/time
+        :return: the subset of the input data
+        """
+        if sort_keys is None:
+            sort_keys = self._get_date_time_sort_keys()
+        return get_series_index(self.input_data, sort_keys).select(filters, str_columns)
+
     def _create_all_fields_values_no_indy(self) -> dict:
         """
         Creates a dictionary with two keys that represents each axis
@@ -0,0 +1,193 @@
+# ============================*
+ # ** Copyright UCAR (c) 2022
+ # ** University Corporation for Atmospheric Research (UCAR)
+ # ** National Center for Atmospheric Research (NCAR)
+ # ** Research Applications Lab (RAL)
+ # ** P.O.Box 3000, Boulder, Colorado, 80307-3000, USA
+ # ============================*
+
+
+
+"""
+Class Name: stat_input_cache.py
+ """
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Union
+
+from pandas import DataFrame
+
+# default maximum size of the cache directory in MB
+DEFAULT_CACHE_SIZE = 1024
+
+# name of the file that maps the stat_input path, size and mtime to the content hash
+INDEX_FILE_NAME = 'index.json'
+
+CACHE_FILE_EXTENSION = '.feather'
+
+
+class StatInputCache:
+    """
+        Stores the parsed stat_input data frames in the uncompressed Feather (Arrow IPC) format.
+        A cached frame is identified by the hash of the stat_input content and the loading options.
+        The content hash is recalculated only when the size or the modification time
+        of the stat_input file change.
+        The cached files are memory-mapped when they are read and the least recently used
+        files are removed when the size of the cache directory exceeds the limit.
+
+        To use:
+            cache = StatInputCache(cache_dir)
+            input_data = cache.get(file_name, options)
+            if input_data is None:
+                input_data = read_stat_input(file_name, **options)
+                cache.put(file_name, options, input_data)
+    """
+
+    def __init__(self, cache_dir: str, max_size: Union[int, float, None] = None):
+        """
+        Creates the cache directory if it doesn't exist
+
+        :param cache_dir: the path to the cache directory
+        :param max_size: the maximum size of the cache directory in MB
+        """
+        try:
+            from pyarrow import feather
+        except ImportError as exc:
+            raise ValueError('The stat_input cache requires the pyarrow package') from exc
+        self._feather = feather
+
+        self.cache_dir = cache_dir
+        if max_size is None:
+            max_size = DEFAULT_CACHE_SIZE
+        self.max_size = int(float(max_size) * 1024 * 1024)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, file_name: str, options: dict) -> Union[DataFrame, None]:
+        """
+        Reads the cached data frame for the stat_input file and the loading options
+        :param file_name: the path to the stat_input file
+        :param options: the loading options (columns, types) that change the data frame
+        :return: the data frame or None if it is not in the cache
+        """
+        cache_file = self._get_cache_file(file_name, options)
+        if not os.path.exists(cache_file):
+            return None
+        try:
+            table = self._feather.read_table(cache_file, memory_map=True)
+            input_data = table.to_pandas()
+        except (OSError, ValueError):
+            # the file was removed by another process or it is corrupted
+            return None
+        # mark the file as recently used
+        try:
+            os.utime(cache_file)
+        except OSError:
+            # the file was removed by another process after it was read
+            pass
+        return input_data
+
+    def put(self, file_name: str, options: dict, input_data: DataFrame) -> None:
+        """
+        Saves the data frame to the cache and removes the least recently used files
+        if the cache is too big. The data frames that can't be stored in
+        the Arrow format are not cached.
+        :param file_name: the path to the stat_input file
+        :param options: the loading options (columns, types) that change the data frame
+        :param input_data: the parsed stat_input
+        """
+        cache_file = self._get_cache_file(file_name, options)
+        tmp_file = None
+        try:
+            # write to a temporary file so the other processes never see a partial file
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as tmp:
+                tmp_file = tmp.name
+            self._feather.write_feather(input_data, tmp_file, compression='uncompressed')
+            os.replace(tmp_file, cache_file)
+        except (OSError, ValueError, TypeError):
+            # pyarrow errors are subclasses of ValueError or TypeError
+            if tmp_file is not None and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return
+        self._evict(keep=cache_file)
+
+    def _get_cache_file(self, file_name: str, options: dict) -> str:
+        """
+        Creates the path of the cached data frame from the stat_input content hash and the options
+        :param file_name: the path to the stat_input file
+        :param options: the loading options
+        :return: the path to the cached file
+        """
+        key = json.dumps({'content': self._get_content_hash(file_name), 'options': options},
+                         sort_keys=True)
+        return os.path.join(self.cache_dir,
+                            hashlib.sha256(key.encode('utf-8')).hexdigest() + CACHE_FILE_EXTENSION)
+
+    def _get_content_hash(self, file_name: str) -> str:
+        """
+        Returns the hash of the stat_input content. The hash is reused while
+        the path, size and modification time of the file are the same
+        :param file_name: the path to the stat_input file
+        :return: the hex digest of the content
+        """
+        file_stat = os.stat(file_name)
+        file_key = f'{os.path.realpath(file_name)}:{file_stat.st_size}:{file_stat.st_mtime_ns}'
+
+        index_file = os.path.join(self.cache_dir, INDEX_FILE_NAME)
+        try:
+            with open(index_file, 'r') as stream:
+                index = json.load(stream)
+        except (OSError, ValueError):
+            index = {}
+        if file_key in index:
+            return index[file_key]
+
+        content_hash = hashlib.sha256()
+        with open(file_name, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                content_hash.update(chunk)
+
+        # forget the old versions of the file
+        prefix = os.path.realpath(file_name) + ':'
+        index = {key: value for key, value in index.items() if not key.startswith(prefix)}
+        index[file_key] = content_hash.hexdigest()
+        tmp_file = None
+        try:
+            with tempfile.NamedTemporaryFile('w', dir=self.cache_dir, suffix='.tmp',
+                                             delete=False) as tmp:
+                tmp_file = tmp.name
+                json.dump(index, tmp)
+            os.replace(tmp_file, index_file)
+        except OSError:
+            if tmp_file is not None and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        return index[file_key]
+
+    def _evict(self, keep: str) -> None:
+        """
+        Removes the least recently used cached files until the size of the cache
+        is under the limit
+        :param keep: the path to the file that should not be removed
+        """
+        cache_files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(CACHE_FILE_EXTENSION):
+                try:
+                    entry_stat = entry.stat()
+                except OSError:
+                    # the file was removed by another process
+                    continue
+                cache_files.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in cache_files)
+        for _, size, path in sorted(cache_files):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
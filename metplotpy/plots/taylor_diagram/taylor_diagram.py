@@ -97,8 +97,8 @@ class TaylorDiagram(BasePlot):
                  pandas dataframe representation of the data generated by the MET stat tool.
         """
 
-        df_full: pd.DataFrame = \
-            pd.read_csv(self.config_obj.stat_input, sep='\t', header='infer')
+        df_full: pd.DataFrame = self._read_stat_input(
+            categorical_columns=self.config_obj.get_stat_input_categorical_columns())
 
         # Remove any columns that are entirely 'NaN'/'NA' this will be helpful
         # in determining whether we have aggregated statistics (stat_btcl and
@@ -317,7 +317,7 @@ class TaylorDiagram(BasePlot):
             plt.savefig(self.config_obj.output_image, dpi=self.config_obj.plot_resolution)
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default plot using a combination of
             default and custom config files on sample data found in this directory.
@@ -326,6 +326,7 @@ def main(config_filename=None):
 
             Args:
                 @param config_filename: default is None, the name of the custom config file to apply
+                @param raise_errors: re-raise the ValueError instead of printing it
             Returns:
 
     """
@@ -347,6 +348,8 @@ def main(config_filename=None):
         TaylorDiagram(docs)
 
     except ValueError as value_error:
+        if raise_errors:
+            raise
         print(value_error)
 
 
@@ -17,6 +17,8 @@ __author__ = 'Minna Win'
 
 import matplotlib
 import numpy as np
+import pandas as pd
+from pandas import DataFrame
 from typing import Union
 
 from plotly.graph_objects import Figure
@@ -37,6 +39,16 @@ COLORSCALES = {
                 "#2700FF", "#9D00FF", "#FF00EB", "#FF0076"]
 }
 
+# the strings that are read as missing values from stat_input (the pandas defaults)
+STAT_INPUT_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                        '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'n/a', 'nan', 'null']
+
+# the number of rows used to infer the column types of stat_input
+STAT_INPUT_SAMPLE_SIZE = 1000
+
+# parsers supported by read_stat_input
+STAT_INPUT_ENGINES = ('c', 'pyarrow')
+
 
 def read_config_from_command_line():
     """
@@ -188,3 +200,129 @@ def abline(x_value: float, intercept: float, slope: float) -> float:
     :return: y value
     """
     return slope * x_value + intercept
+
+
+def read_stat_input(file_name: str, columns: Union[list, None] = None,
+                    categorical_columns: Union[list, None] = None,
+                    float_type: str = 'float64', engine: str = 'c') -> DataFrame:
+    """
+    Reads the tab-separated METviewer stat_input file into a data frame.
+    Only the requested columns are parsed. The column types are inferred
+    from the first rows of the file, so the string label columns can be stored
+    as categorical data and the floating point columns as float_type while the file is parsed.
+    If a floating point column of the first rows has labels in the next rows,
+    the file is parsed again and the types are inferred from all rows.
+
+    :param file_name: the path to the stat_input file
+    :param columns: names of the columns to read or None to read all columns.
+        The names that are not in the file are ignored
+    :param categorical_columns: names of the columns to store as categorical data
+        if they contain strings
+    :param float_type: 'float64' or 'float32' - the type of the floating point columns
+    :param engine: 'c' or 'pyarrow' - the parser to use. 'pyarrow' requires the pyarrow package
+    :return: the stat_input data
+    """
+    if engine not in STAT_INPUT_ENGINES:
+        raise ValueError(f'Unsupported stat_input engine {engine}. '
+                         f'Supported engines are {", ".join(STAT_INPUT_ENGINES)}')
+    if np.dtype(float_type).kind != 'f':
+        raise ValueError(f'Unsupported stat_input float type {float_type}')
+
+    # infer the column types from the first rows
+    sample = pd.read_csv(file_name, sep='\t', header='infer', nrows=STAT_INPUT_SAMPLE_SIZE,
+                         float_precision='round_trip')
+    if columns is None:
+        use_columns = list(sample.columns)
+    else:
+        use_columns = [column for column in sample.columns if column in columns]
+    categorical_columns = categorical_columns or []
+    string_columns = [column for column in use_columns
+                      if sample[column].dtype == object and column in categorical_columns]
+    # the type of the columns with missing values only in the sample is unknown,
+    # e.g. they can have strings in the next rows
+    empty_columns = [column for column in use_columns if sample[column].isna().all()]
+    float_columns = [column for column in use_columns
+                     if sample[column].dtype.kind == 'f' and column not in empty_columns]
+
+    # a column with floats in the sample can have labels in the next rows,
+    # e.g. the thresholds 0.5 and >=0.5. Then the file is read again
+    # without the float types of the sample
+    if engine == 'pyarrow':
+        dtypes = sample[use_columns].dtypes
+        dtypes[empty_columns] = np.dtype(object)
+        try:
+            input_data = _read_stat_input_pyarrow(file_name, list(sample.columns),
+                                                  dtypes, string_columns)
+        except ValueError:
+            dtypes[float_columns] = np.dtype(object)
+            input_data = _read_stat_input_pyarrow(file_name, list(sample.columns),
+                                                  dtypes, string_columns)
+            empty_columns = empty_columns + float_columns
+        # the columns with numbers only are floats as in the pandas parser
+        for column in empty_columns:
+            try:
+                input_data[column] = pd.to_numeric(input_data[column])
+            except ValueError:
+                pass
+    else:
+        dtype = {column: 'category' for column in string_columns}
+        try:
+            input_data = pd.read_csv(file_name, sep='\t', header='infer', usecols=use_columns,
+                                     dtype={**dtype, **{column: float_type for column in float_columns}},
+                                     float_precision='round_trip')
+        except ValueError:
+            input_data = pd.read_csv(file_name, sep='\t', header='infer', usecols=use_columns,
+                                     dtype=dtype, float_precision='round_trip')
+
+    # the columns with missing values in the sample only or with
+    # the values inferred as floats by pyarrow
+    if np.dtype(float_type) != np.float64:
+        for column in input_data.columns:
+            if input_data[column].dtype == np.float64:
+                input_data[column] = input_data[column].astype(float_type)
+    return input_data
+
+
+def _read_stat_input_pyarrow(file_name: str, column_names: list, dtypes: pd.Series,
+                             categorical_columns: list) -> DataFrame:
+    """
+    Reads the tab-separated stat_input file with the multithreaded pyarrow CSV parser
+    :param file_name: the path to the stat_input file
+    :param column_names: names of all columns in the file as they are named by the pandas parser
+    :param dtypes: the types of the columns to read inferred by the pandas parser
+    :param categorical_columns: names of the string columns to store as categorical data
+    :return: the stat_input data
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError as exc:
+        raise ValueError('The pyarrow stat_input engine requires the pyarrow package') from exc
+
+    # use the pandas types so both engines return the same data,
+    # e.g. keep the date/time strings as they are in the file
+    column_types = {}
+    for column, dtype in dtypes.items():
+        if column in categorical_columns:
+            column_types[column] = pa.dictionary(pa.int32(), pa.string())
+        elif dtype.kind == 'f':
+            column_types[column] = pa.float64()
+        elif dtype.kind != 'i' and dtype.kind != 'b':
+            column_types[column] = pa.string()
+    convert_options = pa_csv.ConvertOptions(include_columns=list(dtypes.index),
+                                            column_types=column_types,
+                                            null_values=STAT_INPUT_NA_VALUES,
+                                            strings_can_be_null=True)
+    # use the pandas names of the columns to handle the duplicate names in the header
+    read_options = pa_csv.ReadOptions(column_names=column_names, skip_rows=1)
+    table = pa_csv.read_csv(file_name, read_options=read_options,
+                            parse_options=pa_csv.ParseOptions(delimiter='\t'),
+                            convert_options=convert_options)
+    # release the arrow buffers while converting to keep the peak memory low
+    input_data = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    for column in categorical_columns:
+        # use the same categories order as the pandas parser
+        input_data[column] = input_data[column].cat.reorder_categories(
+            sorted(input_data[column].cat.categories))
+    return input_data
@@ -15,7 +15,6 @@ Class Name: wind_rose.py
 __author__ = 'Tatiana Burek'
 
 import os
-import math
 from typing import Union
 import pandas as pd
 import numpy as np
@@ -183,85 +182,25 @@ class WindRosePlot(BasePlot):
 
         # init data based on type
         if self.config_obj.type == 'FCST-OBS':
-            u_wind_data = (self.u_wind_data['FCST'] - self.u_wind_data['OBS']).tolist()
-            v_wind_data = (self.v_wind_data['FCST'] - self.v_wind_data['OBS']).tolist()
+            u_wind_data = self.u_wind_data['FCST'] - self.u_wind_data['OBS']
+            v_wind_data = self.v_wind_data['FCST'] - self.v_wind_data['OBS']
         elif self.config_obj.type == 'FCST':
-            u_wind_data = self.u_wind_data['FCST'].tolist()
-            v_wind_data = self.v_wind_data['FCST'].tolist()
+            u_wind_data = self.u_wind_data['FCST']
+            v_wind_data = self.v_wind_data['FCST']
         else:
-            u_wind_data = self.u_wind_data['OBS'].tolist()
-            v_wind_data = self.v_wind_data['OBS'].tolist()
-
-        # calculate the wind speed
-        wind_speed = [
-            math.sqrt(u_wind_data[i] * u_wind_data[i] + v_wind_data[i] * v_wind_data[i])
-            for i in range(len(v_wind_data))
-        ]
-
-        # calculate the wind dir in degrees for each row and bin it to angles
-        wind_dir_deg = []
-        for i, v_wind in enumerate(v_wind_data):
-            if wind_speed[i] == 0:
-                wind_dir_deg.append(None)
-            else:
-                # calculate the wind dir
-                wd = math.atan2(u_wind_data[i] / wind_speed[i], v_wind / wind_speed[i]) * 180 / math.pi
-                if wd < 0:
-                    wind_dir_deg.append(None)
-                else:
-                    wind_dir_deg.append(
-                        self.config_obj.wind_rose_angle * math.ceil(wd / self.config_obj.wind_rose_angle - 0.5))
+            u_wind_data = self.u_wind_data['OBS']
+            v_wind_data = self.v_wind_data['OBS']
 
-        # join wind_speed and wind_dir in one array
-        wind_speed_dir = np.vstack((wind_speed, wind_dir_deg)).T
+        float_type = self.config_obj.wind_rose_float_type
+        frequencies, breaks = self._calculate_frequencies(
+            u_wind_data.to_numpy(dtype=float_type), v_wind_data.to_numpy(dtype=float_type),
+            self.config_obj.wind_rose_breaks, self.config_obj.wind_rose_angle)
 
         # create list of angles
         angles = np.arange(0, 360, self.config_obj.wind_rose_angle)
 
-        # distance between the centre of the bin and its edge
-        step = (angles[1] - angles[0]) / 2
-
-        # remove rows where wind direction is None
-        # and converting data between 348.75 and 360 to negative
-        wind_speed_dir_processed = np.empty((0, 2), float)
-        for i, wspd in enumerate(wind_speed_dir):
-            if wspd[1] is not None:
-                if angles[-1] + step <= wspd[1] and wspd[1] < 360:
-                    wind_speed_dir_processed = np.append(wind_speed_dir_processed, np.array(
-                        [[wspd[0], wspd[1] - 360, ]]), axis=0)
-                else:
-                    wind_speed_dir_processed = np.append(wind_speed_dir_processed,
-                                                         np.array([[wspd[0], wspd[1], ]]),
-                                                         axis=0)
-
-        # determining the direction bins
-        bin_edges_dir = np.append(angles - step, [angles[-1] + step])
-
-        frequencies = np.array([])
-        number_of_records = len(wind_speed_dir)
-        speed_bins = []
-
-        # add me max wind speed as the last breaks
-        breaks = self.config_obj.wind_rose_breaks.copy()
-        breaks.append(max(wind_speed))
-
-        # loop selecting given bins and calculate frequencies
-        for i in range(len(breaks) - 1):
-            # initialise speed bins strings
-            speed_bins.append(f'{int(breaks[i])}-{int(breaks[i + 1])} m/s')
-
-            for j in range(len(bin_edges_dir) - 1):
-                # filter data
-                bin_contents = self._boundary_filter(breaks[i], breaks[i + 1],
-                                                     bin_edges_dir[j], bin_edges_dir[j + 1],
-                                                     wind_speed_dir_processed)
-
-                # applying the filtering function for every bin
-                # and checking the number of measurements
-                frequency = len(bin_contents) / number_of_records
-
-                # obtaining the final frequencies of bin
-                frequencies = np.append(frequencies, frequency)
+        # initialise speed bins strings
+        speed_bins = [f'{int(breaks[i])}-{int(breaks[i + 1])} m/s' for i in range(len(breaks) - 1)]
 
         # create all permutations of speed_bins and angles
         perm_speedbins_angles = pd.MultiIndex.from_product(
@@ -273,7 +212,7 @@ class WindRosePlot(BasePlot):
         frequencies_df = pd.DataFrame(0, perm_speedbins_angles, ['frequency'])
 
         # updating the frequencies in the dataframe
-        frequencies_df.frequency = frequencies * 100  # [%]
+        frequencies_df.frequency = frequencies.ravel() * 100  # [%]
 
         # create traces
         for i, speed_bin in enumerate(speed_bins):
@@ -305,32 +244,72 @@ class WindRosePlot(BasePlot):
             print("Oops!  The figure was not created. Can't save.")
 
     @staticmethod
-    def _boundary_filter(boundary_lower_speed: float,
-                         boundary_higher_speed: float,
-                         boundary_lower_direction: float,
-                         boundary_higher_direction: float,
-                         wind_rose_data: np.ndarray) -> np.ndarray:
+    def _calculate_frequencies(u_wind_data: np.ndarray, v_wind_data: np.ndarray,
+                               wind_rose_breaks: list, wind_rose_angle: float) -> tuple:
         """
-        This method  filters the wind rose data based on the boundary wind speed and direction
-
-        :param boundary_lower_speed: lowest speed
-        :param boundary_higher_speed: highest speed
-        :param boundary_lower_direction: lowest direction
-        :param boundary_higher_direction: highest direction
-        :param wind_rose_data: 2-dim array with wind speed as a 1st column and wind dir as a 2nd column
-        :return: 2-dim array with wind speed as a 1st column and wind dir
-                as a 2nd column that conform to the boundaries
+        Calculates the frequencies of the wind speed and direction bins in one pass
+        as a 2-dim histogram (speed bins x direction sectors).
+        The speed bins are (break, next break] intervals; the max wind speed
+        is added as the last break. The wind direction is rounded to the nearest
+        sector centre; the calm winds and the directions < 0 are not counted
+        in any bin but all winds count in the total.
+
+        :param u_wind_data: 1-dim array with the U wind component
+        :param v_wind_data: 1-dim array with the V wind component
+        :param wind_rose_breaks: the ascending lower boundaries of the speed bins
+        :param wind_rose_angle: the width of the direction sector in degrees
+        :return: 2-dim array with the frequencies of the speed bins (rows)
+                and direction sectors (columns) and the list of the speed breaks
+                with the max wind speed
         """
+        if len(u_wind_data) != len(v_wind_data):
+            raise ValueError('U and V wind data must have the same size')
+
+        # the rows with the missing components are not counted
+        valid = np.isfinite(u_wind_data) & np.isfinite(v_wind_data)
+        if not valid.all():
+            u_wind_data = u_wind_data[valid]
+            v_wind_data = v_wind_data[valid]
+
+        number_of_records = len(u_wind_data)
+        wind_speed = np.sqrt(u_wind_data * u_wind_data + v_wind_data * v_wind_data)
+
+        # add me max wind speed as the last breaks
+        breaks = list(wind_rose_breaks)
+        breaks.append(float(wind_speed.max()))
+
+        # create list of angles
+        angles = np.arange(0, 360, wind_rose_angle)
+
+        # distance between the centre of the bin and its edge
+        step = (angles[1] - angles[0]) / 2
+
+        # determining the direction bins
+        bin_edges_dir = np.append(angles - step, [angles[-1] + step])
+
+        # calculate the wind dir in degrees and bin it to angles,
+        # the calm winds and the negative directions are not binned
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wind_dir_deg = np.arctan2(u_wind_data / wind_speed, v_wind_data / wind_speed) * 180 / np.pi
+        has_dir = (wind_speed != 0) & (wind_dir_deg >= 0)
+        wind_dir_deg = wind_rose_angle * np.ceil(wind_dir_deg / wind_rose_angle - 0.5)
+
+        # converting data between 348.75 and 360 to negative
+        wind_dir_deg = np.where((angles[-1] + step <= wind_dir_deg) & (wind_dir_deg < 360),
+                                wind_dir_deg - 360, wind_dir_deg)
+
+        # the index of the (lower, higher] bin for each speed and direction
+        speed_index = np.searchsorted(np.asarray(wind_rose_breaks, dtype=wind_speed.dtype),
+                                      wind_speed, side='left') - 1
+        dir_index = np.searchsorted(bin_edges_dir, wind_dir_deg, side='left') - 1
 
-        # mask for wind speed column
-        log_mask_speed = (wind_rose_data[:, 0] > boundary_lower_speed) \
-                         & (wind_rose_data[:, 0] <= boundary_higher_speed)
-        # mask for wind direction
-        log_mask_direction = (wind_rose_data[:, 1] > boundary_lower_direction) \
-                             & (wind_rose_data[:, 1] <= boundary_higher_direction)
+        number_of_dirs = len(angles)
+        in_bins = has_dir & (speed_index >= 0) & (dir_index >= 0) & (dir_index < number_of_dirs)
+        counts = np.bincount(speed_index[in_bins] * number_of_dirs + dir_index[in_bins],
+                             minlength=len(wind_rose_breaks) * number_of_dirs)
 
-        # application of the filter on the wind_rose_data array
-        return wind_rose_data[log_mask_speed & log_mask_direction]
+        frequencies = counts.reshape(len(wind_rose_breaks), number_of_dirs) / number_of_records
+        return frequencies, breaks
 
     def write_output_file(self) -> None:
         """
@@ -392,7 +371,7 @@ class WindRosePlot(BasePlot):
             print('Can\'t save points to a file')
 
 
-def main(config_filename=None):
+def main(config_filename=None, raise_errors=False):
     """
             Generates a sample, default, Wind rose plot using the
             default and custom config files on sample data found in this directory.
@@ -424,6 +403,8 @@ def main(config_filename=None):
         plot.write_output_file()
 
     except ValueError as ve:
+        if raise_errors:
+            raise
         print(ve)
 
 
@@ -39,6 +39,13 @@ class WindRoseConfig(Config):
         if len(self.wind_rose_marker_colors) != len(self.wind_rose_breaks) :
             raise ValueError('wind_rose_marker_colors must have the same size as wind_rose_breaks')
 
+        # the precision of the wind speed and direction calculation: float64 or float32
+        self.wind_rose_float_type = self.get_config_value('wind_rose_float_type')
+        if self.wind_rose_float_type is None:
+            self.wind_rose_float_type = 'float64'
+        if self.wind_rose_float_type not in ('float64', 'float32'):
+            raise ValueError('wind_rose_float_type must be float64 or float32')
+
         self.create_figure = self.get_config_value('create_figure')
         self.show_legend = self.get_config_value('show_legend')
         self.angularaxis_tickvals = self.get_config_value('angularaxis_tickvals')
@@ -0,0 +1,114 @@
+import os
+import shutil
+
+import pytest
+import yaml
+
+import plotly.graph_objects as go
+
+from metplotpy.plots import batch
+from metplotpy.plots.base_plot import ImageExporter
+from metplotpy.plots.line import line as l
+
+LINE_DIR = os.path.abspath('../line')
+CONFIGS = ['custom_line_groups.yaml', 'custom_line.yaml', 'custom_line_groups2.yaml']
+OUTPUT_FILES = ['line_groups.png', 'line_groups.points1', 'line_groups.points2', 'line.png',
+                'intermed_files/line_groups.png', 'intermed_files/line_groups.points1',
+                'intermed_files/line_groups.points2']
+
+
+def copy_line_test(target_dir):
+    os.makedirs(os.path.join(target_dir, 'intermed_files'))
+    for file_name in CONFIGS + ['line.data', 'line_groups.data']:
+        shutil.copy(os.path.join(LINE_DIR, file_name), target_dir)
+
+
+def read_outputs(target_dir):
+    outputs = {}
+    for file_name in OUTPUT_FILES:
+        with open(os.path.join(target_dir, file_name), 'rb') as stream:
+            outputs[file_name] = stream.read()
+    return outputs
+
+
+def test_group_by_stat_input(monkeypatch, tmp_path):
+    copy_line_test(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    items = batch.expand_configs('line', ['custom_line_groups*.yaml', 'custom_line.yaml'])
+    assert [item.config_file for item in items] == ['custom_line_groups.yaml', 'custom_line_groups2.yaml',
+                                                    'custom_line.yaml']
+    groups = batch.group_by_stat_input(items)
+    assert [[item.config_file for item in group] for group in groups] == \
+           [['custom_line_groups.yaml', 'custom_line_groups2.yaml'], ['custom_line.yaml']]
+
+    with pytest.raises(ValueError):
+        batch.expand_configs('unknown', ['custom_line.yaml'])
+    with pytest.raises(ValueError):
+        batch.expand_configs('line', ['missing_*.yaml'])
+
+
+@pytest.mark.parametrize("jobs, export_workers", [(1, 0), (2, 0), (1, 1)])
+def test_same_output_as_main(monkeypatch, tmp_path, jobs, export_workers):
+    os.environ['METPLOTPY_BASE'] = os.path.abspath('../../')
+    single_dir = str(tmp_path / 'single')
+    batch_dir = str(tmp_path / 'batch')
+
+    copy_line_test(single_dir)
+    monkeypatch.chdir(single_dir)
+    for config_file in CONFIGS:
+        l.main(config_file)
+
+    copy_line_test(batch_dir)
+    monkeypatch.chdir(batch_dir)
+    results = batch.render_batch([batch.BatchItem('line', config_file) for config_file in CONFIGS],
+                                 jobs=jobs, export_workers=export_workers)
+    assert [result.config_file for result in results] == ['custom_line_groups.yaml', 'custom_line_groups2.yaml',
+                                                          'custom_line.yaml']
+    assert [result.error for result in results] == [None, None, None]
+
+    assert read_outputs(single_dir) == read_outputs(batch_dir)
+
+
+def test_image_exporter(tmp_path):
+    figure = go.Figure(go.Scatter(x=[1, 2, 3], y=[3, 1, 2]))
+    png_file = str(tmp_path / 'plot.png')
+    pdf_file = str(tmp_path / 'plot.pdf')
+    exporter = ImageExporter(workers=1)
+    try:
+        future = exporter.submit(figure, [(None, png_file), ('pdf', pdf_file), ('svg', None)],
+                                 width=400, height=300)
+        png_name, pdf_name, svg_bytes = future.result()
+    finally:
+        exporter.shutdown()
+
+    assert (png_name, pdf_name) == (png_file, pdf_file)
+    with open(png_file, 'rb') as stream:
+        assert stream.read() == figure.to_image(format='png', width=400, height=300)
+    with open(pdf_file, 'rb') as stream:
+        assert stream.read().startswith(b'%PDF')
+    assert svg_bytes.startswith(b'<svg')
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_failed_plots(monkeypatch, tmp_path, jobs):
+    copy_line_test(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    # the line main() prints the ValueError of the unsupported statistic
+    with open('custom_line.yaml', 'r') as stream:
+        docs = yaml.load(stream, Loader=yaml.FullLoader)
+    docs['plot_stat'] = 'unsupported'
+    with open('unsupported_stat.yaml', 'w') as stream:
+        yaml.dump(docs, stream)
+    # the Hovmoeller plot calls sys.exit() if the input file can't be opened
+    with open('missing_input.yaml', 'w') as stream:
+        yaml.dump({'input_data_file': str(tmp_path / 'missing.nc'),
+                   'plot_filename': str(tmp_path / 'hovmoeller.png')}, stream)
+
+    items = [batch.BatchItem('line', 'unsupported_stat.yaml'),
+             batch.BatchItem('hovmoeller', 'missing_input.yaml'),
+             batch.BatchItem('line', 'custom_line.yaml')]
+    # the plots of line.data are grouped together
+    errors = {result.config_file: result.error for result in batch.render_batch(items, jobs=jobs)}
+    assert 'ValueError' in errors['unsupported_stat.yaml']
+    assert 'SystemExit' in errors['missing_input.yaml']
+    assert errors['custom_line.yaml'] is None
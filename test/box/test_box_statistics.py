@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from metplotpy.plots.box.box_statistics import calculate_box_statistics
+
+VALUES = [5, 1, 8, np.nan, 3, 30, 2, 7, 4, 6]
+
+
+def test_box_statistics():
+    result = calculate_box_statistics(VALUES, notched=True, box_mean=True)
+    # Plotly linear quartiles of 1..8, 30
+    assert result['q1'] == pytest.approx([2.75])
+    assert result['median'] == pytest.approx([5])
+    assert result['q3'] == pytest.approx([7.25])
+    # the most extreme values within 1.5 IQR from the box
+    assert result['lowerfence'] == pytest.approx([1])
+    assert result['upperfence'] == pytest.approx([8])
+    assert result['mean'] == pytest.approx([66 / 9])
+    assert result['notchspan'] == pytest.approx([1.57 * 4.5 / 3])
+    assert result['boxpoints'] == 'outliers'
+    assert result['y'] == [[30]]
+    assert 'x' not in result
+
+
+def test_box_statistics_by_position():
+    positions = ['b', 'a', 'b', 'a', 'b', 'a', 'b', 'a', 'b', 'a']
+    result = calculate_box_statistics(VALUES, positions, boxpoints='all')
+    # the boxes are in the order of the first appearance of the positions
+    assert result['x'] == ['b', 'a']
+    assert result['median'] == pytest.approx([4, 6.5])
+    assert result['y'] == [[2, 3, 4, 5, 8], [1, 6, 7, 30]]
+    assert 'mean' not in result and 'notchspan' not in result
+
+
+def test_box_statistics_without_points():
+    result = calculate_box_statistics(VALUES, boxpoints=False)
+    # the whiskers go to the minimum and maximum
+    assert result['lowerfence'] == pytest.approx([1])
+    assert result['upperfence'] == pytest.approx([30])
+    assert 'y' not in result
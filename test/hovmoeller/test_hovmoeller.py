@@ -1,5 +1,8 @@
 import os
+import numpy as np
+import pandas as pd
 import pytest
+import xarray as xr
 import metplotpy.plots.hovmoeller.hovmoeller as hov
 from metcalcpy.compare_images import CompareImages
 
@@ -60,4 +63,28 @@ def test_custom_plot_created():
         CompareImages(default_plot, custom_plot)
 
     # Clean up
-    cleanup(custom_plot)
\ No newline at end of file
+    cleanup(custom_plot)
+
+def test_lat_avg_subset(tmp_path):
+    # a small global file: only the latitude band and the dates are averaged
+    time = pd.date_range('2016-01-01', periods=10, freq='D')
+    lat = np.arange(-89.5, 90, 1.0)
+    lon = np.arange(0, 360, 2.0)
+    values = np.random.default_rng(0).random((len(time), len(lat), len(lon)))
+    input_file = str(tmp_path / 'precip.nc')
+    xr.Dataset({'precip': (('time', 'lat', 'lon'), values)},
+               coords={'time': time, 'lat': lat, 'lon': lon}).to_netcdf(input_file)
+    config = {'input_data_file': input_file, 'plot_filename': str(tmp_path / 'hov.png'),
+              'date_start': '2016-01-03', 'date_end': '2016-01-07',
+              'lat_min': -5, 'lat_max': 5, 'unit_conversion': 250}
+
+    band = values[2:7, 85:95, :] * 250
+    plot = hov.Hovmoeller(config)
+    assert plot.data.dims == ('time', 'lon')
+    assert plot.data.attrs['units'] == 'mm / day'
+    np.testing.assert_allclose(plot.data.values, band.mean(axis=1))
+
+    weights = np.cos(np.deg2rad(lat[85:95]))
+    plot = hov.Hovmoeller(dict(config, lat_weighted=True))
+    np.testing.assert_allclose(plot.data.values,
+                               (band * weights[:, None]).sum(axis=1) / weights.sum())
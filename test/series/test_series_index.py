@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from metplotpy.plots.series import SeriesIndex, get_series_index
+
+
+def create_input_data():
+    return pd.DataFrame({
+        'model': ['GFS', 'NAM', 'GFS', 'GFS', 'NAM', np.nan, 'GFS', 'GFS'],
+        'fcst_valid_beg': ['2020-01-02', '2020-01-01', '2020-01-01', '2020-01-03',
+                           '2020-01-02', '2020-01-01', '2020-01-01', '2020-01-02'],
+        'fcst_lead': [120000, 0, 120000, 0, 0, 0, 0, 0],
+        'stat_value': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+    }, index=[10, 11, 12, 13, 14, 15, 16, 17])
+
+
+def select_with_masks(input_data, filters, sort_keys):
+    mask = np.array([input_data[column].isin(values) for column, values in filters]).all(axis=0)
+    return input_data.loc[mask].sort_values(sort_keys, kind='mergesort')
+
+
+def test_select_same_as_masks():
+    input_data = create_input_data()
+    sort_keys = ['fcst_valid_beg', 'fcst_lead']
+    index = SeriesIndex(input_data, sort_keys)
+    for filters in ([('model', ['GFS'])],
+                    [('model', ['GFS']), ('fcst_lead', [0])],
+                    [('model', ['GFS', 'NAM']), ('fcst_lead', [120000])],
+                    [('model', [np.nan])],
+                    [('model', ['ECMWF'])]):
+        expected = select_with_masks(input_data, filters, sort_keys)
+        actual = index.select(filters)
+        assert actual.index.tolist() == expected.index.tolist()
+        assert actual.equals(expected)
+
+
+def test_select_str_columns():
+    input_data = create_input_data()
+    index = SeriesIndex(input_data)
+    actual = index.select([('fcst_lead', ['120000'])], str_columns=['fcst_lead'])
+    assert actual.index.tolist() == [10, 12]
+    assert index.select([('fcst_lead', ['120000'])]).empty
+
+
+def test_index_is_shared():
+    input_data = create_input_data()
+    index = get_series_index(input_data, ['fcst_valid_beg'])
+    assert get_series_index(input_data, ['fcst_valid_beg']) is index
+    assert get_series_index(input_data.copy(), ['fcst_valid_beg']) is not index
@@ -0,0 +1,74 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import metcalcpy.util.utils as calc_util
+from metcalcpy.event_equalize import event_equalize as calc_event_equalize
+
+from metplotpy.plots.event_equalization import event_equalize, perform_event_equalization
+
+
+@pytest.fixture
+def input_data():
+    rng = np.random.default_rng(0)
+    rows = 2000
+    valid_dates = pd.date_range('2020-01-01', periods=60, freq='6H').strftime('%Y-%m-%d %H:%M:%S')
+    data = pd.DataFrame({
+        'model': rng.choice(['GFS', 'NAM', 'RAP', None], rows),
+        'fcst_var': rng.choice(['TMP', 'UGRD'], rows),
+        'stat_name': rng.choice(['ME', 'RMSE'], rows),
+        'fcst_lead': rng.choice([0, 60000, 120000], rows),
+        'fcst_valid_beg': rng.choice(valid_dates, rows),
+        'vx_mask': rng.choice(['FULL', 'NHX'], rows),
+        'stat_value': rng.random(rows)
+    })
+    return data.drop_duplicates(['model', 'fcst_var', 'stat_name', 'fcst_lead', 'fcst_valid_beg', 'vx_mask'])
+
+
+def quiet(function, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+@pytest.mark.parametrize('series_var_vals, fix_vars, fix_vals_permuted, indy_var', [
+    ({'model': ['GFS', 'NAM']}, [], [], 'fcst_lead'),
+    ({'model': ['GFS:RAP', 'NAM']}, ['vx_mask'], [['FULL', 'NHX']], 'fcst_lead'),
+    ({'model': ['GFS', 'NA']}, ['fcst_lead'], [['0', 60000]], 'vx_mask'),
+    ({}, ['vx_mask'], [['FULL', 'FULL', 'NHX']], 'model'),
+])
+def test_event_equalize(input_data, series_var_vals, fix_vars, fix_vals_permuted, indy_var):
+    expected = quiet(calc_event_equalize, input_data.copy(), indy_var, series_var_vals,
+                     fix_vars, fix_vals_permuted, True, False)
+    actual = quiet(event_equalize, input_data, indy_var, series_var_vals,
+                   fix_vars, fix_vals_permuted, True, False)
+    assert len(actual) < len(input_data)
+    pd.testing.assert_frame_equal(actual, expected.drop('equalize', axis=1))
+
+
+def test_event_equalize_subsets(input_data):
+    subsets = [(input_data['fcst_var'] == 'TMP').to_numpy(), np.arange(0, len(input_data), 2)]
+    expected = pd.concat([quiet(calc_event_equalize, input_data.iloc[subset].copy(), 'fcst_lead',
+                                {'model': ['GFS', 'NAM']}, [], [], True, False)
+                          for subset in subsets])
+    actual = quiet(event_equalize, input_data, 'fcst_lead', {'model': ['GFS', 'NAM']}, [], [],
+                   True, False, subsets=subsets)
+    pd.testing.assert_frame_equal(actual, expected.drop('equalize', axis=1))
+
+
+def test_perform_event_equalization(input_data):
+    params = {
+        'indy_var': 'fcst_lead',
+        'line_type': 'sl1l2',
+        'series_val_1': {'model': ['GFS', 'NAM']},
+        'series_val_2': {'model': ['RAP']},
+        'fcst_var_val_1': {'TMP': ['ME', 'RMSE']},
+        'fcst_var_val_2': {'UGRD': ['ME']},
+        'fixed_vars_vals_input': {'vx_mask': {'vx_mask_1': ['FULL']}}
+    }
+    expected = quiet(calc_util.perform_event_equalization, params, input_data.copy())
+    actual = quiet(perform_event_equalization, params, input_data)
+    assert len(actual) > 0
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metplotpy.plots.util import read_stat_input
+
+STAT_INPUT = '../line/line.data'
+
+
+def read_csv():
+    return pd.read_csv(STAT_INPUT, sep='\t', header='infer', float_precision='round_trip')
+
+
+def test_pruned_categorical_same_values():
+    expected = read_csv()
+    columns = ['model', 'fcst_lead', 'stat_name', 'stat_value', 'not_in_file']
+    input_data = read_stat_input(STAT_INPUT, columns=columns, categorical_columns=['model', 'stat_name'])
+    assert list(input_data.columns) == ['model', 'fcst_lead', 'stat_name', 'stat_value']
+    assert input_data['model'].dtype == 'category'
+    assert input_data['fcst_lead'].dtype == expected['fcst_lead'].dtype
+    pd.testing.assert_frame_equal(input_data.astype({'model': object, 'stat_name': object}),
+                                  expected[list(input_data.columns)])
+
+
+def test_float32():
+    input_data = read_stat_input(STAT_INPUT, columns=['stat_value'], float_type='float32')
+    assert input_data['stat_value'].dtype == np.float32
+    with pytest.raises(ValueError):
+        read_stat_input(STAT_INPUT, float_type='int32')
+
+
+def test_pyarrow_same_as_c():
+    pytest.importorskip('pyarrow')
+    expected = read_stat_input(STAT_INPUT, categorical_columns=['model', 'fcst_var'])
+    input_data = read_stat_input(STAT_INPUT, categorical_columns=['model', 'fcst_var'], engine='pyarrow')
+    pd.testing.assert_frame_equal(input_data, expected, check_categorical=True)
+
+
+def test_missing_values_in_sample(tmp_path):
+    # the first rows don't tell the types of fcst_lev and obs_lev
+    size = 1500
+    stat_input = str(tmp_path / 'levels.data')
+    pd.DataFrame({'model': 'GFS',
+                  'fcst_lev': ['NA'] * 1200 + ['P500'] * (size - 1200),
+                  'obs_lev': ['NA'] * 1200 + ['500'] * (size - 1200),
+                  'stat_value': np.arange(size) / 7}).to_csv(stat_input, sep='\t', index=False)
+    expected = pd.read_csv(stat_input, sep='\t', header='infer', float_precision='round_trip')
+    assert expected['obs_lev'].dtype == np.float64
+
+    input_data = read_stat_input(stat_input, categorical_columns=['model', 'fcst_lev'])
+    pd.testing.assert_frame_equal(input_data.astype({'model': object}), expected)
+
+    pytest.importorskip('pyarrow')
+    pd.testing.assert_frame_equal(
+        read_stat_input(stat_input, categorical_columns=['model', 'fcst_lev'], engine='pyarrow'),
+        input_data)
+
+
+def test_labels_after_sample(tmp_path):
+    # fcst_thresh has floats in the first rows and labels in the next rows
+    size = 1500
+    stat_input = str(tmp_path / 'thresholds.data')
+    pd.DataFrame({'model': 'GFS',
+                  'fcst_thresh': [0.5] * 1100 + ['>=0.5'] * (size - 1100),
+                  'stat_value': np.arange(size) / 7}).to_csv(stat_input, sep='\t', index=False)
+    expected = pd.read_csv(stat_input, sep='\t', header='infer', float_precision='round_trip')
+    assert expected['fcst_thresh'].dtype == object
+
+    input_data = read_stat_input(stat_input, categorical_columns=['model'])
+    pd.testing.assert_frame_equal(input_data.astype({'model': object}), expected)
+    input_data = read_stat_input(stat_input, float_type='float32')
+    assert input_data['stat_value'].dtype == np.float32
+    assert input_data['fcst_thresh'].dtype == object
+
+    pytest.importorskip('pyarrow')
+    pd.testing.assert_frame_equal(
+        read_stat_input(stat_input, categorical_columns=['model'], engine='pyarrow'),
+        read_stat_input(stat_input, categorical_columns=['model']))
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+pyr = pytest.importorskip('pyresample')
+from metplotpy.plots.resample_cache import ResampleCache
+
+RADIUS = 50000
+SIGMAS = 25000
+
+
+@pytest.fixture
+def grids():
+    # a curvilinear source grid and a finer regular target grid around the north pole
+    rng = np.random.default_rng(0)
+    lons, lats = np.meshgrid(np.linspace(-180, 179, 180), np.linspace(60, 89.5, 60))
+    lons = lons + rng.normal(0, 0.1, lons.shape)
+    source = pyr.geometry.GridDefinition(lons=pyr.utils.wrap_longitudes(lons), lats=lats)
+    lons, lats = np.meshgrid(np.linspace(-180, 179.5, 240), np.linspace(55, 90, 80))
+    target = pyr.geometry.GridDefinition(lons=lons, lats=lats)
+    return source, target
+
+
+def create_field(shape, dtype, seed=1):
+    rng = np.random.default_rng(seed)
+    data = rng.random(shape).astype(dtype)
+    data[5:10, 20:40] = np.nan
+    field = np.ma.masked_where(rng.random(shape) < 0.1, data)
+    field.mask = np.ma.mask_or(field.mask, field < 0.15)
+    return field
+
+
+def assert_same(actual, expected):
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(np.ma.getmaskarray(actual), np.ma.getmaskarray(expected))
+    np.testing.assert_array_equal(actual.filled(-1), expected.filled(-1))
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+@pytest.mark.parametrize('masked', [True, False])
+def test_resample_gauss(grids, dtype, masked):
+    source, target = grids
+    field = create_field(source.shape, dtype)
+    if not masked:
+        field = field.filled(0.5)
+    expected = pyr.kd_tree.resample_gauss(source, field, target, radius_of_influence=RADIUS,
+                                          sigmas=SIGMAS, neighbours=8, fill_value=None, nprocs=1)
+    actual = ResampleCache().resample_gauss(source, field, target, radius_of_influence=RADIUS,
+                                            sigmas=SIGMAS, neighbours=8)
+    assert_same(actual, expected)
+
+
+def test_cache_reuse(grids, tmp_path):
+    source, target = grids
+    cache_dir = str(tmp_path / 'cache')
+    ResampleCache(cache_dir).get_weights(source, target, RADIUS, SIGMAS)
+    assert len(os.listdir(cache_dir)) == 1
+
+    # the next fields on the same grids use the saved weights
+    field = create_field(source.shape, np.float64, seed=2)
+    expected = pyr.kd_tree.resample_gauss(source, field, target, radius_of_influence=RADIUS,
+                                          sigmas=SIGMAS, neighbours=8, fill_value=None, nprocs=1)
+    assert_same(ResampleCache(cache_dir).resample_gauss(source, field, target, RADIUS, SIGMAS),
+                expected)
+
+    # different options are cached separately
+    ResampleCache(cache_dir).get_weights(source, target, RADIUS, SIGMAS * 2)
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_corrupted_cache_file(grids, tmp_path):
+    source, target = grids
+    cache_dir = str(tmp_path / 'cache')
+    expected = ResampleCache(cache_dir).get_weights(source, target, RADIUS, SIGMAS)
+    cache_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    with open(cache_file, 'wb') as stream:
+        stream.write(b'not a numpy file')
+
+    # the weights are calculated again and the file is replaced
+    weights = ResampleCache(cache_dir).get_weights(source, target, RADIUS, SIGMAS)
+    np.testing.assert_array_equal(weights.matrix.toarray(), expected.matrix.toarray())
+    assert ResampleCache(cache_dir).get_weights(source, target, RADIUS, SIGMAS) is not None
+    assert os.path.getsize(cache_file) > 100
@@ -0,0 +1,79 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from metplotpy.plots.util import read_stat_input
+
+pytest.importorskip('pyarrow')
+from metplotpy.plots.stat_input_cache import StatInputCache
+
+STAT_INPUT = '../line/line.data'
+OPTIONS = {'columns': None, 'categorical_columns': ['model', 'fcst_var'], 'float_type': 'float64'}
+
+
+def test_cache_round_trip(tmp_path):
+    cache = StatInputCache(str(tmp_path / 'cache'))
+    assert cache.get(STAT_INPUT, OPTIONS) is None
+    expected = read_stat_input(STAT_INPUT, **OPTIONS)
+    cache.put(STAT_INPUT, OPTIONS, expected)
+    pd.testing.assert_frame_equal(cache.get(STAT_INPUT, OPTIONS), expected)
+
+    # different options are cached separately
+    assert cache.get(STAT_INPUT, {**OPTIONS, 'float_type': 'float32'}) is None
+
+
+def test_cache_invalidation(tmp_path):
+    stat_input = str(tmp_path / 'line.data')
+    shutil.copy(STAT_INPUT, stat_input)
+    cache = StatInputCache(str(tmp_path / 'cache'))
+    cache.put(stat_input, OPTIONS, read_stat_input(stat_input, **OPTIONS))
+    assert cache.get(stat_input, OPTIONS) is not None
+
+    # remove the last row
+    with open(stat_input, 'r') as stream:
+        lines = stream.readlines()
+    with open(stat_input, 'w') as stream:
+        stream.writelines(lines[:-1])
+    assert cache.get(stat_input, OPTIONS) is None
+
+
+def test_cache_eviction(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    input_data = read_stat_input(STAT_INPUT, **OPTIONS)
+    cache = StatInputCache(cache_dir)
+    cache.put(STAT_INPUT, OPTIONS, input_data)
+    file_size = sum(entry.stat().st_size for entry in os.scandir(cache_dir)
+                    if entry.name.endswith('.feather'))
+
+    # the cache can hold only two frames
+    cache = StatInputCache(cache_dir, max_size=2.5 * file_size / 1024 / 1024)
+    for float_type in ('float32', 'float64'):
+        options = {**OPTIONS, 'float_type': float_type, 'columns': list(input_data.columns)}
+        cache.put(STAT_INPUT, options, read_stat_input(STAT_INPUT, **options))
+    assert cache.get(STAT_INPUT, OPTIONS) is None
+    assert len([name for name in os.listdir(cache_dir) if name.endswith('.feather')]) == 2
+
+
+def test_cache_file_removed_by_another_process(monkeypatch, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    cache = StatInputCache(cache_dir)
+    expected = read_stat_input(STAT_INPUT, **OPTIONS)
+    cache.put(STAT_INPUT, OPTIONS, expected)
+
+    # the file is removed after it was read
+    def remove_and_utime(path, *args, **kwargs):
+        os.remove(path)
+        raise FileNotFoundError(path)
+    with monkeypatch.context() as patch:
+        patch.setattr(os, 'utime', remove_and_utime)
+        pd.testing.assert_frame_equal(cache.get(STAT_INPUT, OPTIONS), expected)
+
+    # the index can't be saved, no temporary file is left
+    def replace(*args):
+        raise OSError('No space left on device')
+    monkeypatch.setattr(os, 'replace', replace)
+    os.remove(os.path.join(cache_dir, 'index.json'))
+    cache.get(STAT_INPUT, OPTIONS)
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]